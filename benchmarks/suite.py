@@ -0,0 +1,347 @@
+"""
+Benchmark suite for the decision, explanation and responsibility modules,
+the hashing helpers, audit export and the full pipeline.
+
+Usage:
+    python -m benchmarks.suite --profile quick --output reports/bench.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.15
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+
+Results are machine-readable JSON. With --baseline, each case is compared
+with the stored numbers and the process exits non-zero on a regression, or
+when the baseline file is missing (unless --allow-missing-baseline).
+"""
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from modules.audit.sinks import JsonFileSink, SegmentedLogSink, build_audit_record
+from modules.decision.core import DecisionModule, stable_hash
+from modules.decision.policy import compile_policy
+from modules.decision.sparse import FeatureVocabulary, SparseBatch
+from modules.explanation.audience import compile_profiles
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+
+# max_cells caps batch x width so the largest batch cases stay tractable
+PROFILES = {
+    "quick": {
+        "widths": [3, 100, 1000],
+        "batch_sizes": [100, 1000],
+        "audiences": [1, 4],
+        "iterations": 30,
+        "max_cells": 100_000,
+    },
+    "full": {
+        "widths": [3, 100, 1000, 10000, 50000],
+        "batch_sizes": [100, 1000, 10000],
+        "audiences": [1, 2, 4],
+        "iterations": 100,
+        "max_cells": 5_000_000,
+    },
+}
+
+GOVERNANCE = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+
+AUDIENCE_PROFILES = {
+    "student": {"summary_style": "simple", "technical_detail": "minimal", "top_k": 3},
+    "faculty": {"summary_style": "moderate", "technical_detail": "medium", "top_k": 5},
+    "administrator": {"summary_style": "concise", "technical_detail": "high", "counterfactuals": False},
+    "regulator": {"summary_style": "formal", "technical_detail": "full", "counterfactuals": False},
+}
+
+
+def synthetic_policy(width: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Policy with `width` named weights in [0.05, 1.0).
+    """
+    rng = np.random.default_rng(seed)
+    return {f"f{i}": float(w) for i, w in enumerate(rng.uniform(0.05, 1.0, width))}
+
+
+def synthetic_matrix(rows: int, width: int, seed: int = 1) -> np.ndarray:
+    """
+    rows x width feature matrix in [0, 1), shaped like the student fixture.
+    """
+    return np.random.default_rng(seed).random((rows, width))
+
+
+def synthetic_rows(rows: int, width: int, seed: int = 1) -> List[Dict[str, float]]:
+    names = [f"f{i}" for i in range(width)]
+    return [dict(zip(names, r)) for r in synthetic_matrix(rows, width, seed).tolist()]
+
+
+@dataclass
+class Case:
+    """
+    One benchmark: setup() returns the callable that is timed; each call
+    processes `items` rows.
+    """
+    name: str
+    params: Dict[str, Any]
+    setup: Callable[[], Callable[[], Any]]
+    items: int = 1
+
+    @property
+    def key(self) -> str:
+        return self.name + "".join(f"[{k}={v}]" for k, v in sorted(self.params.items()))
+
+
+@dataclass
+class CaseResult:
+    name: str
+    params: Dict[str, Any]
+    iterations: int
+    items_per_call: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_kib: float
+    key: str = field(default="")
+
+
+def build_cases(profile: Dict[str, Any], workdir: str, resources: ExitStack) -> List[Case]:
+    cases: List[Case] = []
+    for width in profile["widths"]:
+        def decision_run(width=width):
+            module, policy = DecisionModule(), compile_policy(synthetic_policy(width))
+            row = synthetic_rows(1, width)[0]
+            return lambda: module.run(row, policy)
+
+        def hash_features(width=width):
+            payload = {"features": synthetic_rows(1, width)[0]}
+            return lambda: stable_hash(payload)
+
+        def explanation_run(width=width):
+            decision = DecisionModule().run(synthetic_rows(1, width)[0], synthetic_policy(width))
+            module = ExplanationModule()
+            return lambda: module.run(decision)
+
+        def responsibility_run(width=width):
+            decision = DecisionModule().run(synthetic_rows(1, width)[0], synthetic_policy(width))
+            explanation = ExplanationModule().run(decision)
+            module = ResponsibilityModule(GOVERNANCE)
+            return lambda: module.run(decision, explanation)
+
+        def pipeline(width=width):
+            decision_module, policy = DecisionModule(), compile_policy(synthetic_policy(width))
+            explanation_module, responsibility_module = ExplanationModule(), ResponsibilityModule(GOVERNANCE)
+            row = synthetic_rows(1, width)[0]
+
+            def call():
+                decision = decision_module.run(row, policy)
+                explanation = explanation_module.run(decision)
+                return responsibility_module.run(decision, explanation)
+            return call
+
+        cases += [
+            Case("decision.run", {"width": width}, decision_run),
+            Case("stable_hash", {"width": width}, hash_features),
+            Case("explanation.run", {"width": width}, explanation_run),
+            Case("responsibility.run", {"width": width}, responsibility_run),
+            Case("pipeline", {"width": width}, pipeline),
+        ]
+
+        for batch in profile["batch_sizes"]:
+            if batch * width > profile["max_cells"]:
+                continue
+            for scheme in ("json", "binary"):
+                def decision_batch(width=width, batch=batch, scheme=scheme):
+                    module = DecisionModule(hash_scheme=scheme)
+                    policy = compile_policy(synthetic_policy(width))
+                    matrix, names = synthetic_matrix(batch, width), [f"f{i}" for i in range(width)]
+                    return lambda: module.run_batch(matrix, policy, feature_names=names)
+
+                params = {"width": width, "batch": batch, "hash_scheme": scheme}
+                cases.append(Case("decision.run_batch", params, decision_batch, items=batch))
+
+            def responsibility_batch(width=width, batch=batch):
+                matrix, names = synthetic_matrix(batch, width), [f"f{i}" for i in range(width)]
+                decisions = DecisionModule().run_batch(matrix, synthetic_policy(width), feature_names=names)
+                explanation_module = ExplanationModule()
+                explanations = [explanation_module.run(d) for d in decisions]
+                module = ResponsibilityModule(GOVERNANCE)
+                return lambda: module.run_batch(decisions, explanations)
+
+            cases.append(Case("responsibility.run_batch", {"width": width, "batch": batch},
+                              responsibility_batch, items=batch))
+
+    # Sparse rows: 32 non-zeros per row against the widest vocabulary
+    vocab_width = profile["widths"][-1]
+    nnz = min(32, vocab_width)
+    vocabulary = FeatureVocabulary(f"f{i}" for i in range(vocab_width))
+    for batch in profile["batch_sizes"]:
+        def decision_sparse(batch=batch):
+            rng = np.random.default_rng(2)
+            indices = np.concatenate([rng.choice(vocab_width, nnz, replace=False) for _ in range(batch)])
+            sparse = SparseBatch(np.arange(batch + 1) * nnz, indices, rng.random(batch * nnz), vocabulary)
+            module, policy = DecisionModule(), compile_policy(synthetic_policy(vocab_width))
+            return lambda: module.run_sparse(sparse, policy)
+
+        params = {"vocabulary": vocab_width, "batch": batch, "nnz": nnz}
+        cases.append(Case("decision.run_sparse", params, decision_sparse, items=batch))
+
+    width = profile["widths"][0]
+    for count in profile["audiences"]:
+        def explanation_many(count=count):
+            decision = DecisionModule().run(synthetic_rows(1, width)[0], synthetic_policy(width))
+            module = ExplanationModule(profiles=compile_profiles(AUDIENCE_PROFILES))
+            audiences = list(AUDIENCE_PROFILES)[:count]
+            return lambda: module.run_many(decision, audiences)
+
+        cases.append(Case("explanation.run_many", {"audiences": count}, explanation_many, items=count))
+
+    def audit_record():
+        decision = DecisionModule().run(synthetic_rows(1, width)[0], synthetic_policy(width))
+        explanation = ExplanationModule().run(decision)
+        verdict = ResponsibilityModule(GOVERNANCE).run(decision, explanation)
+        return build_audit_record(decision, explanation, verdict)
+
+    def export_json():
+        sink, record = JsonFileSink(os.path.join(workdir, "json")), audit_record()
+        return lambda: sink.write(record)
+
+    def export_log():
+        sink = resources.enter_context(SegmentedLogSink(os.path.join(workdir, "log"), fsync_policy="never"))
+        record = audit_record()
+        return lambda: sink.write(record)
+
+    cases += [
+        Case("export_audit", {"sink": "json_file"}, export_json),
+        Case("export_audit", {"sink": "segmented_log"}, export_log),
+    ]
+    return cases
+
+
+def measure(case: Case, iterations: int, warmup: int = 3) -> CaseResult:
+    """
+    Time `iterations` calls (after warmup) and measure peak traced memory
+    of one additional call.
+    """
+    call = case.setup()
+    for _ in range(warmup):
+        call()
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        call()
+        timings[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = timings * 1000.0
+    total = float(timings.sum())
+    return CaseResult(
+        name=case.name,
+        params=case.params,
+        iterations=iterations,
+        items_per_call=case.items,
+        throughput=case.items * iterations / total if total > 0 else float("inf"),
+        p50_ms=float(np.percentile(ms, 50)),
+        p95_ms=float(np.percentile(ms, 95)),
+        p99_ms=float(np.percentile(ms, 99)),
+        peak_kib=peak / 1024.0,
+        key=case.key,
+    )
+
+
+def run_suite(profile: str = "quick", only: Optional[Sequence[str]] = None, iterations: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run every case of a profile (optionally only names in `only`) and return
+    the JSON-ready report.
+    """
+    settings = PROFILES[profile]
+    # Sinks opened by case setups are closed before workdir is removed
+    with tempfile.TemporaryDirectory() as workdir, ExitStack() as resources:
+        cases = [c for c in build_cases(settings, workdir, resources) if not only or c.name in only]
+        results = [asdict(measure(c, iterations or settings["iterations"])) for c in cases]
+    return {
+        "profile": profile,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "created": time.time(),
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.15,
+            metrics: Sequence[str] = ("throughput", "p99_ms")) -> List[str]:
+    """
+    Regressions of `report` against `baseline`: throughput lower, or latency
+    and memory higher, by more than `threshold` (fraction). Cases missing from
+    the baseline are ignored.
+    """
+    previous = {r["key"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        base = previous.get(result["key"])
+        if base is None:
+            continue
+        for metric in metrics:
+            old, new = base[metric], result[metric]
+            if not old:
+                continue
+            change = (old - new) / old if metric == "throughput" else (new - old) / old
+            if change > threshold:
+                regressions.append(f"{result['key']}: {metric} {old:.4g} -> {new:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent modules.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", nargs="*", help="case names to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed regression as a fraction")
+    parser.add_argument("--metrics", nargs="*", default=["throughput", "p99_ms"])
+    parser.add_argument("--save-baseline", help="also write the report as a new baseline")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="skip the comparison instead of failing when --baseline does not exist")
+    args = parser.parse_args(argv)
+
+    compare_baseline = bool(args.baseline)
+    if args.baseline and not os.path.exists(args.baseline):
+        if not args.allow_missing_baseline:
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 2
+        print(f"No baseline at {args.baseline}; skipping comparison", file=sys.stderr)
+        compare_baseline = False
+
+    report = run_suite(args.profile, args.only, args.iterations)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    if compare_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold, args.metrics)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,436 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+from modules.audit.sinks import AuditSink, complete_size
+from modules.decision.hashing import canonical_json
+
+# Reference to a stored blob inside a record skeleton or another blob
+BLOB_KEY = "$blob"
+# Digest of the full canonical record, kept on each skeleton for verification
+DIGEST_KEY = "$digest"
+
+BLOBS_FILE = "blobs.pack"
+RECORDS_FILE = "records.log"
+
+# Skeleton lines start with the trace id, so the index is built without parsing them
+_TRACE_PREFIX = b'{"trace_id":"'
+
+
+def blob_id(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+@dataclass
+class VerifyReport:
+    """
+    Outcome of ContentAddressedStore.verify().
+    """
+    records: int = 0
+    blobs: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _scan(path: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (byte offset, line) for each complete, non-empty line of an
+    append-only file. A last line without its newline (a write torn by a
+    crash) is skipped.
+    """
+    if not os.path.exists(path):
+        return
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+
+def _line_trace_id(line: bytes) -> str:
+    if line.startswith(_TRACE_PREFIX):
+        end = line.find(b'"', len(_TRACE_PREFIX))
+        value = line[len(_TRACE_PREFIX):end]
+        if end > 0 and b"\\" not in value:
+            return value.decode("utf-8")
+    return json.loads(line)["trace_id"]
+
+
+class ContentAddressedStore(AuditSink):
+    """
+    Deduplicated audit storage.
+
+    Each record is split bottom-up: every object, list or string nested in a
+    record section whose canonical JSON reaches min_blob_bytes is stored once
+    in an append-only blob pack, keyed by the SHA-256 of that JSON, and
+    replaced by {"$blob": id}. The remaining skeleton (the top-level
+    sections with their small values inline) goes to an append-only record
+    log. A reference costs about 80 bytes, so small values stay inline.
+    Repeated caveats, summary shapes and the feature_importance map shared
+    by the decision, explanation and bundle sections are therefore stored
+    once.
+
+    Both files are scanned on open to rebuild the in-memory trace_id and
+    blob indexes; an incomplete last line left by a crash is truncated
+    away before appending resumes. Decoded blobs are kept in an LRU cache
+    so that reassembling a bundle touches disk only for blobs not seen
+    recently. Dicts with a "$blob" key are reserved and rejected on write.
+    """
+
+    def __init__(self, directory: str = "reports/audits/cas", min_blob_bytes: int = 128, cache_size: int = 4096):
+        self.directory = directory
+        self.min_blob_bytes = min_blob_bytes
+        self.cache_size = cache_size
+        os.makedirs(directory, exist_ok=True)
+        self.blobs_path = os.path.join(directory, BLOBS_FILE)
+        self.records_path = os.path.join(directory, RECORDS_FILE)
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        for path in (self.blobs_path, self.records_path):
+            complete = complete_size(path)
+            if os.path.exists(path) and os.path.getsize(path) > complete:
+                os.truncate(path, complete)
+        self._load()
+        self._blob_file = open(self.blobs_path, "ab")
+        self._record_file = open(self.records_path, "ab")
+        self._closed = False
+
+    def _load(self) -> None:
+        self._blobs: Dict[str, Tuple[int, int]] = {}
+        for offset, line in _scan(self.blobs_path):
+            self._blobs[line[:64].decode("ascii")] = (offset + 65, len(line) - 66)
+        self._blob_size = complete_size(self.blobs_path)
+        self._records: Dict[str, Tuple[int, int]] = {}
+        for offset, line in _scan(self.records_path):
+            self._records[_line_trace_id(line)] = (offset, len(line))
+        self._record_size = complete_size(self.records_path)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, trace_id: str) -> bool:
+        return trace_id in self._records
+
+    @property
+    def blob_count(self) -> int:
+        return len(self._blobs)
+
+    # Write side
+
+    def _put_blob(self, value: Any, payload: bytes) -> str:
+        key = blob_id(payload)
+        if key not in self._blobs:
+            line = key.encode("ascii") + b" " + payload + b"\n"
+            self._blob_file.write(line)
+            self._blobs[key] = (self._blob_size + 65, len(payload))
+            self._blob_size += len(line)
+            self._remember(key, value)
+        return key
+
+    def _split(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if BLOB_KEY in value:
+                raise ValueError(f"Audit records must not contain the reserved key {BLOB_KEY!r}")
+            value = {k: self._split(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            value = [self._split(v) for v in value]
+        elif not isinstance(value, str):
+            return value
+        payload = canonical_json(value).encode("utf-8")
+        if len(payload) < self.min_blob_bytes:
+            return value
+        return {BLOB_KEY: self._put_blob(value, payload)}
+
+    def write(self, record: Dict[str, Any]) -> str:
+        """
+        Store one audit record (build_audit_record layout). Returns its trace id.
+        """
+        if self._closed:
+            raise ValueError("write to closed audit store")
+        trace_id = record["trace_id"]
+        skeleton = {"trace_id": trace_id}
+        for key, section in record.items():
+            if key == "trace_id":
+                continue
+            if isinstance(section, dict):
+                if BLOB_KEY in section:
+                    raise ValueError(f"Audit records must not contain the reserved key {BLOB_KEY!r}")
+                skeleton[key] = {k: self._split(v) for k, v in section.items()}
+            else:
+                skeleton[key] = section
+        skeleton[DIGEST_KEY] = blob_id(canonical_json(record).encode("utf-8"))
+        line = json.dumps(skeleton, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._record_file.write(line)
+        self._records[trace_id] = (self._record_size, len(line))
+        self._record_size += len(line)
+        return trace_id
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Push buffered writes to the OS; with sync, fsync blobs before records
+        so a durable record never references a missing blob.
+        """
+        self._blob_file.flush()
+        if sync:
+            os.fsync(self._blob_file.fileno())
+        self._record_file.flush()
+        if sync:
+            os.fsync(self._record_file.fileno())
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush(sync=True)
+        self._blob_file.close()
+        self._record_file.close()
+        self._closed = True
+
+    # Read side
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _read_blob_bytes(self, key: str) -> bytes:
+        offset, length = self._blobs[key]
+        if not self._closed:
+            self._blob_file.flush()
+        with open(self.blobs_path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def blob(self, key: str) -> Any:
+        """
+        Decoded blob content (references inside it are left unresolved).
+        """
+        value = self._cache.get(key)
+        if value is None:
+            value = json.loads(self._read_blob_bytes(key))
+            self._remember(key, value)
+        else:
+            self._cache.move_to_end(key)
+        return value
+
+    def _resolve(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and BLOB_KEY in value:
+                return self._resolve(self.blob(value[BLOB_KEY]))
+            return {k: self._resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(v) for v in value]
+        return value
+
+    def _skeleton(self, trace_id: str) -> Dict[str, Any]:
+        offset, length = self._records[trace_id]
+        if not self._closed:
+            self._record_file.flush()
+        with open(self.records_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def reassemble(self, skeleton: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Full audit record from a stored skeleton.
+        """
+        return {k: self._resolve(v) for k, v in skeleton.items() if k != DIGEST_KEY}
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Most recently written record for a trace id, or None.
+        """
+        if trace_id not in self._records:
+            return None
+        return self.reassemble(self._skeleton(trace_id))
+
+    def skeletons(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the latest skeleton per trace id, in write order.
+        """
+        if not self._closed:
+            self._record_file.flush()
+        live = set(self._records.values())
+        for offset, line in _scan(self.records_path):
+            if (offset, len(line)) in live:
+                yield json.loads(line)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every current record, reassembled, in write order.
+        """
+        for skeleton in self.skeletons():
+            yield self.reassemble(skeleton)
+
+    # Maintenance
+
+    def remove(self, trace_ids: Iterable[str]) -> int:
+        """
+        Drop records and compact the record log. Their blobs are reclaimed by gc().
+        """
+        doomed = {t for t in trace_ids if t in self._records}
+        if doomed:
+            keep = [s for s in self.skeletons() if s["trace_id"] not in doomed]
+            self._rewrite_records(keep)
+        return len(doomed)
+
+    def _rewrite_records(self, skeletons: List[Dict[str, Any]]) -> None:
+        self._record_file.close()
+        tmp = f"{self.records_path}.tmp"
+        with open(tmp, "wb") as f:
+            for skeleton in skeletons:
+                f.write(json.dumps(skeleton, separators=(",", ":")).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.records_path)
+        self._record_file = open(self.records_path, "ab")
+        self._load()
+
+    def _collect_refs(self, value: Any, live: set) -> None:
+        if isinstance(value, dict):
+            if len(value) == 1 and BLOB_KEY in value:
+                key = value[BLOB_KEY]
+                if key not in live:
+                    live.add(key)
+                    self._collect_refs(self.blob(key), live)
+                return
+            for v in value.values():
+                self._collect_refs(v, live)
+        elif isinstance(value, list):
+            for v in value:
+                self._collect_refs(v, live)
+
+    def gc(self) -> int:
+        """
+        Rewrite the blob pack without blobs no current record reaches.
+        Returns the number of blobs removed.
+        """
+        live: set = set()
+        for skeleton in self.skeletons():
+            self._collect_refs(skeleton, live)
+        dead = len(self._blobs) - len(live)
+        if dead == 0:
+            return 0
+        self._blob_file.flush()
+        tmp = f"{self.blobs_path}.tmp"
+        with open(tmp, "wb") as dst:
+            for offset, line in _scan(self.blobs_path):
+                if line[:64].decode("ascii") in live:
+                    dst.write(line)
+            dst.flush()
+            os.fsync(dst.fileno())
+        self._blob_file.close()
+        os.replace(tmp, self.blobs_path)
+        self._blob_file = open(self.blobs_path, "ab")
+        self._cache = OrderedDict((k, v) for k, v in self._cache.items() if k in live)
+        self._load()
+        return dead
+
+    def verify(self, workers: Optional[int] = None, shard_records: int = 4096) -> VerifyReport:
+        """
+        Check every blob against its content hash and every reassembled
+        record against the digest taken when it was written, and that
+        decision.data_hash, audit_bundle.data_hash and the trace ids agree
+        within each record. This detects storage corruption and missing
+        blobs; it cannot recompute data_hash or trace_id, since the raw
+        features are not stored.
+
+        Shards of the record log are checked in worker processes (in-process
+        when workers <= 1). Each worker receives the blob index once and
+        reads only its own spans of the record log.
+        """
+        if not self._closed:
+            self.flush()
+        report = VerifyReport(blobs=len(self._blobs))
+        for offset, line in _scan(self.blobs_path):
+            key, payload = line[:64].decode("ascii"), line[65:-1]
+            if blob_id(payload) != key:
+                report.errors.append(f"blob {key}: content hash mismatch")
+
+        spans = sorted(self._records.values())
+        shards = [spans[i:i + shard_records] for i in range(0, len(spans), max(1, shard_records))]
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        if workers <= 1 or len(shards) <= 1:
+            _init_verifier(self.directory, self._blobs)
+            parts = [_verify_shard(shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(shards)),
+                initializer=_init_verifier,
+                initargs=(self.directory, self._blobs),
+            ) as pool:
+                parts = list(pool.map(_verify_shard, shards))
+        for count, errors in parts:
+            report.records += count
+            report.errors.extend(errors)
+        return report
+
+
+def check_record(skeleton: Dict[str, Any], record: Dict[str, Any]) -> List[str]:
+    """
+    Integrity problems of one reassembled record (empty when intact).
+    """
+    trace_id = skeleton.get("trace_id")
+    errors = []
+    if blob_id(canonical_json(record).encode("utf-8")) != skeleton.get(DIGEST_KEY):
+        errors.append(f"record {trace_id}: digest mismatch")
+    decision, bundle = record.get("decision") or {}, record.get("audit_bundle") or {}
+    if "data_hash" in decision and "data_hash" in bundle and decision["data_hash"] != bundle["data_hash"]:
+        errors.append(f"record {trace_id}: data_hash differs between decision and audit_bundle")
+    if bundle.get("trace_id", trace_id) != trace_id:
+        errors.append(f"record {trace_id}: audit_bundle trace_id {bundle['trace_id']}")
+    return errors
+
+
+# Per-process reader, built once by the pool initializer
+_VERIFIER: Dict[str, "_ReadOnlyStore"] = {}
+
+
+def _init_verifier(directory: str, blobs: Dict[str, Tuple[int, int]]) -> None:
+    _VERIFIER["store"] = _ReadOnlyStore(directory, blobs)
+
+
+def _verify_shard(spans: List[Tuple[int, int]]) -> Tuple[int, List[str]]:
+    """
+    Verify the records at the given (offset, length) spans of a store.
+    """
+    store = _VERIFIER["store"]
+    errors: List[str] = []
+    with open(store.records_path, "rb") as f:
+        for offset, length in spans:
+            f.seek(offset)
+            skeleton = json.loads(f.read(length))
+            try:
+                record = store.reassemble(skeleton)
+            except KeyError as exc:
+                errors.append(f"record {skeleton.get('trace_id')}: missing blob {exc.args[0]}")
+                continue
+            errors.extend(check_record(skeleton, record))
+    return len(spans), errors
+
+
+class _ReadOnlyStore(ContentAddressedStore):
+    """
+    Blob reader used by verification workers. It takes the blob index from
+    the owning store instead of scanning the files, has no trace_id index
+    and never opens files for writing.
+    """
+
+    def __init__(self, directory: str, blobs: Dict[str, Tuple[int, int]], cache_size: int = 4096):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.blobs_path = os.path.join(directory, BLOBS_FILE)
+        self.records_path = os.path.join(directory, RECORDS_FILE)
+        self._cache = OrderedDict()
+        self._closed = True
+        self._blobs = blobs
+        self._records = {}
\ No newline at end of file
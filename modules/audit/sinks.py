@@ -0,0 +1,279 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+
+
+def build_audit_record(decision, explanation, verdict, exported_at: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Assemble the full audit record for one decision (the export_audit layout).
+    """
+    return {
+        "trace_id": verdict.trace_id,
+        "decision": {
+            "prediction": decision.prediction,
+            "confidence": decision.confidence,
+            "feature_importance": decision.feature_importance,
+            "model_version": decision.model_version,
+            "data_hash": decision.data_hash,
+            "timestamp": decision.timestamp,
+        },
+        "explanation": {
+            "summary": explanation.summary,
+            "technical": explanation.technical,
+            "counterfactuals": explanation.counterfactuals,
+            "caveats": explanation.caveats,
+        },
+        "responsibility": {
+            "allowed": verdict.allowed,
+            "reasons": verdict.reasons,
+            "metrics": verdict.metrics,
+        },
+        "audit_bundle": verdict.audit_bundle,
+        "exported_at": exported_at or datetime.utcnow().isoformat()
+    }
+
+
+class AuditSink(ABC):
+    """
+    Destination for audit records. Subclasses implement write(); batching
+    sinks also override flush() and close().
+    """
+
+    @abstractmethod
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Persist one audit record.
+        """
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonFileSink(AuditSink):
+    """
+    One pretty-printed JSON file per trace (the original export format).
+    """
+
+    def __init__(self, output_dir: str = "reports/audits", indent: Optional[int] = 4):
+        self.output_dir = output_dir
+        self.indent = indent
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]) -> str:
+        filename = f"{self.output_dir}/audit_{record['trace_id']}.json"
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=self.indent)
+        return filename
+
+
+FSYNC_POLICIES = ("always", "every_n", "interval", "never")
+
+_SEGMENT_RE = re.compile(r"^audit-(\d{6})\.log(\.gz)?$")
+
+
+def segment_name(index: int, sealed_compressed: bool = False) -> str:
+    """
+    File name of a log segment.
+    """
+    return f"audit-{index:06d}.log" + (".gz" if sealed_compressed else "")
+
+
+def complete_size(path: str) -> int:
+    """
+    Length of a file up to and including its last newline.
+    """
+    if not os.path.exists(path):
+        return 0
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            last = chunk.rfind(b"\n")
+            if last >= 0:
+                return pos - step + last + 1
+            pos -= step
+    return 0
+
+
+def list_segments(directory: str) -> List[str]:
+    """
+    Segment file names in a log directory, in write order. When a crash
+    during compression left both a segment and its .gz copy, only the
+    complete .gz copy is listed.
+    """
+    if not os.path.isdir(directory):
+        return []
+    found: Dict[int, str] = {}
+    for name in os.listdir(directory):
+        match = _SEGMENT_RE.match(name)
+        if match:
+            index = int(match.group(1))
+            if index not in found or name.endswith(".gz"):
+                found[index] = name
+    return [found[index] for index in sorted(found)]
+
+
+class SegmentedLogSink(AuditSink):
+    """
+    Append-only audit log split into size-bounded segments.
+
+    Records are written as compact JSON lines through an in-memory buffer.
+    Durability is controlled by fsync_policy:
+    - "always": flush and fsync after every record
+    - "every_n": fsync after every fsync_every records
+    - "interval": fsync when fsync_interval seconds have passed
+    - "never": leave it to the OS (close() still flushes)
+    When the active segment exceeds segment_bytes it is sealed and, with
+    compress_sealed, gzipped in place of the plain file. Reopening after a
+    crash truncates a torn last line from the active segment and cleans up
+    interrupted compressions.
+    """
+
+    def __init__(
+        self,
+        directory: str = "reports/audits/log",
+        segment_bytes: int = 64 * 1024 * 1024,
+        buffer_records: int = 256,
+        fsync_policy: str = "interval",
+        fsync_every: int = 1000,
+        fsync_interval: float = 1.0,
+        compress_sealed: bool = False,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync_policy!r}; expected one of {FSYNC_POLICIES}")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.buffer_records = max(1, buffer_records)
+        self.fsync_policy = fsync_policy
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.compress_sealed = compress_sealed
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffer: List[bytes] = []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._closed = False
+
+        # Finish compressions interrupted by a crash: the .gz copy is only
+        # renamed into place once complete, so its plain twin can go, and a
+        # partial .gz.tmp is redone from the plain segment when it rotates
+        for name in os.listdir(directory):
+            if name.endswith(".gz.tmp") and _SEGMENT_RE.match(name[:-len(".tmp")]):
+                os.remove(os.path.join(directory, name))
+        for name in list_segments(directory):
+            twin = os.path.join(directory, name[:-len(".gz")])
+            if name.endswith(".gz") and os.path.exists(twin):
+                os.remove(twin)
+
+        # Continue the newest plain segment, or start after the last sealed one
+        segments = list_segments(directory)
+        if segments and not segments[-1].endswith(".gz"):
+            self._index = int(_SEGMENT_RE.match(segments[-1]).group(1))
+        else:
+            self._index = int(_SEGMENT_RE.match(segments[-1]).group(1)) + 1 if segments else 1
+        self._open_segment()
+
+    @property
+    def active_segment(self) -> str:
+        return os.path.join(self.directory, segment_name(self._index))
+
+    def _open_segment(self) -> None:
+        # Drop a last line torn by a crash so the next record starts cleanly
+        complete = complete_size(self.active_segment)
+        if os.path.exists(self.active_segment) and os.path.getsize(self.active_segment) > complete:
+            os.truncate(self.active_segment, complete)
+        self._file = open(self.active_segment, "ab")
+        self._size = self._file.tell()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._closed:
+            raise ValueError("write to closed audit sink")
+        line = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._buffer.append(line)
+        self._unsynced += 1
+        if self.fsync_policy == "always":
+            self.flush(sync=True)
+        elif self.fsync_policy == "every_n" and self._unsynced >= self.fsync_every:
+            self.flush(sync=True)
+        elif self.fsync_policy == "interval" and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.flush(sync=True)
+        elif len(self._buffer) >= self.buffer_records:
+            self.flush()
+
+    def flush(self, sync: bool = False) -> None:
+        """
+        Write buffered records to the active segment, rotating when full.
+        """
+        for line in self._buffer:
+            if self._size and self._size + len(line) > self.segment_bytes:
+                self._rotate()
+            self._file.write(line)
+            self._size += len(line)
+        self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _rotate(self) -> None:
+        """
+        Seal the active segment and open the next one.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self.compress_sealed:
+            self._compress(self.active_segment)
+        self._index += 1
+        self._open_segment()
+
+    @staticmethod
+    def _compress(path: str) -> None:
+        with open(path, "rb") as src, gzip.open(f"{path}.gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(f"{path}.gz.tmp", f"{path}.gz")
+        os.remove(path)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush(sync=self.fsync_policy != "never")
+        self._file.close()
+        self._closed = True
+
+
+def read_segments(directory: str) -> Iterable[Dict[str, Any]]:
+    """
+    Stream every record from a segmented audit log, oldest first.
+    """
+    for name in list_segments(directory):
+        path = os.path.join(directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
\ No newline at end of file
@@ -0,0 +1,216 @@
+from typing import Any, Dict, Iterator, List, Optional
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+from modules.audit.sinks import AuditSink, list_segments
+
+logger = logging.getLogger(__name__)
+
+
+# Fields that get a point-lookup index (hashed to uint64 keys)
+KEY_FIELDS = ("trace_id", "data_hash", "model_version")
+
+_LOCATION_DTYPE = np.dtype([("segment", "<i4"), ("offset", "<i8"), ("length", "<i4")])
+_KEY_DTYPE = np.dtype([("key", "<u8"), ("row", "<i8")])
+_TIME_DTYPE = np.dtype([("timestamp", "<f8"), ("row", "<i8")])
+
+
+def _key(value: Any) -> int:
+    """
+    64-bit key for an indexed value. Collisions are resolved on read.
+    """
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def record_field(record: Dict[str, Any], name: str) -> Any:
+    """
+    Read an indexed field from a full audit record or a bare audit bundle.
+    """
+    if name in record:
+        return record[name]
+    for section in ("decision", "audit_bundle"):
+        value = record.get(section, {}).get(name)
+        if value is not None:
+            return value
+    return None
+
+
+class AuditStore:
+    """
+    Read side of a segmented audit log with on-disk indexes.
+
+    Indexes over trace_id, data_hash, model_version (sorted 64-bit keys)
+    and timestamp (sorted floats) are plain .npy files memory-mapped on
+    open. They are derived data: build_index() recreates them from the
+    raw segments at any time. Lookups in gzipped segments work but must
+    decompress up to the record, so leave segments uncompressed where
+    point lookups matter.
+    """
+
+    def __init__(self, directory: str = "reports/audits/log", index_dir: Optional[str] = None):
+        self.directory = directory
+        self.index_dir = index_dir or os.path.join(directory, "index")
+        self._segments: List[str] = []
+        self._locations = np.zeros(0, dtype=_LOCATION_DTYPE)
+        self._keys: Dict[str, np.ndarray] = {f: np.zeros(0, dtype=_KEY_DTYPE) for f in KEY_FIELDS}
+        self._times = np.zeros(0, dtype=_TIME_DTYPE)
+        if not self._load_index() or self.is_stale():
+            self.build_index()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def _segment_state(self) -> Dict[str, int]:
+        return {name: os.path.getsize(os.path.join(self.directory, name)) for name in list_segments(self.directory)}
+
+    def is_stale(self) -> bool:
+        """
+        True when segments were added, rotated or appended since the index was built.
+        """
+        return self._state != self._segment_state()
+
+    def _load_index(self) -> bool:
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            self._state = {}
+            return False
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._state = meta["segments"]
+        self._segments = list(self._state)
+
+        def load(name):
+            return np.load(os.path.join(self.index_dir, f"{name}.npy"), mmap_mode="r")
+
+        self._locations = load("locations")
+        self._keys = {field: load(field) for field in KEY_FIELDS}
+        self._times = load("timestamp")
+        return True
+
+    def build_index(self) -> int:
+        """
+        Rebuild all indexes from the raw segments. Returns the record count.
+        """
+        state = self._segment_state()
+        locations, times = [], []
+        keys: Dict[str, List[int]] = {f: [] for f in KEY_FIELDS}
+        for seg_no, name in enumerate(state):
+            for offset, line in self._scan_segment(name):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Only a segment's final line can lack its newline: a
+                    # write torn by a crash, which must not block indexing
+                    if line.endswith(b"\n"):
+                        raise
+                    logger.warning("Skipping torn last line of audit segment %s at byte %d", name, offset)
+                    continue
+                locations.append((seg_no, offset, len(line)))
+                for field in KEY_FIELDS:
+                    keys[field].append(_key(record_field(record, field)))
+                ts = record_field(record, "timestamp")
+                times.append(float(ts) if ts is not None else float("nan"))
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        rows = np.arange(len(locations), dtype=np.int64)
+
+        def save(name, array):
+            tmp = os.path.join(self.index_dir, f"{name}.tmp.npy")
+            np.save(tmp, array)
+            os.replace(tmp, os.path.join(self.index_dir, f"{name}.npy"))
+
+        save("locations", np.array(locations, dtype=_LOCATION_DTYPE))
+        for field in KEY_FIELDS:
+            index = np.empty(len(rows), dtype=_KEY_DTYPE)
+            index["key"] = np.array(keys[field], dtype=np.uint64)
+            index["row"] = rows
+            save(field, np.sort(index, order=["key", "row"], kind="stable"))
+        time_index = np.empty(len(rows), dtype=_TIME_DTYPE)
+        time_index["timestamp"] = np.array(times, dtype=float)
+        time_index["row"] = rows
+        save("timestamp", np.sort(time_index, order=["timestamp", "row"], kind="stable"))
+
+        meta_tmp = os.path.join(self.index_dir, "meta.json.tmp")
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": state, "records": len(rows)}, f)
+        os.replace(meta_tmp, os.path.join(self.index_dir, "meta.json"))
+
+        self._load_index()
+        return len(rows)
+
+    def _scan_segment(self, name: str) -> Iterator:
+        """
+        Yield (uncompressed byte offset, raw line) for each record in a segment.
+        """
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        offset = 0
+        with opener(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield offset, line
+                offset += len(line)
+
+    def _read_row(self, row: int) -> Dict[str, Any]:
+        loc = self._locations[row]
+        name = self._segments[int(loc["segment"])]
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            f.seek(int(loc["offset"]))
+            return json.loads(f.read(int(loc["length"])))
+
+    def find(self, field: str, value: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records whose field equals value, in write order.
+        """
+        if field not in KEY_FIELDS:
+            raise ValueError(f"No index for {field!r}; indexed fields are {KEY_FIELDS}")
+        index = self._keys[field]
+        key = np.uint64(_key(value))
+        lo = np.searchsorted(index["key"], key, side="left")
+        hi = np.searchsorted(index["key"], key, side="right")
+        for row in index["row"][lo:hi]:
+            record = self._read_row(int(row))
+            if record_field(record, field) == value:
+                yield record
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Most recently written record for a trace id, or None.
+        """
+        found = None
+        for found in self.find("trace_id", trace_id):
+            pass
+        return found
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records with start <= timestamp < end, in timestamp order.
+        """
+        times = self._times["timestamp"]
+        lo = 0 if start is None else np.searchsorted(times, start, side="left")
+        hi = len(times) if end is None else np.searchsorted(times, end, side="left")
+        for row in self._times["row"][lo:hi]:
+            yield self._read_row(int(row))
+
+
+def migrate_json_files(json_dir: str, sink: AuditSink) -> int:
+    """
+    Copy legacy per-trace JSON exports (audit_*.json) into a sink, oldest
+    decision first. Returns the number of records written.
+    """
+    records = []
+    for path in glob.glob(os.path.join(json_dir, "audit_*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            records.append(json.load(f))
+    records.sort(key=lambda r: record_field(r, "timestamp") or 0.0)
+    sink.write_many(records)
+    sink.flush()
+    return len(records)
\ No newline at end of file
@@ -1,114 +1,343 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
-import numpy as np
-import hashlib
-import json
-import time
-
-
-def stable_hash(obj: Any) -> str:
-    """
-    Create a stable hex hash for any JSON-serializable object.
-    Ensures deterministic data hashing across runs and platforms.
-    """
-    payload = json.dumps(obj, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
-
-
-@dataclass(frozen=True)
-class DecisionOutput:
-    """
-    Immutable decision artifact passed to downstream modules.
-    """
-    prediction: float
-    confidence: float
-    feature_importance: Dict[str, float]
-    trace_id: str
-    model_version: str
-    data_hash: str
-    timestamp: float
-
-
-class DecisionModule:
-    """
-    Decision module:
-    - Deterministic inference (seeded) for reproducibility
-    - Transparent feature weighting via provided 'policy' dict
-    - Emits traceable artifacts (trace_id, data_hash, model_version)
-    """
-
-    def __init__(self, model: Optional[Any] = None, model_version: str = "v1.0", seed: int = 42):
-        # Seed numpy for deterministic behavior
-        np.random.seed(seed)
-        self.model = model
-        self.model_version = model_version
-
-    def _score_with_policy(self, features: Dict[str, float], policy: Dict[str, float]) -> float:
-        """
-        Compute a simple, transparent score using policy weights.
-        Score is the weighted dot product normalized by weight vector norm.
-        """
-        keys = list(features.keys())
-        weights = np.array([policy.get(k, 1.0) for k in keys], dtype=float)
-        xs = np.array([features[k] for k in keys], dtype=float)
-
-        # Avoid divide-by-zero with small epsilon
-        norm = float(np.linalg.norm(weights) + 1e-9)
-        score = float(np.dot(weights, xs) / norm)
-        return score
-
-    def _confidence(self, score: float) -> float:
-        """
-        Map score to [0,1] using a logistic function.
-        """
-        return float(1.0 / (1.0 + np.exp(-score)))
-
-    def _feature_importance(self, features: Dict[str, float], policy: Dict[str, float]) -> Dict[str, float]:
-        """
-        Simple importance: product of feature value and its explicit policy weight.
-        """
-        return {k: float(policy.get(k, 1.0) * v) for k, v in features.items()}
-
-    def _trace_id(self, features: Dict[str, float], policy: Dict[str, float]) -> str:
-        """
-        Compose a trace id from hashed feature/policy payload and timestamp bucket.
-        """
-        payload = {"features": features, "policy": policy}
-        base = stable_hash(payload)
-        # Keep it short for readability
-        return f"trace-{base[:16]}"
-
-    def run(self, features: Dict[str, float], policy: Dict[str, float]) -> DecisionOutput:
-        """
-        Execute deterministic scoring and produce decision artifacts.
-
-        Args:
-            features: sanitized, non-sensitive feature values (name -> float)
-            policy: explicit weights and constraints (name -> float)
-
-        Returns:
-            DecisionOutput with prediction, confidence, importance, and trace metadata.
-        """
-        # Optional: if a real model is provided, you could combine model output with policy score
-        # For transparency, we use policy-only scoring here.
-        score = self._score_with_policy(features, policy)
-        conf = self._confidence(score)
-        importance = self._feature_importance(features, policy)
-
-        # Data hash for audit reproducibility
-        data_hash = stable_hash({"features": features})
-
-        # Trace id (policy + features)
-        trace_id = self._trace_id(features, policy)
-
-        ts = time.time()
-
-        return DecisionOutput(
-            prediction=score,
-            confidence=conf,
-            feature_importance=importance,
-            trace_id=trace_id,
-            model_version=self.model_version,
-            data_hash=data_hash,
-            timestamp=ts,
-        )
\ No newline at end of file
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import time
+
+from modules.decision.hashing import HASH_SCHEMES, stable_hash  # noqa: F401 (re-exported)
+from modules.decision.models import ModelBackend, ModelRegistry, resolve_model
+from modules.decision.policy import CompiledPolicy, PolicyLike, compile_policy
+from modules.decision.ranking import DEFAULT_TOP_K, top_k_batch, top_k_indices
+from modules.decision.sparse import SparseBatch
+from modules.telemetry.tracing import NULL_TELEMETRY, Telemetry
+
+
+DEFAULT_MODEL_VERSION = "v1.0"
+
+
+@dataclass(frozen=True)
+class DecisionOutput:
+    """
+    Immutable decision artifact passed to downstream modules.
+    """
+    prediction: float
+    confidence: float
+    feature_importance: Dict[str, float]
+    trace_id: str
+    model_version: str
+    data_hash: str
+    timestamp: float
+    # Top features by |importance|, largest first (computed once, reused downstream)
+    ranking: Tuple[str, ...] = ()
+
+
+class DecisionModule:
+    """
+    Decision module:
+    - Deterministic inference (seeded) for reproducibility
+    - Transparent feature weighting via provided 'policy' dict
+    - Emits traceable artifacts (trace_id, data_hash, model_version)
+
+    hash_scheme selects the data_hash/trace_id encoding: "json" (default)
+    reproduces historical digests, "binary" is the faster float encoding.
+    rank_k sets how many top features are ranked onto each DecisionOutput.
+    telemetry records "decision.score" and "decision.hash" stage timings.
+
+    model is an optional ModelBackend, or a ModelRegistry from which the
+    model_version is loaded lazily. Its output is blended into the score as
+    (1 - model_weight) * policy score + model_weight * model output;
+    feature_importance, ranking and the hashes stay policy-based. Without a
+    model the score is the policy score alone. model_version defaults to the
+    backend's own version, or "v1.0" without one.
+    """
+
+    def __init__(
+        self,
+        model: Optional[Union[ModelBackend, ModelRegistry]] = None,
+        model_version: Optional[str] = None,
+        seed: int = 42,
+        hash_scheme: str = "json",
+        rank_k: int = DEFAULT_TOP_K,
+        telemetry: Optional[Telemetry] = None,
+        model_weight: float = 0.5,
+    ):
+        if hash_scheme not in HASH_SCHEMES:
+            raise ValueError(f"Unknown hash scheme {hash_scheme!r}; expected one of {HASH_SCHEMES}")
+        if not 0.0 <= model_weight <= 1.0:
+            raise ValueError(f"model_weight must lie in [0, 1], got {model_weight}")
+        # Seed numpy for deterministic behavior
+        np.random.seed(seed)
+        self.model = model
+        if model_version is None and model is not None and not isinstance(model, ModelRegistry):
+            model_version = getattr(model, "version", None)
+        self.model_version = model_version if model_version is not None else DEFAULT_MODEL_VERSION
+        self.model_weight = model_weight
+        self.hash_scheme = hash_scheme
+        self.rank_k = rank_k
+        self.telemetry = telemetry if telemetry is not None else NULL_TELEMETRY
+
+    def _score_with_policy(self, features: Dict[str, float], policy: PolicyLike) -> float:
+        """
+        Compute a simple, transparent score using policy weights.
+        Score is the weighted dot product normalized by weight vector norm.
+        """
+        weights, norm = compile_policy(policy).layout(features.keys())
+        xs = np.fromiter(features.values(), dtype=float, count=len(features))
+        score = float(np.dot(weights, xs) / norm)
+        return score
+
+    def model_identity(self) -> Optional[str]:
+        """
+        Digest of the model that scores this module's decisions, or None.
+        """
+        model = resolve_model(self.model, self.model_version)
+        return model.digest if model is not None else None
+
+    def _blend(self, scores: np.ndarray, matrix: np.ndarray, names: Sequence[str]) -> np.ndarray:
+        """
+        Blend policy scores with the model's batched output (no-op without a model).
+        """
+        model = resolve_model(self.model, self.model_version)
+        if model is None:
+            return scores
+        predicted = np.asarray(model.predict(matrix, names), dtype=float)
+        return (1.0 - self.model_weight) * scores + self.model_weight * predicted
+
+    def _blend_sparse(self, scores: np.ndarray, batch: SparseBatch) -> np.ndarray:
+        """
+        Blend sparse policy scores, densifying only the columns the model reads.
+        """
+        model = resolve_model(self.model, self.model_version)
+        index = batch.vocabulary.index
+        names = [n for n in model.feature_names if n in index]
+        dense = np.zeros((len(batch), len(names)))
+        if names:
+            cols = np.array([index[n] for n in names])
+            order = np.argsort(cols)
+            pos = np.searchsorted(cols[order], batch.indices).clip(max=len(cols) - 1)
+            hit = cols[order][pos] == batch.indices
+            dense[batch.row_ids[hit], order[pos[hit]]] = batch.values[hit]
+        predicted = np.asarray(model.predict(dense, names), dtype=float)
+        return (1.0 - self.model_weight) * scores + self.model_weight * predicted
+
+    def _confidence(self, score: float) -> float:
+        """
+        Map score to [0,1] using a logistic function.
+        """
+        return float(1.0 / (1.0 + np.exp(-score)))
+
+    def _feature_importance(self, features: Dict[str, float], policy: PolicyLike) -> Dict[str, float]:
+        """
+        Simple importance: product of feature value and its explicit policy weight.
+        """
+        weights, _ = compile_policy(policy).layout(features.keys())
+        return {k: float(w * v) for (k, v), w in zip(features.items(), weights.tolist())}
+
+    def _hashes(self, features: Dict[str, float], compiled: CompiledPolicy) -> Tuple[str, str]:
+        """
+        Compute (data_hash, trace_id) with the policy part pre-hashed.
+        In "json" mode the payloads are byte-identical to
+        stable_hash({"features": ...}) and stable_hash({"features": ..., "policy": ...}).
+        """
+        return compiled.hasher(self.hash_scheme).hash_features(features)
+
+    def _trace_id(self, features: Dict[str, float], policy: PolicyLike) -> str:
+        """
+        Compose a trace id from hashed feature/policy payload and timestamp bucket.
+        """
+        return self._hashes(features, compile_policy(policy))[1]
+
+    def run(self, features: Dict[str, float], policy: PolicyLike) -> DecisionOutput:
+        """
+        Execute deterministic scoring and produce decision artifacts.
+
+        Args:
+            features: sanitized, non-sensitive feature values (name -> float)
+            policy: explicit weights and constraints (name -> float), or a
+                CompiledPolicy built once with compile_policy()
+
+        Returns:
+            DecisionOutput with prediction, confidence, importance, and trace metadata.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        compiled = compile_policy(policy)
+        score = self._score_with_policy(features, compiled)
+        if self.model is not None:
+            xs = np.fromiter(features.values(), dtype=float, count=len(features))
+            score = float(self._blend(np.array([score]), xs[None, :], list(features))[0])
+        conf = self._confidence(score)
+        importance = self._feature_importance(features, compiled)
+        names = list(importance.keys())
+        values = np.fromiter(importance.values(), dtype=float, count=len(names))
+        ranking = tuple(names[i] for i in top_k_indices(values, self.rank_k))
+
+        # Data hash for audit reproducibility, trace id (policy + features)
+        t1 = telemetry.now() if telemetry.enabled else 0.0
+        data_hash, trace_id = self._hashes(features, compiled)
+
+        if telemetry.enabled:
+            t2 = telemetry.now()
+            telemetry.record("decision.score", trace_id, t0, t1)
+            telemetry.record("decision.hash", trace_id, t1, t2)
+
+        ts = time.time()
+
+        return DecisionOutput(
+            prediction=score,
+            confidence=conf,
+            feature_importance=importance,
+            trace_id=trace_id,
+            model_version=self.model_version,
+            data_hash=data_hash,
+            timestamp=ts,
+            ranking=ranking,
+        )
+
+    def _batch_matrix(
+        self,
+        features: Union[np.ndarray, Sequence[Dict[str, float]]],
+        feature_names: Optional[Sequence[str]],
+    ):
+        """
+        Normalize batch input to (names, N x F matrix, per-row dicts).
+        Row dicts are kept as given so hashes match single-row runs exactly;
+        for matrix input they are None and built only when needed.
+        """
+        if isinstance(features, np.ndarray):
+            if feature_names is None:
+                raise ValueError("feature_names is required when features is a matrix")
+            names = list(feature_names)
+            matrix = np.asarray(features, dtype=float)
+            if matrix.ndim != 2 or matrix.shape[1] != len(names):
+                raise ValueError(
+                    f"Expected an N x {len(names)} feature matrix, got shape {matrix.shape}"
+                )
+            return names, matrix, None
+
+        rows = list(features)
+        if feature_names is not None:
+            names = list(feature_names)
+        else:
+            names = list(rows[0].keys()) if rows else []
+        name_set = set(names)
+        for i, row in enumerate(rows):
+            if len(row) != len(names) or not name_set.issuperset(row):
+                raise ValueError(f"Row {i} does not match feature names {names}")
+        matrix = np.array([[row[k] for k in names] for row in rows], dtype=float)
+        return names, matrix.reshape(len(rows), len(names)), rows
+
+    def run_batch(
+        self,
+        features: Union[np.ndarray, Sequence[Dict[str, float]]],
+        policy: PolicyLike,
+        feature_names: Optional[Sequence[str]] = None,
+    ) -> List[DecisionOutput]:
+        """
+        Score many rows at once with the same numbers as calling `run` per row.
+
+        Args:
+            features: N x F matrix (with feature_names) or a list of feature dicts
+                sharing the same keys
+            policy: explicit weights and constraints (name -> float), or a
+                CompiledPolicy
+            feature_names: column names for a matrix input
+
+        Returns:
+            List of DecisionOutput, one per row, in input order.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        names, matrix, rows = self._batch_matrix(features, feature_names)
+        if matrix.shape[0] == 0:
+            return []
+
+        compiled = compile_policy(policy)
+        weights, norm = compiled.layout(names)
+        scores = self._blend(matrix @ weights / norm, matrix, names)
+        confs = 1.0 / (1.0 + np.exp(-scores))
+        importances = matrix * weights
+        top = top_k_batch(importances, self.rank_k)
+
+        hasher = compiled.hasher(self.hash_scheme)
+        if rows is None or self.hash_scheme == "binary":
+            hashes = hasher.hash_batch(matrix, names)
+        else:
+            hashes = hasher.hash_batch(rows)
+
+        ts = time.time()
+        outputs = []
+        rows_out = zip(hashes, scores.tolist(), confs.tolist(), importances.tolist(), top.tolist())
+        for (data_hash, trace_id), score, conf, imp, top_idx in rows_out:
+            outputs.append(DecisionOutput(
+                prediction=score,
+                confidence=conf,
+                feature_importance=dict(zip(names, imp)),
+                trace_id=trace_id,
+                model_version=self.model_version,
+                data_hash=data_hash,
+                timestamp=ts,
+                ranking=tuple(names[i] for i in top_idx),
+            ))
+        if telemetry.enabled:
+            telemetry.record("decision.batch", None, t0, telemetry.now(), rows=len(outputs))
+        return outputs
+
+    def run_sparse(self, batch: SparseBatch, policy: PolicyLike) -> List[DecisionOutput]:
+        """
+        Score CSR-style sparse rows against the batch's feature vocabulary.
+
+        Each row's score is the dot product of its stored entries with the
+        policy weights (0.0 for features the policy does not name), divided
+        by the norm of the full policy weight vector. A row holding exactly
+        the policy's features scores as in run_batch; other rows generally
+        do not, so sparse decisions hash in their own data_hash/trace_id
+        domain. The cost grows with the stored entries, not with the
+        vocabulary size.
+
+        Args:
+            batch: SparseBatch (indices into batch.vocabulary, values)
+            policy: explicit weights and constraints (name -> float), or a
+                CompiledPolicy
+
+        Returns:
+            List of DecisionOutput, one per row, in input order.
+        """
+        n = len(batch)
+        if n == 0:
+            return []
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        compiled = compile_policy(policy)
+        weights = batch.vocabulary.weights_for(compiled)
+        contributions = batch.values * weights[batch.indices]
+        scores = np.bincount(batch.row_ids, weights=contributions, minlength=n) / compiled.norm
+        if self.model is not None:
+            scores = self._blend_sparse(scores, batch)
+        confs = 1.0 / (1.0 + np.exp(-scores))
+
+        names = batch.vocabulary.names
+        keys = [names[j] for j in batch.indices.tolist()]
+        imps = contributions.tolist()
+        bounds = batch.indptr.tolist()
+        rows = batch.row_dicts()
+        hashes = compiled.hasher(self.hash_scheme, sparse=True).hash_batch(rows)
+
+        ts = time.time()
+        outputs = []
+        for i, (data_hash, trace_id) in enumerate(hashes):
+            a, b = bounds[i], bounds[i + 1]
+            row_keys = keys[a:b]
+            top = top_k_indices(contributions[a:b], self.rank_k)
+            outputs.append(DecisionOutput(
+                prediction=float(scores[i]),
+                confidence=float(confs[i]),
+                feature_importance=dict(zip(row_keys, imps[a:b])),
+                trace_id=trace_id,
+                model_version=self.model_version,
+                data_hash=data_hash,
+                timestamp=ts,
+                ranking=tuple(row_keys[j] for j in top.tolist()),
+            ))
+        if telemetry.enabled:
+            telemetry.record("decision.sparse", None, t0, telemetry.now(), rows=n, nnz=batch.nnz)
+        return outputs
\ No newline at end of file
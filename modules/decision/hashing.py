@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import struct
+import numpy as np
+
+
+def canonical_json(obj: Any) -> str:
+    """
+    Serialize an object to the canonical JSON form used for all audit hashes
+    (sorted keys, no whitespace).
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+
+
+def stable_hash(obj: Any) -> str:
+    """
+    Create a stable hex hash for any JSON-serializable object.
+    Ensures deterministic data hashing across runs and platforms.
+    """
+    payload = canonical_json(obj)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Supported encodings for data_hash / trace_id:
+# - "json": canonical JSON payloads, reproduces historical digests (default)
+# - "binary": sorted feature names + little-endian float64 values
+HASH_SCHEMES = ("json", "binary")
+
+_BINARY_DOMAIN = b"modular-agent/features/v1\x00"
+# Sparse rows score differently from dense ones, so they hash in their own domain
+_SPARSE_DOMAIN = b"modular-agent/sparse-features/v1\x00"
+
+
+def encode_feature_names(names: Sequence[str]) -> bytes:
+    """
+    Length-prefixed UTF-8 encoding of an (already sorted) feature name list.
+    """
+    parts = [struct.pack("<I", len(names))]
+    for name in names:
+        raw = name.encode("utf-8")
+        parts.append(struct.pack("<I", len(raw)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def encode_features(features: Dict[str, float], sparse: bool = False) -> bytes:
+    """
+    Deterministic binary encoding of a feature dict: sorted names followed by
+    the values as little-endian float64. Negative zero is folded into zero.
+    """
+    names = sorted(features)
+    values = np.array([features[k] for k in names], dtype="<f8") + 0.0
+    domain = _SPARSE_DOMAIN if sparse else _BINARY_DOMAIN
+    return domain + encode_feature_names(names) + values.tobytes()
+
+
+class FeatureHasher:
+    """
+    Incremental data_hash / trace_id computation for one policy.
+
+    The policy part of the trace payload is absorbed into a SHA-256 state
+    once; per decision only the feature part is hashed and the prepared
+    states are copied. With sparse, payloads use the "sparse_features" key
+    (json) or the sparse domain (binary), so sparse and dense decisions on
+    the same row never share a data_hash or trace_id.
+    """
+
+    def __init__(self, policy_canonical: str, policy_digest: str, scheme: str = "json", sparse: bool = False):
+        if scheme not in HASH_SCHEMES:
+            raise ValueError(f"Unknown hash scheme {scheme!r}; expected one of {HASH_SCHEMES}")
+        self.scheme = scheme
+        self.sparse = sparse
+        self.policy_digest = policy_digest
+        self._policy_suffix = f',"policy":{policy_canonical}}}'.encode("utf-8")
+        self._json_prefix = hashlib.sha256(b'{"sparse_features":' if sparse else b'{"features":')
+        self._domain = _SPARSE_DOMAIN if sparse else _BINARY_DOMAIN
+        trace_domain = b"modular-agent/sparse-trace/v1\x00" if sparse else b"modular-agent/trace/v1\x00"
+        self._binary_trace = hashlib.sha256(trace_domain + bytes.fromhex(policy_digest))
+        self._names_cache: Dict[Tuple[str, ...], Tuple[np.ndarray, Any]] = {}
+
+    def _finish(self, data: Any, trace: Any) -> Tuple[str, str]:
+        return data.hexdigest(), f"trace-{trace.hexdigest()[:16]}"
+
+    def hash_features(self, features: Dict[str, float]) -> Tuple[str, str]:
+        """
+        Return (data_hash, trace_id) for one feature dict.
+        """
+        if self.scheme == "json":
+            body = canonical_json(features).encode("utf-8")
+            data = self._json_prefix.copy()
+            data.update(body)
+            trace = data.copy()
+            data.update(b"}")
+            trace.update(self._policy_suffix)
+            return self._finish(data, trace)
+
+        order, data = self._binary_layout(features.keys())
+        values = np.fromiter(features.values(), dtype="<f8", count=len(features))[order] + 0.0
+        data = data.copy()
+        data.update(values.tobytes())
+        trace = self._binary_trace.copy()
+        trace.update(data.digest())
+        return self._finish(data, trace)
+
+    def _binary_layout(self, names: Sequence[str]):
+        key = tuple(names)
+        cached = self._names_cache.get(key)
+        if cached is None:
+            order = np.array(sorted(range(len(key)), key=key.__getitem__), dtype=np.intp)
+            sorted_names = [key[i] for i in order]
+            base = hashlib.sha256(self._domain + encode_feature_names(sorted_names))
+            cached = (order, base)
+            if len(self._names_cache) >= 32:
+                self._names_cache.pop(next(iter(self._names_cache)))
+            self._names_cache[key] = cached
+        return cached
+
+    def hash_batch(
+        self,
+        rows: Union[np.ndarray, Sequence[Dict[str, float]]],
+        feature_names: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Hash many rows. Accepts a list of feature dicts or an N x F matrix with
+        feature_names. In binary mode a matrix is hashed without building any
+        per-row dicts; the name block is absorbed once per layout.
+        """
+        if isinstance(rows, np.ndarray):
+            if feature_names is None:
+                raise ValueError("feature_names is required when rows is a matrix")
+            names = list(feature_names)
+            if self.scheme == "json":
+                return [self.hash_features(dict(zip(names, r))) for r in rows.tolist()]
+            order, base = self._binary_layout(names)
+            values = np.ascontiguousarray(rows[:, order], dtype="<f8") + 0.0
+            results = []
+            for raw in values:
+                data = base.copy()
+                data.update(raw.tobytes())
+                trace = self._binary_trace.copy()
+                trace.update(data.digest())
+                results.append(self._finish(data, trace))
+            return results
+        return [self.hash_features(r) for r in rows]
+
+
+def verify_data_hash(features: Dict[str, float], data_hash: str, scheme: str = "json", sparse: bool = False) -> bool:
+    """
+    Check a recorded data_hash against the original features. Use scheme="json"
+    for bundles produced before the binary encoding existed, and sparse=True
+    for decisions made by DecisionModule.run_sparse.
+    """
+    if scheme == "json":
+        return stable_hash({"sparse_features" if sparse else "features": features}) == data_hash
+    if scheme == "binary":
+        return hashlib.sha256(encode_features(features, sparse)).hexdigest() == data_hash
+    raise ValueError(f"Unknown hash scheme {scheme!r}; expected one of {HASH_SCHEMES}")
\ No newline at end of file
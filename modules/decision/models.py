@@ -0,0 +1,268 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import hashlib
+import os
+import threading
+import numpy as np
+
+MODEL_KINDS = ("linear", "logistic")
+
+
+class ModelBackend(ABC):
+    """
+    Batched scoring model used by DecisionModule next to the policy score.
+
+    predict() maps an N x F matrix (columns named by feature_names) to N
+    scores on the same scale as the policy score, i.e. before the logistic.
+    Columns the model does not know are ignored; features it expects but
+    the input lacks count as 0. feature_names lists the features the model
+    reads, so sparse batches only densify those columns.
+    """
+
+    version: str = "unversioned"
+    feature_names: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def predict(self, matrix: np.ndarray, feature_names: Sequence[str]) -> np.ndarray:
+        """
+        Scores for every row of matrix, before the logistic.
+        """
+
+    def linear_terms(self, feature_names: Sequence[str]) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        (weights aligned to feature_names, bias) when predict is linear in
+        its input, else None. Counterfactual search needs the linear form.
+        """
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate resident size, used for the registry's memory budget.
+        """
+        return 0
+
+    @property
+    def digest(self) -> str:
+        """
+        Identity of the model's parameters, used in cache fingerprints.
+        Backends should override this with a content hash.
+        """
+        return f"{type(self).__name__}:{self.version}"
+
+
+class LinearModel(ModelBackend):
+    """
+    Reference NumPy backend: score = weights . x + bias.
+
+    kind "logistic" marks weights trained as a logistic regression; predict
+    still returns the logit (so it blends with the policy score before the
+    logistic) and predict_proba gives probabilities.
+    """
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        weights: Sequence[float],
+        bias: float = 0.0,
+        kind: str = "linear",
+        version: str = "unversioned",
+    ):
+        if kind not in MODEL_KINDS:
+            raise ValueError(f"Unknown model kind {kind!r}; expected one of {MODEL_KINDS}")
+        self.feature_names: Tuple[str, ...] = tuple(feature_names)
+        self.weights = np.asarray(weights, dtype=float)
+        if self.weights.shape != (len(self.feature_names),):
+            raise ValueError(f"Expected {len(self.feature_names)} weights, got shape {self.weights.shape}")
+        self.weights.setflags(write=False)
+        self.bias = float(bias)
+        self.kind = kind
+        self.version = version
+        self._index = {name: i for i, name in enumerate(self.feature_names)}
+        self._layouts: "OrderedDict[Tuple[str, ...], np.ndarray]" = OrderedDict()
+        self._digest: Optional[str] = None
+
+    def layout(self, feature_names: Sequence[str]) -> np.ndarray:
+        """
+        Model weights aligned to an input column order (0.0 for unknown columns).
+        """
+        key = tuple(feature_names)
+        weights = self._layouts.get(key)
+        if weights is None:
+            weights = np.array([self.weights[self._index[n]] if n in self._index else 0.0 for n in key])
+            self._layouts[key] = weights
+            if len(self._layouts) > 32:
+                self._layouts.popitem(last=False)
+        return weights
+
+    def predict(self, matrix: np.ndarray, feature_names: Sequence[str]) -> np.ndarray:
+        return np.asarray(matrix, dtype=float) @ self.layout(feature_names) + self.bias
+
+    def linear_terms(self, feature_names: Sequence[str]) -> Optional[Tuple[np.ndarray, float]]:
+        return self.layout(feature_names), self.bias
+
+    def predict_proba(self, matrix: np.ndarray, feature_names: Sequence[str]) -> np.ndarray:
+        if self.kind != "logistic":
+            raise ValueError("predict_proba is only defined for logistic models")
+        return 1.0 / (1.0 + np.exp(-self.predict(matrix, feature_names)))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.weights.nbytes + sum(len(n) + 56 for n in self.feature_names))
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            h = hashlib.sha256()
+            h.update("\x00".join((self.kind, *self.feature_names)).encode("utf-8"))
+            h.update(np.append(self.weights, self.bias).astype("<f8").tobytes())
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def save(self, path: str) -> None:
+        """
+        Write the model as a .npz file (no pickled objects).
+        """
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                feature_names=np.array(self.feature_names, dtype=str),
+                weights=self.weights,
+                bias=np.array(self.bias),
+                kind=np.array(self.kind),
+            )
+
+    @classmethod
+    def load(cls, path: str, version: Optional[str] = None) -> "LinearModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature_names=data["feature_names"].tolist(),
+                weights=data["weights"],
+                bias=float(data["bias"]),
+                kind=str(data["kind"]),
+                version=version or os.path.splitext(os.path.basename(path))[0],
+            )
+
+
+Loader = Callable[[str, str], ModelBackend]
+
+
+def _load_npz(path: str, version: str) -> ModelBackend:
+    return LinearModel.load(path, version)
+
+
+class ModelRegistry:
+    """
+    Model versions loaded lazily from a directory of model files.
+
+    A version "v2" is read from <directory>/v2.<ext> (or a path given to
+    register()) with the loader for its extension on first use. Loaded
+    models stay in memory in LRU order while their total nbytes fits
+    memory_budget; the least recently used ones are evicted beyond that
+    (the model just requested is always kept). Safe to share between
+    threads. A pickled registry (e.g. sent to pool workers) carries its
+    directory, paths and loaders but no loaded models, so custom loaders
+    must be picklable (module-level functions).
+    """
+
+    def __init__(
+        self,
+        directory: str = "models",
+        memory_budget: int = 256 * 1024 * 1024,
+        loaders: Optional[Dict[str, Loader]] = None,
+    ):
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.loaders: Dict[str, Loader] = {".npz": _load_npz}
+        self.loaders.update(loaders or {})
+        self.paths: Dict[str, str] = {}
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self._models: "OrderedDict[str, ModelBackend]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        for name in ("_models", "_bytes", "_lock"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._models = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def register(self, version: str, path: str) -> None:
+        """
+        Map a version to a model file outside the registry directory.
+        """
+        self.paths[version] = path
+
+    def versions(self) -> List[str]:
+        """
+        Versions that can be loaded (registered or found in the directory).
+        """
+        found = set(self.paths)
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                stem, ext = os.path.splitext(name)
+                if ext in self.loaders:
+                    found.add(stem)
+        return sorted(found)
+
+    def _path(self, version: str) -> str:
+        if version in self.paths:
+            return self.paths[version]
+        for ext in self.loaders:
+            path = os.path.join(self.directory, f"{version}{ext}")
+            if os.path.exists(path):
+                return path
+        raise KeyError(f"No model file for version {version!r} in {self.directory}")
+
+    def get(self, version: str) -> ModelBackend:
+        """
+        The model for a version, loading it on first use.
+        """
+        with self._lock:
+            model = self._models.get(version)
+            if model is not None:
+                self._models.move_to_end(version)
+                self.hits += 1
+                return model
+            path = self._path(version)
+            loader = self.loaders.get(os.path.splitext(path)[1])
+            if loader is None:
+                raise ValueError(f"No loader for model file {path}")
+            model = loader(path, version)
+            self.loads += 1
+            self._models[version] = model
+            self._bytes += model.nbytes
+            while self._bytes > self.memory_budget and len(self._models) > 1:
+                _, cold = self._models.popitem(last=False)
+                self._bytes -= cold.nbytes
+                self.evictions += 1
+            return model
+
+    def loaded(self) -> List[str]:
+        """
+        Versions currently in memory, least recently used first.
+        """
+        with self._lock:
+            return list(self._models)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+def resolve_model(model: Union[None, ModelBackend, ModelRegistry], version: str) -> Optional[ModelBackend]:
+    """
+    The backend to score with: a registry is asked for `version`.
+    """
+    if isinstance(model, ModelRegistry):
+        return model.get(version)
+    return model
\ No newline at end of file
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple, Union
+import hashlib
+import numpy as np
+
+from modules.decision.hashing import FeatureHasher, canonical_json
+
+
+class CompiledPolicy:
+    """
+    Pre-processed policy weights for repeated scoring.
+
+    Holds the ordered policy keys, the weight vector, its norm and the
+    canonical JSON/digest of the policy so none of them are rebuilt per
+    decision. Feature layouts that differ from the policy key order are
+    resolved once and cached on the instance.
+    """
+
+    # Bound on distinct feature orderings remembered per policy
+    max_layouts = 32
+
+    def __init__(self, policy: Dict[str, float]):
+        self.policy = dict(policy)
+        self.keys: Tuple[str, ...] = tuple(self.policy.keys())
+        self.weights = np.array([self.policy[k] for k in self.keys], dtype=float)
+        self.weights.setflags(write=False)
+        # Avoid divide-by-zero with small epsilon (same as DecisionModule)
+        self.norm = float(np.linalg.norm(self.weights) + 1e-9)
+        self.canonical = canonical_json(self.policy)
+        self.digest = hashlib.sha256(self.canonical.encode("utf-8")).hexdigest()
+        self._layouts: "OrderedDict[Tuple[str, ...], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._layouts[self.keys] = (self.weights, self.norm)
+        self._hashers: Dict[Tuple[str, bool], FeatureHasher] = {}
+
+    def weight(self, name: str) -> float:
+        """
+        Explicit weight for a feature; features without one default to 1.0.
+        """
+        return self.policy.get(name, 1.0)
+
+    def layout(self, names: Sequence[str]) -> Tuple[np.ndarray, float]:
+        """
+        Weight vector and norm aligned to the given feature order.
+        """
+        key = tuple(names)
+        cached = self._layouts.get(key)
+        if cached is not None:
+            return cached
+        weights = np.array([self.policy.get(k, 1.0) for k in key], dtype=float)
+        weights.setflags(write=False)
+        entry = (weights, float(np.linalg.norm(weights) + 1e-9))
+        self._layouts[key] = entry
+        if len(self._layouts) > self.max_layouts:
+            # Never drop the policy's own layout
+            for k in self._layouts:
+                if k != self.keys:
+                    del self._layouts[k]
+                    break
+        return entry
+
+    def hasher(self, scheme: str = "json", sparse: bool = False) -> FeatureHasher:
+        """
+        Feature hasher with this policy's digest already absorbed.
+        """
+        hasher = self._hashers.get((scheme, sparse))
+        if hasher is None:
+            hasher = FeatureHasher(self.canonical, self.digest, scheme, sparse)
+            self._hashers[(scheme, sparse)] = hasher
+        return hasher
+
+    def __repr__(self) -> str:
+        return f"CompiledPolicy(keys={len(self.keys)}, digest={self.digest[:12]})"
+
+
+PolicyLike = Union[Dict[str, float], CompiledPolicy]
+
+_CACHE: "OrderedDict[str, CompiledPolicy]" = OrderedDict()
+_CACHE_SIZE = 64
+
+
+def compile_policy(policy: PolicyLike) -> CompiledPolicy:
+    """
+    Return a compiled policy, reusing a cached instance for identical content.
+    Already-compiled policies are returned unchanged.
+    """
+    if isinstance(policy, CompiledPolicy):
+        return policy
+    canonical = canonical_json(policy)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    compiled = _CACHE.get(digest)
+    if compiled is not None and list(compiled.keys) == list(policy.keys()):
+        _CACHE.move_to_end(digest)
+        return compiled
+    compiled = CompiledPolicy(policy)
+    _CACHE[digest] = compiled
+    if len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return compiled
\ No newline at end of file
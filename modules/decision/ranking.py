@@ -0,0 +1,62 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Default number of top features reported by explanations and audit metrics
+DEFAULT_TOP_K = 3
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest |values|, largest first.
+
+    Uses partial selection (O(F)) instead of a full sort. Ties are broken by
+    position, matching a stable sort on -abs(value).
+    """
+    mags = np.abs(np.asarray(values, dtype=float))
+    n = mags.size
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-mags, kind="stable")
+    kth = -np.partition(-mags, k - 1)[k - 1]
+    greater = np.flatnonzero(mags > kth)
+    equal = np.flatnonzero(mags == kth)[: k - greater.size]
+    chosen = np.concatenate([greater, equal])
+    return chosen[np.argsort(-mags[chosen], kind="stable")]
+
+
+def top_k_batch(matrix: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row-wise top_k_indices for an N x F importance matrix (N x min(k, F)).
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    n, f = matrix.shape
+    k = max(0, min(k, f))
+    if f <= 64:
+        # Narrow rows: one stable argsort over the whole matrix is cheapest
+        return np.argsort(-np.abs(matrix), axis=1, kind="stable")[:, :k]
+    out = np.empty((n, k), dtype=np.intp)
+    for i in range(n):
+        out[i] = top_k_indices(matrix[i], k)
+    return out
+
+
+def top_k_features(importance: Dict[str, float], k: int) -> List[Tuple[str, float]]:
+    """
+    Top-k (name, importance) pairs by absolute importance.
+    """
+    names = list(importance.keys())
+    values = np.fromiter(importance.values(), dtype=float, count=len(names))
+    return [(names[i], importance[names[i]]) for i in top_k_indices(values, k)]
+
+
+def ranked_features(decision, k: int) -> List[Tuple[str, float]]:
+    """
+    Top-k features of a decision, reusing the ranking carried on the artifact
+    when it is long enough and recomputing otherwise.
+    """
+    importance = decision.feature_importance
+    ranking = getattr(decision, "ranking", ())
+    if len(ranking) >= k or len(ranking) == len(importance):
+        return [(name, importance[name]) for name in ranking[:k]]
+    return top_k_features(importance, k)
\ No newline at end of file
@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+import hashlib
+import numpy as np
+
+from modules.decision.policy import CompiledPolicy
+
+
+class FeatureVocabulary:
+    """
+    Fixed, ordered universe of feature names for sparse inputs.
+
+    Policy weights aligned to the vocabulary are computed once per policy
+    and cached here, so scoring a sparse row only touches its stored entries.
+    """
+
+    # Bound on distinct policies whose aligned weights are remembered
+    max_policies = 16
+
+    def __init__(self, names: Iterable[str]):
+        self.names: Tuple[str, ...] = tuple(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            raise ValueError("Feature vocabulary contains duplicate names")
+        self.digest = hashlib.sha256("\x00".join(self.names).encode("utf-8")).hexdigest()
+        self._weights: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def weights_for(self, compiled: CompiledPolicy) -> np.ndarray:
+        """
+        Weight per vocabulary entry: the policy weight, or 0.0 for features
+        the policy does not name.
+        """
+        weights = self._weights.get(compiled.digest)
+        if weights is None:
+            policy = compiled.policy
+            weights = np.fromiter((policy.get(n, 0.0) for n in self.names), dtype=float, count=len(self.names))
+            weights.setflags(write=False)
+            if len(self._weights) >= self.max_policies:
+                self._weights.pop(next(iter(self._weights)))
+            self._weights[compiled.digest] = weights
+        return weights
+
+
+class SparseBatch:
+    """
+    CSR-style batch of sparse feature rows against a FeatureVocabulary.
+
+    Row i holds the vocabulary indices indices[indptr[i]:indptr[i + 1]] with
+    the matching values. Indices are sorted within each row on construction;
+    duplicates are rejected.
+    """
+
+    def __init__(self, indptr, indices, values, vocabulary: FeatureVocabulary):
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int64)
+        values = np.asarray(values, dtype=float)
+        if indptr.ndim != 1 or indptr.size == 0 or indptr[0] != 0 or np.any(np.diff(indptr) < 0):
+            raise ValueError("indptr must be a non-decreasing array starting at 0")
+        if indptr[-1] != indices.size or indices.size != values.size:
+            raise ValueError(f"indptr ends at {indptr[-1]} but there are {indices.size} indices and {values.size} values")
+        if indices.size and (indices.min() < 0 or indices.max() >= len(vocabulary)):
+            raise ValueError(f"Feature indices must lie in [0, {len(vocabulary)})")
+
+        self.indptr = indptr
+        self.vocabulary = vocabulary
+        self.row_ids = np.repeat(np.arange(indptr.size - 1), np.diff(indptr))
+        order = np.lexsort((indices, self.row_ids))
+        self.indices, self.values = indices[order], values[order]
+        if np.any((np.diff(self.indices) == 0) & (np.diff(self.row_ids) == 0)):
+            raise ValueError("Duplicate feature index within a row")
+
+    @classmethod
+    def from_dicts(cls, rows: Sequence[Dict[str, float]], vocabulary: FeatureVocabulary) -> "SparseBatch":
+        """
+        Build a batch from per-row {feature: value} dicts of vocabulary names.
+        """
+        indptr, indices, values = [0], [], []
+        for i, row in enumerate(rows):
+            for name, value in row.items():
+                try:
+                    indices.append(vocabulary.index[name])
+                except KeyError:
+                    raise ValueError(f"Row {i} has feature {name!r} outside the vocabulary") from None
+                values.append(value)
+            indptr.append(len(indices))
+        return cls(indptr, indices, values, vocabulary)
+
+    def __len__(self) -> int:
+        return self.indptr.size - 1
+
+    @property
+    def nnz(self) -> int:
+        return int(self.indices.size)
+
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop], self.values[start:stop]
+
+    def row_dicts(self) -> List[Dict[str, float]]:
+        """
+        Per-row {feature: value} dicts of the stored entries, in vocabulary order.
+        """
+        names = self.vocabulary.names
+        keys = [names[j] for j in self.indices.tolist()]
+        values = self.values.tolist()
+        bounds = self.indptr.tolist()
+        return [dict(zip(keys[a:b], values[a:b])) for a, b in zip(bounds[:-1], bounds[1:])]
\ No newline at end of file
@@ -0,0 +1,143 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+import functools
+import os
+
+from modules.decision.ranking import DEFAULT_TOP_K
+
+# Shipped profiles, resolved from the repository root rather than the working directory
+DEFAULT_PROFILES_PATH = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "configs", "audiences", "example_profiles.yaml"
+))
+
+# Summary templates by summary_style. {features} is the ranked name list,
+# {features_with_values} adds signed importances at the plan's precision.
+SUMMARY_TEMPLATES = {
+    "default": "Prediction was primarily influenced by: {features}.",
+    "simple": "Your result was shaped most by {features}.",
+    "moderate": "Prediction was primarily influenced by: {features_with_values}.",
+    "concise": "Top drivers: {features_with_values}.",
+    "formal": (
+        "The decision was determined principally by the following features, "
+        "in descending order of influence: {features_with_values}."
+    ),
+}
+
+# Keys of ExplanationOutput.technical by technical_detail level
+TECHNICAL_FIELDS = {
+    "minimal": ("confidence",),
+    "medium": ("prediction", "confidence"),
+    "high": ("prediction", "confidence", "top_features", "model_version"),
+    "full": ("prediction", "confidence", "feature_importance", "model_version"),
+    "default": ("prediction", "confidence", "feature_importance", "model_version"),
+}
+
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """
+    Compiled rendering instructions for one audience profile.
+    """
+    audience: str
+    summary_template: str
+    technical_fields: Tuple[str, ...]
+    counterfactuals: bool = True
+    caveats: bool = True
+    top_k: int = DEFAULT_TOP_K
+    precision: int = 3
+    language_level: str = "default"
+    visualization: Optional[str] = None
+
+
+DEFAULT_PLAN = RenderPlan(
+    audience="default",
+    summary_template=SUMMARY_TEMPLATES["default"],
+    technical_fields=TECHNICAL_FIELDS["default"],
+)
+
+
+def compile_profile(audience: str, profile: Dict[str, Any]) -> RenderPlan:
+    """
+    Validate one audience profile and turn it into a RenderPlan.
+    """
+    style = profile.get("summary_style", "default")
+    detail = profile.get("technical_detail", "default")
+    if style not in SUMMARY_TEMPLATES:
+        raise ValueError(f"Audience {audience!r}: unknown summary_style {style!r}")
+    if detail not in TECHNICAL_FIELDS:
+        raise ValueError(f"Audience {audience!r}: unknown technical_detail {detail!r}")
+    return RenderPlan(
+        audience=audience,
+        summary_template=SUMMARY_TEMPLATES[style],
+        technical_fields=TECHNICAL_FIELDS[detail],
+        counterfactuals=bool(profile.get("counterfactuals", True)),
+        caveats=bool(profile.get("caveats", True)),
+        top_k=int(profile.get("top_k", DEFAULT_TOP_K)),
+        precision=int(profile.get("precision", 3)),
+        language_level=profile.get("language_level", "default"),
+        visualization=profile.get("visualization"),
+    )
+
+
+def compile_profiles(profiles: Dict[str, Dict[str, Any]]) -> Dict[str, RenderPlan]:
+    """
+    Compile every profile in a mapping (audience -> profile dict).
+    """
+    return {audience: compile_profile(audience, profile) for audience, profile in profiles.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def load_render_plans(path: str = DEFAULT_PROFILES_PATH) -> Dict[str, RenderPlan]:
+    """
+    Load and compile an audience profile YAML file (once per path per process).
+    """
+    try:
+        import yaml
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("Loading audience profiles requires PyYAML (pip install pyyaml)") from exc
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_profiles(yaml.safe_load(f) or {})
+
+
+def default_render_plans() -> Dict[str, RenderPlan]:
+    """
+    Plans from the shipped profile file, or none when the file or PyYAML
+    is unavailable (every audience then renders with the default plan).
+    """
+    if not os.path.exists(DEFAULT_PROFILES_PATH):
+        return {}
+    try:
+        return load_render_plans(DEFAULT_PROFILES_PATH)
+    except ImportError:
+        return {}
+
+
+class RenderCache:
+    """
+    Small LRU for rendered explanation text with hit/miss counters.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get_or_render(self, key: Hashable, render):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = render()
+            if self.maxsize > 0:
+                self._data[key] = value
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
\ No newline at end of file
@@ -1,89 +1,304 @@
-from dataclasses import dataclass
-from typing import Dict, List
-import math
-
-
-@dataclass(frozen=True)
-class ExplanationOutput:
-    """
-    Immutable explanation artifact derived from decision output.
-    """
-    summary: str
-    technical: Dict[str, float]
-    counterfactuals: List[Dict[str, float]]
-    caveats: List[str]
-    trace_id: str
-
-
-class ExplanationModule:
-    """
-    Explanation module:
-    - Translates decision artifacts into human-readable summaries
-    - Provides technical breakdown and counterfactuals
-    - Adds caveats and traceability
-    """
-
-    def __init__(self, audience: str = "default"):
-        self.audience = audience
-
-    def _generate_summary(self, importance: Dict[str, float]) -> str:
-        """
-        Create a readable summary based on top contributing features.
-        """
-        top_feats = sorted(importance.items(), key=lambda kv: -abs(kv[1]))[:3]
-        if not top_feats:
-            return "No significant features contributed to the decision."
-        feat_names = [k for k, _ in top_feats]
-        return f"Prediction was primarily influenced by: {', '.join(feat_names)}."
-
-    def _generate_counterfactuals(self, importance: Dict[str, float]) -> List[Dict[str, float]]:
-        """
-        Suggest simple what-if changes to top features and estimate impact.
-        """
-        counterfactuals = []
-        for k, v in sorted(importance.items(), key=lambda kv: -abs(kv[1]))[:3]:
-            delta = 0.1 * v
-            counterfactuals.append({
-                "feature": k,
-                "change": "+10%",
-                "estimated_impact": round(delta, 4)
-            })
-        return counterfactuals
-
-    def _generate_caveats(self) -> List[str]:
-        """
-        Add standard caveats for transparency.
-        """
-        return [
-            "No sensitive attributes were used.",
-            "Feature weights are explicitly defined by policy.",
-            "Confidence is derived from a logistic mapping of score."
-        ]
-
-    def run(self, decision) -> ExplanationOutput:
-        """
-        Generate explanation from decision output.
-
-        Args:
-            decision: DecisionOutput object
-
-        Returns:
-            ExplanationOutput with summary, technical details, counterfactuals, and caveats.
-        """
-        summary = self._generate_summary(decision.feature_importance)
-        technical = {
-            "prediction": decision.prediction,
-            "confidence": decision.confidence,
-            "feature_importance": decision.feature_importance,
-            "model_version": decision.model_version
-        }
-        counterfactuals = self._generate_counterfactuals(decision.feature_importance)
-        caveats = self._generate_caveats()
-
-        return ExplanationOutput(
-            summary=summary,
-            technical=technical,
-            counterfactuals=counterfactuals,
-            caveats=caveats,
-            trace_id=decision.trace_id
-        )
\ No newline at end of file
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import math
+import numpy as np
+
+from modules.decision.models import resolve_model
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.decision.ranking import ranked_features
+from modules.explanation.audience import DEFAULT_PLAN, RenderCache, RenderPlan, default_render_plans
+from modules.explanation.counterfactual import CounterfactualEngine
+from modules.telemetry.tracing import NULL_TELEMETRY, Telemetry
+
+
+@dataclass(frozen=True)
+class ExplanationOutput:
+    """
+    Immutable explanation artifact derived from decision output.
+    """
+    summary: str
+    technical: Dict[str, float]
+    counterfactuals: List[Dict[str, float]]
+    caveats: List[str]
+    trace_id: str
+
+
+class ExplanationModule:
+    """
+    Explanation module:
+    - Translates decision artifacts into human-readable summaries
+    - Provides technical breakdown and counterfactuals
+    - Adds caveats and traceability
+
+    Rendering follows a RenderPlan compiled from the audience profiles
+    (see modules/explanation/audience.py). Without profiles, the shipped
+    configs/audiences/example_profiles.yaml is used; unknown audiences use
+    the default plan. top_k overrides the plan's number of top features.
+    Summary text is memoized per (audience, top features, rounded values).
+    telemetry records the "explanation.render" stage timing for run and
+    run_many, and "explanation.batch" for run_batch.
+
+    With threshold set (the governance min_confidence), decisions below it
+    get solved counterfactuals from CounterfactualEngine when run is given
+    the decision's features and policy: the smallest single-feature and
+    multi-feature changes that lift confidence to the threshold, within
+    bounds and leaving immutable features alone. decision_module supplies
+    the blended model (model, model_version, model_weight) so the changes
+    flip the score the decision was actually made on. Other decisions keep
+    the "+10%" what-if estimates. run_batch solves every blocked row of a
+    batch at once.
+    """
+
+    # Bound on distinct (feature layout, policy, model) engines remembered
+    max_engines = 32
+
+    def __init__(
+        self,
+        audience: str = "default",
+        top_k: Optional[int] = None,
+        profiles: Optional[Dict[str, RenderPlan]] = None,
+        cache_size: int = 4096,
+        telemetry: Optional[Telemetry] = None,
+        threshold: Optional[float] = None,
+        decision_module: Optional[Any] = None,
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        immutable: Sequence[str] = (),
+    ):
+        self.audience = audience
+        self.plans = dict(profiles if profiles is not None else default_render_plans())
+        self.plan = self._plan_for(audience)
+        if top_k is not None:
+            self.plan = replace(self.plan, top_k=top_k)
+        self.top_k = self.plan.top_k
+        self.cache = RenderCache(cache_size)
+        self.telemetry = telemetry if telemetry is not None else NULL_TELEMETRY
+        self.threshold = threshold
+        self.decision_module = decision_module
+        self.bounds = dict(bounds or {})
+        self.immutable = tuple(immutable)
+        self._engines: "OrderedDict[Tuple[Any, ...], CounterfactualEngine]" = OrderedDict()
+
+    def _plan_for(self, audience: str) -> RenderPlan:
+        plan = self.plans.get(audience)
+        if plan is None:
+            plan = replace(DEFAULT_PLAN, audience=audience)
+        return plan
+
+    def _generate_summary(self, top_feats: List[Tuple[str, float]], plan: Optional[RenderPlan] = None) -> str:
+        """
+        Create a readable summary based on top contributing features.
+        """
+        if not top_feats:
+            return "No significant features contributed to the decision."
+        plan = plan or self.plan
+        names = tuple(k for k, _ in top_feats)
+        if "{features_with_values}" in plan.summary_template:
+            values = tuple(round(v, plan.precision) for _, v in top_feats)
+        else:
+            values = None
+
+        def render():
+            with_values = names if values is None else [
+                f"{k} ({v:+.{plan.precision}f})" for k, v in zip(names, values)
+            ]
+            return plan.summary_template.format(
+                features=", ".join(names),
+                features_with_values=", ".join(with_values),
+            )
+
+        return self.cache.get_or_render((plan.audience, plan.summary_template, names, values), render)
+
+    def _generate_counterfactuals(self, top_feats: List[Tuple[str, float]]) -> List[Dict[str, float]]:
+        """
+        Suggest simple what-if changes to top features and estimate impact.
+        """
+        counterfactuals = []
+        for k, v in top_feats:
+            delta = 0.1 * v
+            counterfactuals.append({
+                "feature": k,
+                "change": "+10%",
+                "estimated_impact": round(delta, 4)
+            })
+        return counterfactuals
+
+    def _generate_caveats(self) -> List[str]:
+        """
+        Add standard caveats for transparency.
+        """
+        return [
+            "No sensitive attributes were used.",
+            "Feature weights are explicitly defined by policy.",
+            "Confidence is derived from a logistic mapping of score."
+        ]
+
+    def _generate_technical(self, decision, top_feats: List[Tuple[str, float]], plan: RenderPlan) -> Dict[str, float]:
+        """
+        Technical breakdown limited to the fields the plan's detail level allows.
+        """
+        available = {
+            "prediction": lambda: decision.prediction,
+            "confidence": lambda: decision.confidence,
+            "feature_importance": lambda: decision.feature_importance,
+            "top_features": lambda: dict(top_feats),
+            "model_version": lambda: decision.model_version,
+        }
+        return {name: available[name]() for name in plan.technical_fields}
+
+    def _engine(self, names: Sequence[str], policy: PolicyLike) -> CounterfactualEngine:
+        """
+        Counterfactual engine for one feature layout, built once and reused.
+        """
+        compiled = compile_policy(policy)
+        decision_module = self.decision_module
+        model = None
+        if decision_module is not None and decision_module.model is not None:
+            model = resolve_model(decision_module.model, decision_module.model_version)
+        weight = decision_module.model_weight if model is not None else 0.0
+        key = (tuple(names), compiled.digest, model.digest if model is not None else None, weight)
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = CounterfactualEngine(
+                compiled, names, bounds=self.bounds, immutable=self.immutable, model=model, model_weight=weight
+            )
+            self._engines[key] = engine
+            if len(self._engines) > self.max_engines:
+                self._engines.popitem(last=False)
+        return engine
+
+    def solve_counterfactuals(
+        self,
+        decisions: Sequence,
+        features: Union[np.ndarray, Sequence[Dict[str, float]]],
+        policy: PolicyLike,
+        feature_names: Optional[Sequence[str]] = None,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Solved counterfactual records for every decision below threshold,
+        keyed by position. features are the rows the decisions were made
+        from: an N x F matrix with feature_names, or feature dicts (grouped
+        by layout, each layout solved in one vectorized pass).
+        """
+        if self.threshold is None:
+            return {}
+        if isinstance(features, np.ndarray):
+            layouts = {tuple(feature_names or ()): (list(range(len(decisions))), features)}
+        else:
+            groups: Dict[Tuple[str, ...], List[int]] = {}
+            for i, decision in enumerate(decisions):
+                if decision.confidence < self.threshold and features[i]:
+                    groups.setdefault(tuple(features[i]), []).append(i)
+            layouts = {
+                names: (idxs, np.array([list(features[i].values()) for i in idxs], dtype=float))
+                for names, idxs in groups.items()
+            }
+        solved = {}
+        for names, (idxs, matrix) in layouts.items():
+            blocked = self._engine(names, policy).for_blocked(matrix, self.threshold)
+            for row, records in blocked.items():
+                solved[idxs[row]] = records
+        return solved
+
+    def _render(
+        self,
+        decision,
+        plan: RenderPlan,
+        top_feats: List[Tuple[str, float]],
+        solved: Optional[List[Dict[str, Any]]] = None,
+    ) -> ExplanationOutput:
+        if not plan.counterfactuals:
+            counterfactuals = []
+        elif solved is not None:
+            counterfactuals = solved
+        else:
+            counterfactuals = self._generate_counterfactuals(top_feats)
+        return ExplanationOutput(
+            summary=self._generate_summary(top_feats, plan),
+            technical=self._generate_technical(decision, top_feats, plan),
+            counterfactuals=counterfactuals,
+            caveats=self._generate_caveats() if plan.caveats else [],
+            trace_id=decision.trace_id
+        )
+
+    def run(
+        self,
+        decision,
+        features: Optional[Dict[str, float]] = None,
+        policy: Optional[PolicyLike] = None,
+    ) -> ExplanationOutput:
+        """
+        Generate explanation from decision output.
+
+        Args:
+            decision: DecisionOutput object
+            features: the feature dict the decision was made from
+            policy: the policy it was scored with (features and policy are
+                needed for solved counterfactuals)
+
+        Returns:
+            ExplanationOutput with summary, technical details, counterfactuals, and caveats.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        solved = None
+        if features is not None and policy is not None and self.plan.counterfactuals:
+            solved = self.solve_counterfactuals([decision], [features], policy).get(0)
+        top_feats = ranked_features(decision, self.plan.top_k)
+        output = self._render(decision, self.plan, top_feats, solved)
+        if telemetry.enabled:
+            telemetry.record("explanation.render", decision.trace_id, t0, telemetry.now(),
+                             audience=self.plan.audience)
+        return output
+
+    def run_batch(
+        self,
+        decisions: Sequence,
+        features: Union[np.ndarray, Sequence[Dict[str, float]], None] = None,
+        policy: Optional[PolicyLike] = None,
+        feature_names: Optional[Sequence[str]] = None,
+    ) -> List[ExplanationOutput]:
+        """
+        Explanations for many decisions with the counterfactuals of every
+        decision below threshold solved together; otherwise identical to
+        calling `run` per decision.
+
+        Args:
+            decisions: DecisionOutput sequence
+            features: the rows the decisions were made from, as feature dicts
+                or an N x F matrix with feature_names
+            policy: the policy the decisions were scored with
+
+        Returns:
+            List of ExplanationOutput, one per decision.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        solved = {}
+        if features is not None and policy is not None and self.plan.counterfactuals:
+            solved = self.solve_counterfactuals(decisions, features, policy, feature_names)
+        outputs = [
+            self._render(decision, self.plan, ranked_features(decision, self.plan.top_k), solved.get(i))
+            for i, decision in enumerate(decisions)
+        ]
+        if telemetry.enabled:
+            telemetry.record("explanation.batch", None, t0, telemetry.now(), rows=len(outputs),
+                             audience=self.plan.audience)
+        return outputs
+
+    def run_many(self, decision, audiences: Sequence[str]) -> Dict[str, ExplanationOutput]:
+        """
+        Render one decision for several audiences in a single pass; the
+        feature ranking is computed once for the largest top_k requested.
+        """
+        plans = [self._plan_for(a) for a in audiences]
+        if not plans:
+            return {}
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        top_feats = ranked_features(decision, max(p.top_k for p in plans))
+        outputs = {plan.audience: self._render(decision, plan, top_feats[:plan.top_k]) for plan in plans}
+        if telemetry.enabled:
+            telemetry.record("explanation.render", decision.trace_id, t0, telemetry.now(),
+                             audience=",".join(outputs))
+        return outputs
\ No newline at end of file
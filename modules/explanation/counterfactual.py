@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from modules.decision.models import ModelBackend
+from modules.decision.policy import PolicyLike, compile_policy
+
+
+@dataclass
+class CounterfactualResult:
+    """
+    Minimal changes that move each row's confidence across the threshold.
+
+    All arrays are row-aligned with the input matrix; infeasible entries
+    are NaN (deltas) or -1 (best_feature).
+    """
+    feature_names: List[str]
+    features: np.ndarray
+    confidence: np.ndarray
+    threshold: float
+    single_delta: np.ndarray      # N x F: change needed if only feature j moves
+    best_feature: np.ndarray      # N: feature with the smallest single change
+    best_delta: np.ndarray        # N: that smallest change
+    multi_delta: np.ndarray       # N x F: minimal L2 change over all mutable features
+    multi_feasible: np.ndarray    # N: whether the multi-feature change exists
+
+    def for_row(self, i: int) -> List[Dict[str, float]]:
+        """
+        Counterfactual records for one row, in the ExplanationOutput style.
+        """
+        out = []
+        j = int(self.best_feature[i])
+        if j >= 0:
+            out.append({
+                "feature": self.feature_names[j],
+                "change": float(self.best_delta[i]),
+                "new_value": float(self.features[i, j] + self.best_delta[i]),
+                "target_confidence": self.threshold,
+            })
+        if self.multi_feasible[i]:
+            changes = {
+                name: float(d) for name, d in zip(self.feature_names, self.multi_delta[i]) if d != 0.0
+            }
+            out.append({
+                "feature": "+".join(changes),
+                "change": changes,
+                "l2_norm": float(np.linalg.norm(self.multi_delta[i])),
+                "target_confidence": self.threshold,
+            })
+        return out
+
+
+class CounterfactualEngine:
+    """
+    Closed-form counterfactual search for the policy score.
+
+    The score is s = w.x / ||w|| and confidence = 1 / (1 + exp(-s)), so
+    crossing a confidence threshold t needs w.dx = (logit(t) - s) * ||w||.
+    With a model blended in as DecisionModule does, the score
+    (1 - a) * w.x / ||w|| + a * (v.x + b) is still linear in x, so the
+    same search runs on the combined weights; the model must expose
+    linear_terms().
+    - Single feature j: dx_j = required / w_j, kept if it stays in bounds.
+    - Multi-feature: the minimal L2 change under box bounds is
+      dx = clip(lambda * w, lo - x, hi - x); lambda is found by a bisection
+      run on all rows at once.
+    Immutable features and zero weights never move.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyLike,
+        feature_names: Sequence[str],
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        immutable: Sequence[str] = (),
+        margin: float = 1e-9,
+        iterations: int = 60,
+        model: Optional[ModelBackend] = None,
+        model_weight: float = 0.5,
+    ):
+        self.feature_names = list(feature_names)
+        self.weights, self.norm = compile_policy(policy).layout(self.feature_names)
+        self.offset = 0.0
+        if model is not None:
+            terms = model.linear_terms(self.feature_names)
+            if terms is None:
+                raise ValueError(f"{type(model).__name__} has no linear terms; counterfactuals need a linear model")
+            model_weights, bias = terms
+            self.weights = (1.0 - model_weight) * self.weights / self.norm + model_weight * model_weights
+            self.norm = 1.0
+            self.offset = model_weight * bias
+        bounds = bounds or {}
+        self.lower = np.array([bounds.get(k, (-np.inf, np.inf))[0] for k in self.feature_names], dtype=float)
+        self.upper = np.array([bounds.get(k, (-np.inf, np.inf))[1] for k in self.feature_names], dtype=float)
+        frozen = set(immutable)
+        self.mutable = np.array([k not in frozen for k in self.feature_names]) & (self.weights != 0)
+        self.margin = margin
+        self.iterations = iterations
+
+    def solve(self, features: np.ndarray, threshold: float) -> CounterfactualResult:
+        """
+        Compute counterfactuals for every row of an N x F matrix.
+        Blocked rows (confidence < threshold) get changes that raise confidence
+        to the threshold; allowed rows get changes that drop below it.
+        """
+        if not 0.0 < threshold < 1.0:
+            raise ValueError("threshold must be strictly between 0 and 1")
+        if not self.feature_names:
+            raise ValueError("at least one feature is required")
+        x = np.asarray(features, dtype=float).reshape(-1, len(self.feature_names))
+        w = self.weights
+        score = x @ w / self.norm + self.offset
+        confidence = 1.0 / (1.0 + np.exp(-score))
+        target = np.log(threshold / (1.0 - threshold))
+        blocked = confidence < threshold
+        target_score = np.where(blocked, target + self.margin, target - self.margin)
+        required = (target_score - score) * self.norm        # needed change in w.x
+
+        lo = np.where(self.mutable, self.lower - x, 0.0)       # N x F room below
+        hi = np.where(self.mutable, self.upper - x, 0.0)       # N x F room above
+
+        # Single-feature changes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            single = required[:, None] / np.where(self.mutable, w, np.nan)
+        single[(single < lo) | (single > hi)] = np.nan
+        abs_single = np.where(np.isnan(single), np.inf, np.abs(single))
+        rows = np.arange(len(x))
+        best = np.argmin(abs_single, axis=1)
+        has_best = np.isfinite(abs_single[rows, best])
+        best_feature = np.where(has_best, best, -1)
+        best_delta = np.where(has_best, single[rows, best], np.nan)
+
+        multi, feasible = self._solve_multi(required, lo, hi)
+        return CounterfactualResult(
+            feature_names=self.feature_names,
+            features=x,
+            confidence=confidence,
+            threshold=threshold,
+            single_delta=single,
+            best_feature=best_feature,
+            best_delta=best_delta,
+            multi_delta=multi,
+            multi_feasible=feasible,
+        )
+
+    def _solve_multi(self, required: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        """
+        Vectorized bisection on lambda for w.clip(lambda * w, lo, hi) = required.
+        """
+        w = np.where(self.mutable, self.weights, 0.0)
+        w_abs = np.abs(w)
+        direction = np.sign(required)
+
+        # Room each feature has in the direction that moves the score toward
+        # the target; a feature only bounded on the other side is free here
+        moves_up = direction[:, None] * w > 0
+        room = np.where(moves_up, hi, -lo)
+        active = w != 0
+        free = active & ~np.isfinite(room)
+        capped = active & np.isfinite(room)
+        free_sq = np.sum(np.where(free, w ** 2, 0.0), axis=1)
+
+        # Bracket: beyond `limit` every capped feature is saturated and the
+        # free ones alone cover the required change
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(capped, np.abs(room) / np.where(w_abs > 0, w_abs, 1.0), 0.0)
+            limit = ratio.max(axis=1) if ratio.size else np.zeros(len(required))
+            free_limit = np.abs(required) / np.where(free_sq > 0, free_sq, 1.0)
+            limit = np.where(free_sq > 0, np.maximum(limit, free_limit), limit)
+        a = np.zeros_like(required)
+        b = direction * limit
+
+        def achieved(lam):
+            return np.sum(w * np.clip(lam[:, None] * w, lo, hi), axis=1)
+
+        feasible = np.abs(achieved(b)) >= np.abs(required) * (1.0 - 1e-12)
+        # Rows starting outside their bounds can still fall short; free
+        # features grow without limit, so widen until the target is reached
+        for _ in range(64):
+            short = (free_sq > 0) & ~feasible
+            if not short.any():
+                break
+            b = np.where(short, 2.0 * b, b)
+            feasible = np.abs(achieved(b)) >= np.abs(required) * (1.0 - 1e-12)
+        for _ in range(self.iterations):
+            mid = 0.5 * (a + b)
+            short = np.abs(achieved(mid)) < np.abs(required)
+            a = np.where(short, mid, a)
+            b = np.where(short, b, mid)
+        delta = np.clip(b[:, None] * w, lo, hi)
+        delta[~feasible] = np.nan
+        return delta, feasible
+
+    def for_blocked(self, features: np.ndarray, threshold: float) -> Dict[int, List[Dict[str, float]]]:
+        """
+        Counterfactual records for every blocked row (confidence < threshold),
+        keyed by row index. Allowed rows are skipped before solving.
+        """
+        x = np.asarray(features, dtype=float).reshape(-1, len(self.feature_names))
+        score = x @ self.weights / self.norm + self.offset
+        blocked = np.flatnonzero(1.0 / (1.0 + np.exp(-score)) < threshold)
+        if blocked.size == 0:
+            return {}
+        result = self.solve(x[blocked], threshold)
+        return {int(row): result.for_row(i) for i, row in enumerate(blocked)}
\ No newline at end of file
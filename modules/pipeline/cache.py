@@ -0,0 +1,290 @@
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from modules.decision.core import DecisionModule, DecisionOutput
+from modules.decision.hashing import canonical_json
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.explanation.core import ExplanationModule, ExplanationOutput
+from modules.pipeline.service import PipelineResult
+from modules.responsibility.core import ResponsibilityModule, ResponsibilityVerdict
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit/miss/eviction counters for a ResultCache.
+    """
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+    expirations: int = 0
+
+
+def _to_json(result: PipelineResult) -> str:
+    return json.dumps({
+        "decision": asdict(result.decision),
+        "explanation": asdict(result.explanation),
+        "verdict": asdict(result.verdict),
+    }, separators=(",", ":"))
+
+
+def _from_json(payload: str) -> PipelineResult:
+    data = json.loads(payload)
+    decision = dict(data["decision"], ranking=tuple(data["decision"].get("ranking", ())))
+    return PipelineResult(
+        decision=DecisionOutput(**decision),
+        explanation=ExplanationOutput(**data["explanation"]),
+        verdict=ResponsibilityVerdict(**data["verdict"]),
+    )
+
+
+class ResultCache:
+    """
+    Two-tier memo of pipeline results keyed by (fingerprint, trace id).
+
+    Tier 1 is an in-memory LRU bounded by maxsize with optional ttl
+    (seconds). Tier 2, enabled by path, is a SQLite file that survives
+    restarts, optionally bounded by disk_maxsize rows (least recently used
+    dropped first); disk hits are promoted to memory. The fingerprint
+    identifies the configuration that produced an entry (model, policy,
+    governance, explanation settings), so pipelines with different
+    configurations can share one cache; entries of configurations no longer
+    in use age out through the LRU bounds and ttl.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        disk_maxsize: Optional[int] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self.disk_maxsize = disk_maxsize
+        self.stats = CacheStats()
+        # Used by get/put calls that do not pass a fingerprint
+        self.fingerprint: Optional[str] = None
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, PipelineResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_rows = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(results)")}
+            if columns and "used" not in columns:
+                # Older single-key layout; the rows are only a cache
+                self._db.execute("DROP TABLE results")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " fingerprint TEXT NOT NULL, key TEXT NOT NULL, created REAL NOT NULL,"
+                " used REAL NOT NULL, payload TEXT NOT NULL, PRIMARY KEY (fingerprint, key))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def set_fingerprint(self, fingerprint: str) -> None:
+        """
+        Set the fingerprint used by get/put calls that do not pass one.
+        """
+        self.fingerprint = fingerprint
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and self.clock() - created > self.ttl
+
+    def get(self, key: str, fingerprint: Optional[str] = None) -> Optional[PipelineResult]:
+        fingerprint = fingerprint if fingerprint is not None else (self.fingerprint or "")
+        with self._lock:
+            expired = False
+            entry = self._memory.get((fingerprint, key))
+            if entry is not None:
+                if self._expired(entry[0]):
+                    del self._memory[(fingerprint, key)]
+                    expired = True
+                else:
+                    self._memory.move_to_end((fingerprint, key))
+                    self.stats.hits += 1
+                    return entry[1]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, payload FROM results WHERE fingerprint = ? AND key = ?",
+                    (fingerprint, key),
+                ).fetchone()
+                if row is not None:
+                    if self._expired(row[0]):
+                        self._db.execute("DELETE FROM results WHERE fingerprint = ? AND key = ?", (fingerprint, key))
+                        self._db.commit()
+                        self._disk_rows -= 1
+                        expired = True
+                    else:
+                        self._db.execute(
+                            "UPDATE results SET used = ? WHERE fingerprint = ? AND key = ?",
+                            (self.clock(), fingerprint, key),
+                        )
+                        self._db.commit()
+                        result = _from_json(row[1])
+                        self._remember((fingerprint, key), row[0], result)
+                        self.stats.disk_hits += 1
+                        return result
+            self.stats.expirations += int(expired)
+            self.stats.misses += 1
+            return None
+
+    def _remember(self, key: Tuple[str, str], created: float, result: PipelineResult) -> None:
+        self._memory[key] = (created, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def put(self, key: str, result: PipelineResult, fingerprint: Optional[str] = None) -> None:
+        fingerprint = fingerprint if fingerprint is not None else (self.fingerprint or "")
+        with self._lock:
+            created = self.clock()
+            self._remember((fingerprint, key), created, result)
+            if self._db is not None:
+                exists = self._db.execute(
+                    "SELECT 1 FROM results WHERE fingerprint = ? AND key = ?", (fingerprint, key)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (fingerprint, key, created, used, payload) VALUES (?, ?, ?, ?, ?)",
+                    (fingerprint, key, created, created, _to_json(result)),
+                )
+                self._disk_rows += 0 if exists else 1
+                if self.disk_maxsize is not None and self._disk_rows > self.disk_maxsize:
+                    cur = self._db.execute(
+                        "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY used LIMIT ?)",
+                        (self._disk_rows - self.disk_maxsize,),
+                    )
+                    self._disk_rows -= cur.rowcount
+                    self.stats.disk_evictions += cur.rowcount
+                self._db.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired entries from both tiers. Returns the number removed.
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            stale = [k for k, (created, _) in self._memory.items() if self._expired(created)]
+            for k in stale:
+                del self._memory[k]
+            removed = len(stale)
+            if self._db is not None:
+                cur = self._db.execute("DELETE FROM results WHERE created < ?", (self.clock() - self.ttl,))
+                self._db.commit()
+                removed += cur.rowcount
+                self._disk_rows -= cur.rowcount
+            self.stats.expirations += removed
+            return removed
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class CachedPipeline:
+    """
+    Opt-in memoization in front of Decision -> Explanation -> Responsibility.
+
+    Decisions are deterministic in (features, policy), so the trace id is the
+    cache key within a configuration fingerprint covering the model
+    (version, parameters and model_weight), rank_k, policy, governance and
+    explanation settings. The fingerprint is computed once and refreshed by
+    set_policy() and set_governance(); after changing the decision or
+    explanation module in place, call invalidate() so old results are not
+    reused. The governance dict is copied on construction. Cached results
+    keep the timestamp of the run that produced them.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyLike,
+        governance: Dict[str, Any],
+        cache: Optional[ResultCache] = None,
+        decision_module: Optional[DecisionModule] = None,
+        explanation_module: Optional[ExplanationModule] = None,
+    ):
+        self.policy = compile_policy(policy)
+        self.cache = cache if cache is not None else ResultCache()
+        self.decision_module = decision_module or DecisionModule(model=None)
+        self._owns_explanation = explanation_module is None
+        self.explanation_module = explanation_module or ExplanationModule(decision_module=self.decision_module)
+        self._fingerprint: Optional[str] = None
+        self.set_governance(governance)
+
+    def fingerprint(self) -> str:
+        """
+        Hash of everything that shapes a result besides the features.
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+        explanation = self.explanation_module
+        decision = self.decision_module
+        payload = {
+            "model_version": decision.model_version,
+            "model": decision.model_identity(),
+            "model_weight": decision.model_weight,
+            "hash_scheme": decision.hash_scheme,
+            "rank_k": decision.rank_k,
+            "policy": self.policy.digest,
+            "governance": self._governance_digest,
+            "audience": explanation.audience,
+            "plan": repr(explanation.plan),
+            "counterfactuals": [explanation.threshold, sorted(explanation.bounds.items()), explanation.immutable],
+        }
+        self._fingerprint = hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def invalidate(self) -> None:
+        """
+        Recompute the fingerprint on the next run (after in-place changes to
+        the decision or explanation module).
+        """
+        self._fingerprint = None
+
+    def set_policy(self, policy: PolicyLike) -> None:
+        self.policy = compile_policy(policy)
+        self.invalidate()
+
+    def set_governance(self, governance: Dict[str, Any]) -> None:
+        """
+        Replace the governance config (copied) and the module that reads it.
+        """
+        self.governance = copy.deepcopy(governance)
+        self.responsibility_module = ResponsibilityModule(self.governance)
+        if self._owns_explanation:
+            self.explanation_module.threshold = self.responsibility_module.min_confidence
+        self._governance_digest = hashlib.sha256(canonical_json(self.governance).encode("utf-8")).hexdigest()
+        self.invalidate()
+
+    def run(self, features: Dict[str, float]) -> PipelineResult:
+        fingerprint = self.fingerprint()
+        _, trace_id = self.policy.hasher(self.decision_module.hash_scheme).hash_features(features)
+        result = self.cache.get(trace_id, fingerprint)
+        if result is not None:
+            return result
+        decision = self.decision_module.run(features, self.policy)
+        explanation = self.explanation_module.run(decision, features, self.policy)
+        verdict = self.responsibility_module.run(decision, explanation)
+        result = PipelineResult(decision, explanation, verdict)
+        self.cache.put(trace_id, result, fingerprint)
+        return result
\ No newline at end of file
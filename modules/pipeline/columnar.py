@@ -0,0 +1,256 @@
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from modules.decision.core import DecisionOutput
+from modules.decision.ranking import DEFAULT_TOP_K
+
+
+class StringPool:
+    """
+    Interned values shared across batches: rows store int32 codes.
+    """
+
+    def __init__(self, values: Sequence[Hashable] = ()):
+        self.values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values: Sequence[Hashable]) -> np.ndarray:
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32, count=len(values))
+
+    def __getitem__(self, code: int) -> Hashable:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ArtifactView:
+    """
+    Lazy per-row view with the attribute names of DecisionOutput,
+    ExplanationOutput and ResponsibilityVerdict. Nothing is materialized
+    until an attribute is read.
+    """
+
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "ArtifactBatch", i: int):
+        self._batch = batch
+        self._i = i
+
+    prediction = property(lambda self: float(self._batch.predictions[self._i]))
+    confidence = property(lambda self: float(self._batch.confidences[self._i]))
+    timestamp = property(lambda self: float(self._batch.timestamps[self._i]))
+    allowed = property(lambda self: bool(self._batch.allowed[self._i]))
+    trace_id = property(lambda self: self._batch.trace_ids[self._i].decode("ascii"))
+    data_hash = property(lambda self: self._batch.data_hashes[self._i].tobytes().hex())
+    model_version = property(lambda self: self._batch.pool[self._batch.model_versions[self._i]])
+    summary = property(lambda self: self._batch.pool[self._batch.summaries[self._i]])
+    caveats = property(lambda self: list(self._batch.pool[self._batch.caveats[self._i]]))
+    reasons = property(lambda self: list(self._batch.pool[self._batch.reasons[self._i]]))
+
+    @property
+    def feature_importance(self) -> Dict[str, float]:
+        return dict(zip(self._batch.feature_names, self._batch.importances[self._i].tolist()))
+
+    @property
+    def ranking(self) -> Tuple[str, ...]:
+        names = self._batch.feature_names
+        return tuple(names[j] for j in self._batch.rankings[self._i].tolist() if j >= 0)
+
+    def to_decision(self) -> DecisionOutput:
+        """
+        Materialize the row as a DecisionOutput.
+        """
+        return DecisionOutput(
+            prediction=self.prediction,
+            confidence=self.confidence,
+            feature_importance=self.feature_importance,
+            trace_id=self.trace_id,
+            model_version=self.model_version,
+            data_hash=self.data_hash,
+            timestamp=self.timestamp,
+            ranking=self.ranking,
+        )
+
+    def __repr__(self) -> str:
+        return f"ArtifactView(trace_id={self.trace_id!r}, confidence={self.confidence:.4f}, allowed={self.allowed})"
+
+
+class ArtifactBatch:
+    """
+    Columnar storage for many decision/explanation/verdict artifacts.
+
+    Numeric fields are contiguous arrays, importances an N x F matrix over a
+    shared feature vocabulary, rankings N x k column indices (-1 padded),
+    trace ids fixed-width bytes, data hashes N x 32 raw digests,
+    and repeated strings (model_version, summaries, caveat lists, reason
+    lists) int32 codes into a StringPool shared by every slice of the batch.
+    Integer slices are views; boolean masks and index arrays copy only the
+    selected rows.
+    """
+
+    _COLUMNS = (
+        "predictions", "confidences", "timestamps", "allowed", "importances", "rankings",
+        "trace_ids", "data_hashes", "model_versions", "summaries", "caveats", "reasons",
+    )
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        predictions: np.ndarray,
+        confidences: np.ndarray,
+        timestamps: np.ndarray,
+        allowed: np.ndarray,
+        importances: np.ndarray,
+        rankings: np.ndarray,
+        trace_ids: np.ndarray,
+        data_hashes: np.ndarray,
+        model_versions: np.ndarray,
+        summaries: np.ndarray,
+        caveats: np.ndarray,
+        reasons: np.ndarray,
+        pool: StringPool,
+    ):
+        self.feature_names = tuple(feature_names)
+        self.predictions = predictions
+        self.confidences = confidences
+        self.timestamps = timestamps
+        self.allowed = allowed
+        self.importances = importances
+        self.rankings = rankings
+        self.trace_ids = trace_ids
+        self.data_hashes = data_hashes
+        self.model_versions = model_versions
+        self.summaries = summaries
+        self.caveats = caveats
+        self.reasons = reasons
+        self.pool = pool
+
+    @classmethod
+    def from_artifacts(
+        cls,
+        decisions: Sequence[Any],
+        explanations: Optional[Sequence[Any]] = None,
+        verdicts: Optional[Sequence[Any]] = None,
+        feature_names: Optional[Sequence[str]] = None,
+        pool: Optional[StringPool] = None,
+    ) -> "ArtifactBatch":
+        """
+        Pack DecisionOutput (and optionally ExplanationOutput and
+        ResponsibilityVerdict) sequences. Without feature_names the
+        vocabulary is every feature seen across the rows, in first-seen
+        order. Features missing from a row's importance are stored as 0.0.
+        """
+        pool = pool or StringPool()
+        n = len(decisions)
+        if feature_names is None:
+            feature_names = list(dict.fromkeys(k for d in decisions for k in d.feature_importance))
+        names = list(feature_names)
+        col = {k: i for i, k in enumerate(names)}
+
+        importances = np.zeros((n, len(names)), dtype=float)
+        for i, d in enumerate(decisions):
+            imp = d.feature_importance
+            if list(imp) == names:
+                importances[i] = list(imp.values())
+            else:
+                for k, v in imp.items():
+                    importances[i, col[k]] = v
+
+        k = max((len(d.ranking) for d in decisions), default=DEFAULT_TOP_K)
+        rankings = np.full((n, k), -1, dtype=np.int32)
+        for i, d in enumerate(decisions):
+            rankings[i, :len(d.ranking)] = [col[name] for name in d.ranking]
+
+        empty = pool.code(())
+        return cls(
+            feature_names=names,
+            predictions=np.fromiter((d.prediction for d in decisions), dtype=float, count=n),
+            confidences=np.fromiter((d.confidence for d in decisions), dtype=float, count=n),
+            timestamps=np.fromiter((d.timestamp for d in decisions), dtype=float, count=n),
+            allowed=(np.fromiter((v.allowed for v in verdicts), dtype=bool, count=n)
+                     if verdicts is not None else np.ones(n, dtype=bool)),
+            importances=importances,
+            rankings=rankings,
+            trace_ids=np.array([d.trace_id.encode("ascii") for d in decisions], dtype="S32").reshape(n),
+            data_hashes=np.frombuffer(
+                b"".join(bytes.fromhex(d.data_hash) for d in decisions), dtype=np.uint8
+            ).reshape(n, 32),
+            model_versions=pool.encode([d.model_version for d in decisions]),
+            summaries=(pool.encode([e.summary for e in explanations])
+                       if explanations is not None else np.full(n, pool.code(""), dtype=np.int32)),
+            caveats=(pool.encode([tuple(e.caveats) for e in explanations])
+                     if explanations is not None else np.full(n, empty, dtype=np.int32)),
+            reasons=(pool.encode([tuple(v.reasons) for v in verdicts])
+                     if verdicts is not None else np.full(n, empty, dtype=np.int32)),
+            pool=pool,
+        )
+
+    def __len__(self) -> int:
+        return len(self.predictions)
+
+    def _take(self, index) -> "ArtifactBatch":
+        return ArtifactBatch(
+            self.feature_names,
+            *(getattr(self, name)[index] for name in self._COLUMNS),
+            pool=self.pool,
+        )
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray, Sequence[int]]):
+        """
+        batch[i] -> ArtifactView; batch[a:b] -> view batch; batch[mask] or
+        batch[indices] -> copied batch.
+        """
+        if isinstance(index, (int, np.integer)):
+            i = int(index)
+            if i < 0:
+                i += len(self)
+            if not 0 <= i < len(self):
+                raise IndexError("ArtifactBatch index out of range")
+            return ArtifactView(self, i)
+        if isinstance(index, slice):
+            return self._take(index)
+        return self._take(np.asarray(index))
+
+    def __iter__(self) -> Iterator[ArtifactView]:
+        for i in range(len(self)):
+            yield ArtifactView(self, i)
+
+    def filter(self, mask: np.ndarray) -> "ArtifactBatch":
+        return self._take(np.asarray(mask, dtype=bool))
+
+    def blocked(self) -> "ArtifactBatch":
+        return self.filter(~self.allowed)
+
+    @classmethod
+    def concat(cls, batches: Sequence["ArtifactBatch"]) -> "ArtifactBatch":
+        """
+        Join batches that share a feature vocabulary and string pool.
+        """
+        first = batches[0]
+        for b in batches[1:]:
+            if b.feature_names != first.feature_names or b.pool is not first.pool:
+                raise ValueError("concat requires a shared feature vocabulary and string pool")
+            if b.rankings.shape[1] != first.rankings.shape[1]:
+                raise ValueError("concat requires the same ranking depth")
+        return cls(
+            first.feature_names,
+            *(np.concatenate([getattr(b, name) for b in batches]) for name in cls._COLUMNS),
+            pool=first.pool,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the column arrays (shared pool excluded).
+        """
+        return sum(getattr(self, name).nbytes for name in self._COLUMNS)
\ No newline at end of file
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import os
+import numpy as np
+
+from modules.decision.core import DecisionModule
+from modules.decision.models import ModelBackend, ModelRegistry
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+
+
+@dataclass
+class ParallelResult:
+    """
+    Compact, row-ordered results of a parallel run.
+    """
+    predictions: np.ndarray
+    confidences: np.ndarray
+    allowed: np.ndarray
+    trace_ids: List[str]
+    data_hashes: List[str]
+    summaries: List[str]
+    reasons: List[List[str]]
+
+    def __len__(self) -> int:
+        return len(self.predictions)
+
+
+# Per-process stage objects, built once by the pool initializer
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(policy: Dict[str, float], governance: Dict[str, Any], options: Dict[str, Any]) -> None:
+    _WORKER["policy"] = compile_policy(policy)
+    _WORKER["decision"] = DecisionModule(
+        model=options["model"],
+        model_version=options["model_version"],
+        seed=options["seed"],
+        hash_scheme=options["hash_scheme"],
+        model_weight=options["model_weight"],
+    )
+    _WORKER["explanation"] = ExplanationModule(audience=options["audience"])
+    _WORKER["responsibility"] = ResponsibilityModule(governance)
+
+
+def _run_rows(matrix: np.ndarray, names: Sequence[str]) -> Tuple:
+    """
+    Run all three stages over a block of rows using the worker's modules.
+    """
+    decisions = _WORKER["decision"].run_batch(matrix, _WORKER["policy"], feature_names=names)
+    explanation_module, responsibility_module = _WORKER["explanation"], _WORKER["responsibility"]
+    predictions = np.empty(len(decisions))
+    confidences = np.empty(len(decisions))
+    allowed = np.empty(len(decisions), dtype=bool)
+    trace_ids, data_hashes, summaries, reasons = [], [], [], []
+    explanations = [explanation_module.run(decision) for decision in decisions]
+    verdicts = responsibility_module.run_batch(decisions, explanations)
+    for i, (decision, explanation, verdict) in enumerate(zip(decisions, explanations, verdicts)):
+        predictions[i] = decision.prediction
+        confidences[i] = decision.confidence
+        allowed[i] = verdict.allowed
+        trace_ids.append(decision.trace_id)
+        data_hashes.append(decision.data_hash)
+        summaries.append(explanation.summary)
+        reasons.append(verdict.reasons)
+    return predictions, confidences, allowed, trace_ids, data_hashes, summaries, reasons
+
+
+def _run_shard(shm_name: str, shape: Tuple[int, int], start: int, stop: int, names: Sequence[str]) -> Tuple:
+    """
+    Attach to the shared feature matrix and process rows [start, stop).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        block = np.array(view[start:stop])
+        del view
+    finally:
+        shm.close()
+    return _run_rows(block, names)
+
+
+class ParallelExecutor:
+    """
+    Multi-core batch execution over a large feature matrix.
+
+    The matrix is copied once into shared memory and split into fixed
+    shards of shard_rows rows; pool workers read their slice directly and
+    build their modules once at start-up. Shard boundaries do not depend on
+    the worker count and results are reassembled in row order, so output is
+    identical for any number of workers.
+
+    model (a ModelBackend or ModelRegistry) is pickled to every worker; a
+    registry arrives empty and loads model_version in each process.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyLike,
+        governance: Dict[str, Any],
+        workers: Optional[int] = None,
+        shard_rows: int = 8192,
+        model_version: Optional[str] = None,
+        seed: int = 42,
+        hash_scheme: str = "json",
+        audience: str = "default",
+        model: Optional[Union[ModelBackend, ModelRegistry]] = None,
+        model_weight: float = 0.5,
+    ):
+        self.policy = compile_policy(policy).policy
+        self.governance = governance
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.shard_rows = max(1, shard_rows)
+        self.options = {
+            "model": model,
+            "model_version": model_version,
+            "model_weight": model_weight,
+            "seed": seed,
+            "hash_scheme": hash_scheme,
+            "audience": audience,
+        }
+
+    def _shards(self, n_rows: int) -> List[Tuple[int, int]]:
+        return [(s, min(s + self.shard_rows, n_rows)) for s in range(0, n_rows, self.shard_rows)]
+
+    def run(self, matrix: np.ndarray, feature_names: Sequence[str]) -> ParallelResult:
+        """
+        Process every row of an N x F matrix and return results in row order.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        names = list(feature_names)
+        if matrix.ndim != 2 or matrix.shape[1] != len(names):
+            raise ValueError(f"Expected an N x {len(names)} feature matrix, got shape {matrix.shape}")
+        shards = self._shards(matrix.shape[0])
+
+        if self.workers <= 1 or len(shards) <= 1:
+            _init_worker(self.policy, self.governance, self.options)
+            parts = [_run_rows(matrix[s:e], names) for s, e in shards]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+            try:
+                shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)
+                shared[:] = matrix
+                del shared
+                with ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(shards)),
+                    initializer=_init_worker,
+                    initargs=(self.policy, self.governance, self.options),
+                ) as pool:
+                    futures = [pool.submit(_run_shard, shm.name, matrix.shape, s, e, names) for s, e in shards]
+                    parts = [f.result() for f in futures]
+            finally:
+                shm.close()
+                shm.unlink()
+
+        if not parts:
+            return ParallelResult(np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool), [], [], [], [])
+        return ParallelResult(
+            predictions=np.concatenate([p[0] for p in parts]),
+            confidences=np.concatenate([p[1] for p in parts]),
+            allowed=np.concatenate([p[2] for p in parts]),
+            trace_ids=[t for p in parts for t in p[3]],
+            data_hashes=[h for p in parts for h in p[4]],
+            summaries=[s for p in parts for s in p[5]],
+            reasons=[r for p in parts for r in p[6]],
+        )
\ No newline at end of file
@@ -0,0 +1,281 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import asyncio
+import time
+import numpy as np
+
+from modules.decision.core import DecisionModule, DecisionOutput
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.explanation.core import ExplanationModule, ExplanationOutput
+from modules.responsibility.core import ResponsibilityModule, ResponsibilityVerdict
+
+
+class PipelineOverloaded(RuntimeError):
+    """
+    Raised by submit() when the request queue is full and load shedding is on.
+    """
+
+
+@dataclass(frozen=True)
+class PipelineResult:
+    """
+    Artifacts of one request after all three modules.
+    """
+    decision: DecisionOutput
+    explanation: ExplanationOutput
+    verdict: ResponsibilityVerdict
+
+
+@dataclass
+class PipelineStats:
+    """
+    Running counters for an AgentPipeline.
+    """
+    requests: int = 0
+    batches: int = 0
+    shed: int = 0
+    failed: int = 0
+    max_batch: int = 0
+
+
+class AgentPipeline:
+    """
+    asyncio front end for the Decision -> Explanation -> Responsibility chain.
+
+    Concurrent submit() calls are coalesced into micro-batches of up to
+    max_batch_size requests, waiting at most max_wait seconds after the
+    first request of a batch. Batches run in a worker thread so the event
+    loop stays responsive. The request queue is bounded by max_queue: when
+    it is full, submit() raises PipelineOverloaded (shed=True) or waits for
+    room (shed=False). A request that fails (e.g. a non-numeric feature)
+    raises in its own submit() only; co-batched requests are unaffected.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyLike,
+        governance: Dict[str, Any],
+        decision_module: Optional[DecisionModule] = None,
+        explanation_module: Optional[ExplanationModule] = None,
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+        max_queue: int = 1024,
+        shed: bool = True,
+    ):
+        self.policy = compile_policy(policy)
+        self.decision_module = decision_module or DecisionModule(model=None)
+        self.responsibility_module = ResponsibilityModule(governance)
+        self.explanation_module = explanation_module or ExplanationModule(
+            threshold=self.responsibility_module.min_confidence, decision_module=self.decision_module
+        )
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.shed = shed
+        self.stats = PipelineStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Finish everything already queued, then stop the batching worker.
+        """
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def submit(self, features: Dict[str, float]) -> PipelineResult:
+        """
+        Queue one request and wait for its batched result.
+        """
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        item = (features, future)
+        if self.shed:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.stats.shed += 1
+                raise PipelineOverloaded(f"request queue full ({self.max_queue})") from None
+        else:
+            await self._queue.put(item)
+        return await future
+
+    async def _collect(self) -> List[Tuple[Dict[str, float], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            try:
+                pending = [(f, fut) for f, fut in batch if not fut.cancelled()]
+                if pending:
+                    self.stats.batches += 1
+                    self.stats.max_batch = max(self.stats.max_batch, len(pending))
+                    try:
+                        results = await loop.run_in_executor(None, self.process_batch, [f for f, _ in pending])
+                    except Exception as exc:
+                        self.stats.failed += len(pending)
+                        for _, fut in pending:
+                            if not fut.done():
+                                fut.set_exception(exc)
+                    else:
+                        for (_, fut), result in zip(pending, results):
+                            if isinstance(result, Exception):
+                                self.stats.failed += 1
+                                if not fut.done():
+                                    fut.set_exception(result)
+                            else:
+                                self.stats.requests += 1
+                                if not fut.done():
+                                    fut.set_result(result)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def process_batch(self, rows: Sequence[Dict[str, float]]) -> List[Union[PipelineResult, Exception]]:
+        """
+        Run a micro-batch through all modules. Rows are grouped by feature
+        layout so each group is scored with a single run_batch call. When a
+        group fails, its rows are retried one by one; a row that still fails
+        gets its exception in place of a result.
+        """
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, row in enumerate(rows):
+            groups.setdefault(tuple(row), []).append(i)
+        results: List[Union[PipelineResult, Exception, None]] = [None] * len(rows)
+        for idxs in groups.values():
+            try:
+                outs = self._process_group([rows[i] for i in idxs])
+            except Exception:
+                outs = []
+                for i in idxs:
+                    try:
+                        outs.extend(self._process_group([rows[i]]))
+                    except Exception as exc:
+                        outs.append(exc)
+            for i, out in zip(idxs, outs):
+                results[i] = out
+        return results
+
+    def _process_group(self, rows: Sequence[Dict[str, float]]) -> List[PipelineResult]:
+        """
+        Decide, explain and check rows that share one feature layout.
+        """
+        decisions = self.decision_module.run_batch(rows, self.policy)
+        explanations = self.explanation_module.run_batch(decisions, rows, self.policy)
+        verdicts = self.responsibility_module.run_batch(decisions, explanations)
+        return [PipelineResult(*artifacts) for artifacts in zip(decisions, explanations, verdicts)]
+
+
+@dataclass(frozen=True)
+class LatencyTargets:
+    """
+    Service-level targets checked against a LoadReport.
+    """
+    p50_ms: float = 10.0
+    p99_ms: float = 50.0
+    min_throughput: float = 1000.0
+
+
+@dataclass
+class LoadReport:
+    """
+    Outcome of an in-process load run.
+    """
+    completed: int
+    shed: int
+    duration: float
+    p50_ms: float
+    p99_ms: float
+    throughput: float
+    failures: List[str] = field(default_factory=list)
+
+    def meets(self, targets: LatencyTargets) -> bool:
+        """
+        Check the run against targets; the unmet ones are listed in failures.
+        """
+        self.failures = []
+        if self.p50_ms > targets.p50_ms:
+            self.failures.append(f"p50 {self.p50_ms:.2f}ms > {targets.p50_ms}ms")
+        if self.p99_ms > targets.p99_ms:
+            self.failures.append(f"p99 {self.p99_ms:.2f}ms > {targets.p99_ms}ms")
+        if self.throughput < targets.min_throughput:
+            self.failures.append(f"throughput {self.throughput:.0f}/s < {targets.min_throughput}/s")
+        return not self.failures
+
+
+async def run_load(
+    pipeline: AgentPipeline,
+    rows: Sequence[Dict[str, float]],
+    total: int = 5000,
+    concurrency: int = 64,
+) -> LoadReport:
+    """
+    Closed-loop load generator: `concurrency` clients submit `total` requests
+    (cycling through rows) as fast as results come back.
+    """
+    latencies: List[float] = []
+    shed = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal shed
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await pipeline.submit(rows[i % len(rows)])
+            except PipelineOverloaded:
+                shed += 1
+                await asyncio.sleep(0)
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    duration = time.perf_counter() - began
+
+    lat_ms = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+    return LoadReport(
+        completed=len(latencies),
+        shed=shed,
+        duration=duration,
+        p50_ms=float(np.percentile(lat_ms, 50)),
+        p99_ms=float(np.percentile(lat_ms, 99)),
+        throughput=len(latencies) / duration if duration > 0 else 0.0,
+    )
\ No newline at end of file
@@ -0,0 +1,239 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import csv
+import json
+import os
+
+from modules.decision.core import DecisionModule
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+
+
+@dataclass
+class Chunk:
+    """
+    A fixed-size slice of input rows and the byte offset just past its last line.
+    """
+    rows: List[Dict[str, Any]]
+    end_offset: int
+    fieldnames: Optional[List[str]] = None
+
+
+@dataclass
+class StreamStats:
+    """
+    Counters for one streaming run (including rows from earlier resumed runs).
+    """
+    rows: int = 0
+    chunks: int = 0
+    allowed: int = 0
+    blocked: int = 0
+    resumed_from: int = 0
+    completed: bool = False
+
+
+def _detect_format(path: str) -> str:
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def iter_chunks(
+    path: str,
+    chunk_size: int = 1000,
+    start_offset: int = 0,
+    fmt: Optional[str] = None,
+    fieldnames: Optional[Sequence[str]] = None,
+) -> Iterator[Chunk]:
+    """
+    Stream a CSV or JSONL file in chunks of at most chunk_size rows.
+
+    CSV lines starting with '#' and blank lines are skipped; the first other
+    line is the header unless fieldnames is given (as when resuming mid-file).
+    Records must not span lines. Only one chunk is held in memory at a time.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    fmt = fmt or _detect_format(path)
+    names = list(fieldnames) if fieldnames else None
+
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        offset = start_offset
+        rows: List[Dict[str, Any]] = []
+        for raw in iter(f.readline, b""):
+            offset += len(raw)
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            if fmt == "jsonl":
+                rows.append(json.loads(line))
+            else:
+                if line.startswith("#"):
+                    continue
+                values = next(csv.reader([line]))
+                if names is None:
+                    names = [v.strip() for v in values]
+                    continue
+                if len(values) != len(names):
+                    raise ValueError(f"Malformed CSV line at byte {offset - len(raw)}: {line!r}")
+                rows.append(dict(zip(names, values)))
+            if len(rows) >= chunk_size:
+                yield Chunk(rows=rows, end_offset=offset, fieldnames=names)
+                rows = []
+        if rows:
+            yield Chunk(rows=rows, end_offset=offset, fieldnames=names)
+
+
+class StreamingRunner:
+    """
+    Streaming pipeline runner:
+    - Reads CSV/JSONL input in fixed-size chunks (bounded memory)
+    - Runs Decision -> Explanation -> Responsibility per chunk
+    - Appends JSONL results and checkpoints byte offsets for crash-safe resume
+    """
+
+    def __init__(
+        self,
+        policy: PolicyLike,
+        governance: Dict[str, Any],
+        decision_module: Optional[DecisionModule] = None,
+        explanation_module: Optional[ExplanationModule] = None,
+        id_column: str = "student_id",
+        exclude_columns: Sequence[str] = ("final_score",),
+        feature_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ):
+        self.policy = compile_policy(policy)
+        self.decision_module = decision_module or DecisionModule(model=None)
+        self.responsibility_module = ResponsibilityModule(governance)
+        self.explanation_module = explanation_module or ExplanationModule(
+            threshold=self.responsibility_module.min_confidence, decision_module=self.decision_module
+        )
+        self.id_column = id_column
+        self.exclude_columns = set(exclude_columns)
+        self.feature_columns = list(feature_columns) if feature_columns else None
+        self.chunk_size = chunk_size
+
+    def _features(self, row: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Extract numeric features from a raw input row.
+        """
+        if self.feature_columns is not None:
+            return {k: float(row[k]) for k in self.feature_columns}
+        skip = self.exclude_columns | {self.id_column}
+        return {k: float(v) for k, v in row.items() if k not in skip}
+
+    def process_chunk(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run one chunk through all three modules and return output records.
+        """
+        features = [self._features(r) for r in rows]
+        decisions = self.decision_module.run_batch(features, self.policy)
+        explanations = self.explanation_module.run_batch(decisions, features, self.policy)
+        verdicts = self.responsibility_module.run_batch(decisions, explanations)
+        records = []
+        for row, decision, explanation, verdict in zip(rows, decisions, explanations, verdicts):
+            records.append({
+                "row_id": row.get(self.id_column),
+                "trace_id": decision.trace_id,
+                "data_hash": decision.data_hash,
+                "prediction": decision.prediction,
+                "confidence": decision.confidence,
+                "allowed": verdict.allowed,
+                "reasons": verdict.reasons,
+                "summary": explanation.summary,
+            })
+        return records
+
+    @staticmethod
+    def _load_checkpoint(path: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+        """
+        Atomically replace the checkpoint file.
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def run(
+        self,
+        input_path: str,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        fmt: Optional[str] = None,
+        max_chunks: Optional[int] = None,
+    ) -> StreamStats:
+        """
+        Stream input_path through the pipeline into output_path (JSONL).
+
+        With checkpoint_path, progress is recorded after every chunk once its
+        output is durable; a later call resumes from the recorded input offset
+        and truncates any partially written output. max_chunks stops early
+        (the checkpoint allows continuing later).
+        """
+        stats = StreamStats()
+        state = self._load_checkpoint(checkpoint_path)
+        if state is not None and state.get("input") != os.path.abspath(input_path):
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to {state.get('input')}")
+        if state is not None and state.get("completed"):
+            stats.rows = stats.resumed_from = state["rows"]
+            stats.completed = True
+            return stats
+
+        if state is not None:
+            in_offset, out_offset = state["input_offset"], state["output_offset"]
+            fieldnames = state.get("fieldnames")
+            stats.rows = stats.resumed_from = state["rows"]
+            stats.allowed, stats.blocked = state["allowed"], state["blocked"]
+        else:
+            in_offset, out_offset, fieldnames = 0, 0, None
+
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        mode = "r+b" if out_offset and os.path.exists(output_path) else "wb"
+        with open(output_path, mode) as out:
+            out.seek(out_offset)
+            out.truncate()
+
+            def checkpoint(completed: bool) -> None:
+                out.flush()
+                os.fsync(out.fileno())
+                self._write_checkpoint(checkpoint_path, {
+                    "input": os.path.abspath(input_path),
+                    "input_offset": in_offset,
+                    "output_offset": out.tell(),
+                    "fieldnames": fieldnames,
+                    "rows": stats.rows,
+                    "allowed": stats.allowed,
+                    "blocked": stats.blocked,
+                    "completed": completed,
+                })
+
+            for chunk in iter_chunks(input_path, self.chunk_size, in_offset, fmt, fieldnames):
+                records = self.process_chunk(chunk.rows)
+                out.write("".join(json.dumps(r) + "\n" for r in records).encode("utf-8"))
+                in_offset, fieldnames = chunk.end_offset, chunk.fieldnames
+                stats.rows += len(records)
+                stats.chunks += 1
+                allowed = sum(1 for r in records if r["allowed"])
+                stats.allowed += allowed
+                stats.blocked += len(records) - allowed
+                if checkpoint_path:
+                    checkpoint(completed=False)
+                if max_chunks is not None and stats.chunks >= max_chunks:
+                    return stats
+
+            stats.completed = True
+            if checkpoint_path:
+                checkpoint(completed=True)
+        return stats
\ No newline at end of file
@@ -0,0 +1,379 @@
+from dataclasses import dataclass
+from typing import Any, Dict, IO, List, Optional, Tuple
+import json
+import os
+import queue
+import socket
+import threading
+
+# Numpy and the agent modules are imported on first use (JsonlWorker.load) so
+# that starting a worker process only pays for the standard library.
+
+DEFAULT_POLICY = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+DEFAULT_GOVERNANCE = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+
+_EOF = object()
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Load a YAML (or JSON) mapping from disk.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise ImportError("Loading YAML configs requires PyYAML (pip install pyyaml)") from exc
+        return yaml.safe_load(f) or {}
+
+
+@dataclass
+class WorkerStats:
+    """
+    Counters for one JsonlWorker.
+    """
+    requests: int = 0
+    errors: int = 0
+    batches: int = 0
+    connections: int = 0
+
+
+class JsonlWorker:
+    """
+    Long-lived worker answering newline-delimited JSON requests.
+
+    Each request line is an object such as
+        {"id": 7, "features": {"attendance": 0.8, ...},
+         "audience": "student", "policy": "default", "group": "A",
+         "model_version": "v2"}
+    where only "features" is required. "model_version" selects a version
+    from the model registry passed as model; without a registry only the
+    worker's own model_version is accepted. Each response line carries the same
+    id with the decision, verdict and explanation, or {"id": ..., "error": ...}
+    for a bad request or one whose scoring failed; a failure never affects
+    requests in other groups or later batches. Responses are written in
+    request order. "group" must be a string or integer; audiences without a
+    profile are answered with the worker's default audience.
+
+    Configs, policies and modules are loaded once (lazily, on the first
+    request or an explicit load()). Reading runs in a background thread while
+    the previous batch is scored, and up to max_batch queued requests are
+    scored together. stop() stops accepting input; requests already read are
+    answered before serve() returns.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, Dict[str, float]]] = None,
+        governance: Optional[Dict[str, Any]] = None,
+        governance_path: Optional[str] = None,
+        profiles_path: Optional[str] = None,
+        audience: str = "default",
+        default_policy: str = "default",
+        max_batch: int = 64,
+        max_pending: int = 1024,
+        telemetry: Optional[Any] = None,
+        model: Optional[Any] = None,
+        model_version: Optional[str] = None,
+        model_weight: float = 0.5,
+    ):
+        self.policy_specs = dict(policies or {"default": DEFAULT_POLICY})
+        if default_policy not in self.policy_specs:
+            raise ValueError(f"Default policy {default_policy!r} is not among {sorted(self.policy_specs)}")
+        self.governance = governance
+        self.governance_path = governance_path
+        self.profiles_path = profiles_path
+        self.audience = audience
+        self.default_policy = default_policy
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(1, max_pending)
+        self.telemetry = telemetry
+        self.model = model
+        self.model_version = model_version
+        self.model_weight = model_weight
+        self.stats = WorkerStats()
+
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Modules keep state (render cache, fairness monitor): one batch at a time
+        self._run_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._listener: Optional[socket.socket] = None
+
+    def load(self) -> "JsonlWorker":
+        """
+        Import the agent modules and build policies, configs and modules once.
+        """
+        if self._loaded:
+            return self
+        with self._load_lock:
+            if self._loaded:
+                return self
+            from modules.decision.core import DecisionModule
+            from modules.decision.models import ModelRegistry
+            from modules.decision.policy import compile_policy
+            from modules.explanation.audience import load_render_plans
+            from modules.explanation.core import ExplanationModule
+            from modules.responsibility.core import ResponsibilityModule
+
+            governance = self.governance
+            if governance is None:
+                governance = load_config(self.governance_path) if self.governance_path else DEFAULT_GOVERNANCE
+            profiles = load_render_plans(self.profiles_path) if self.profiles_path else None
+
+            self._policies = {name: compile_policy(p) for name, p in self.policy_specs.items()}
+            self._decision_factory = lambda version: DecisionModule(
+                model=self.model, model_version=version, model_weight=self.model_weight, telemetry=self.telemetry
+            )
+            self._decision = self._decision_factory(self.model_version)
+            self._decisions = {self._decision.model_version: self._decision}
+            self._versioned = isinstance(self.model, ModelRegistry)
+            self._responsibility = ResponsibilityModule(governance, telemetry=self.telemetry)
+            # Counterfactuals are solved against the requested model version
+            self._explanation_factory = lambda audience, version: ExplanationModule(
+                audience=audience, profiles=profiles, telemetry=self.telemetry,
+                threshold=self._responsibility.min_confidence, decision_module=self._decision_module(version),
+            )
+            default = self._explanation_factory(self.audience, self._decision.model_version)
+            self._explainers = {(self.audience, self._decision.model_version): default}
+            # Only profiled audiences get their own explainer, so clients
+            # cannot grow the explainer table with arbitrary names
+            self._audiences = frozenset(default.plans)
+            self._loaded = True
+        return self
+
+    def _decision_module(self, version: str):
+        decision = self._decisions.get(version)
+        if decision is None:
+            decision = self._decisions[version] = self._decision_factory(version)
+        return decision
+
+    def _explainer(self, audience: str, version: str):
+        if audience not in self._audiences:
+            audience = self.audience
+        explainer = self._explainers.get((audience, version))
+        if explainer is None:
+            explainer = self._explainers[(audience, version)] = self._explanation_factory(audience, version)
+        return explainer
+
+    def _parse(self, line: str) -> Tuple[Any, Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Validate one request line into (id, request, error).
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            return None, None, f"Invalid JSON: {exc}"
+        if not isinstance(request, dict):
+            return None, None, "Request must be a JSON object"
+        req_id = request.get("id")
+        features = request.get("features")
+        if not isinstance(features, dict) or not features:
+            return req_id, None, "Request needs a non-empty 'features' object"
+        try:
+            request["features"] = {str(k): float(v) for k, v in features.items()}
+        except (TypeError, ValueError):
+            return req_id, None, "Feature values must be numeric"
+        policy = request.get("policy", self.default_policy)
+        if not isinstance(policy, str) or policy not in self._policies:
+            return req_id, None, f"Unknown policy {policy!r}"
+        request["policy"] = policy
+        version = request.get("model_version", self._decision.model_version)
+        if not isinstance(version, str) or (version != self._decision.model_version and not self._versioned):
+            return req_id, None, f"Unknown model version {version!r}"
+        request["model_version"] = version
+        group = request.get("group")
+        if group is not None and (isinstance(group, bool) or not isinstance(group, (str, int))):
+            return req_id, None, "'group' must be a string or integer"
+        if not isinstance(request.get("audience", self.audience), str):
+            return req_id, None, "'audience' must be a string"
+        return req_id, request, None
+
+    def handle_lines(self, lines: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer a batch of request lines, in order. Valid requests sharing a
+        policy, model version and feature layout are scored with one
+        run_batch call.
+        """
+        self.load()
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(lines)
+        parsed = []
+        for i, line in enumerate(lines):
+            req_id, request, error = self._parse(line)
+            if error is not None:
+                responses[i] = {"id": req_id, "error": error}
+            else:
+                parsed.append((i, req_id, request))
+
+        groups: Dict[Tuple[str, str, Tuple[str, ...]], List[Tuple[int, Any, Dict[str, Any]]]] = {}
+        for item in parsed:
+            request = item[2]
+            key = (request["policy"], request["model_version"], tuple(request["features"]))
+            groups.setdefault(key, []).append(item)
+
+        with self._run_lock:
+            for (policy, version, _), items in groups.items():
+                try:
+                    answers = self._answer(items, policy, version)
+                except Exception as exc:
+                    # KeyError: the model registry has no file for this version
+                    if isinstance(exc, KeyError) and version != self._decision.model_version:
+                        self._decisions.pop(version, None)
+                        for key in [k for k in self._explainers if k[1] == version]:
+                            del self._explainers[key]
+                    error = exc.args[0] if isinstance(exc, KeyError) and exc.args else str(exc)
+                    answers = [{"id": req_id, "error": error} for _, req_id, _ in items]
+                    self.stats.errors += len(items)
+                for (i, _, _), answer in zip(items, answers):
+                    responses[i] = answer
+            self.stats.batches += 1
+            self.stats.requests += len(lines)
+            self.stats.errors += len(lines) - len(parsed)
+        return responses
+
+    def _answer(self, items: List[Tuple[int, Any, Dict[str, Any]]], policy: str, version: str) -> List[Dict[str, Any]]:
+        """
+        Decide, explain and check one group of requests sharing a policy,
+        model version and feature layout.
+        """
+        features = [r["features"] for _, _, r in items]
+        decisions = self._decision_module(version).run_batch(features, self._policies[policy])
+        by_audience: Dict[str, List[int]] = {}
+        for j, (_, _, request) in enumerate(items):
+            by_audience.setdefault(request.get("audience", self.audience), []).append(j)
+        explanations: List[Any] = [None] * len(items)
+        for audience, idxs in by_audience.items():
+            outs = self._explainer(audience, version).run_batch(
+                [decisions[j] for j in idxs], [features[j] for j in idxs], self._policies[policy]
+            )
+            for j, out in zip(idxs, outs):
+                explanations[j] = out
+        verdicts = self._responsibility.run_batch(
+            decisions, explanations, [request.get("group") for _, _, request in items]
+        )
+        return [
+            {
+                "id": req_id,
+                "trace_id": decision.trace_id,
+                "data_hash": decision.data_hash,
+                "model_version": decision.model_version,
+                "prediction": decision.prediction,
+                "confidence": decision.confidence,
+                "allowed": verdict.allowed,
+                "reasons": verdict.reasons,
+                "metrics": verdict.metrics,
+                "explanation": {
+                    "summary": explanation.summary,
+                    "technical": explanation.technical,
+                    "counterfactuals": explanation.counterfactuals,
+                    "caveats": explanation.caveats,
+                },
+            }
+            for (_, req_id, _), decision, explanation, verdict in zip(items, decisions, explanations, verdicts)
+        ]
+
+    def _read(self, rfile: IO[bytes], pending: "queue.Queue") -> None:
+        try:
+            for raw in iter(rfile.readline, b""):
+                line = raw.decode("utf-8").strip()
+                if line:
+                    pending.put(line)
+                if self._stopping.is_set():
+                    break
+        except (OSError, ValueError):
+            pass
+        finally:
+            pending.put(_EOF)
+
+    def serve(self, rfile: IO[bytes], wfile: IO[bytes]) -> WorkerStats:
+        """
+        Answer requests from rfile on wfile until end of input or stop().
+        """
+        pending: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        reader = threading.Thread(target=self._read, args=(rfile, pending), daemon=True)
+        reader.start()
+        done = False
+        while not done:
+            try:
+                first = pending.get(timeout=0.1)
+            except queue.Empty:
+                # Everything read so far has been answered; the reader may
+                # still be blocked waiting for input that never comes
+                if self._stopping.is_set():
+                    break
+                continue
+            if first is _EOF:
+                break
+            batch = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _EOF:
+                    done = True
+                    break
+                batch.append(item)
+            out = b"".join(
+                json.dumps(response).encode("utf-8") + b"\n" for response in self.handle_lines(batch)
+            )
+            try:
+                wfile.write(out)
+                wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                break
+        return self.stats
+
+    def serve_unix(self, path: str, backlog: int = 64) -> WorkerStats:
+        """
+        Listen on a Unix domain socket; each connection is served like a
+        stdin/stdout stream. Returns after stop() once open connections drain.
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(backlog)
+        listener.settimeout(0.2)
+        self._listener = listener
+        threads: List[threading.Thread] = []
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                conn.settimeout(None)
+                self.stats.connections += 1
+                thread = threading.Thread(target=self._serve_connection, args=(conn,), daemon=True)
+                thread.start()
+                threads.append(thread)
+                threads = [t for t in threads if t.is_alive()]
+        finally:
+            listener.close()
+            if os.path.exists(path):
+                os.unlink(path)
+            for thread in threads:
+                thread.join()
+        return self.stats
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as rfile, conn.makefile("wb") as wfile:
+            try:
+                self.serve(rfile, wfile)
+            finally:
+                # Wake the reader thread so the buffered file can be closed
+                try:
+                    conn.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+
+    def stop(self) -> None:
+        """
+        Stop accepting requests; queued ones are still answered.
+        """
+        self._stopping.set()
\ No newline at end of file
@@ -1,101 +1,158 @@
-from dataclasses import dataclass
-from typing import List, Dict
-
-
-@dataclass(frozen=True)
-class ResponsibilityVerdict:
-    """
-    Immutable verdict artifact from responsibility module.
-    """
-    allowed: bool
-    reasons: List[str]
-    metrics: Dict[str, float]
-    audit_bundle: Dict[str, any]
-    trace_id: str
-
-
-class ResponsibilityModule:
-    """
-    Responsibility module:
-    - Applies ethical and governance filters to decision artifacts
-    - Flags low-confidence or policy-violating outputs
-    - Produces audit bundles for traceability and review
-    """
-
-    def __init__(self, governance: Dict[str, any]):
-        self.governance = governance
-
-    def _check_confidence(self, confidence: float) -> bool:
-        """
-        Enforce minimum confidence threshold.
-        """
-        min_conf = self.governance.get("min_confidence", 0.7)
-        return confidence >= min_conf
-
-    def _check_sensitive_usage(self) -> bool:
-        """
-        Enforce exclusion of sensitive attributes.
-        """
-        return not self.governance.get("use_sensitive_attrs", False)
-
-    def _generate_reasons(self, decision, explanation) -> List[str]:
-        """
-        Collect reasons for blocking or flagging.
-        """
-        reasons = []
-        if not self._check_sensitive_usage():
-            reasons.append("Sensitive attributes were used.")
-        if not self._check_confidence(decision.confidence):
-            reasons.append(f"Confidence {decision.confidence:.2f} is below threshold.")
-        return reasons
-
-    def _generate_metrics(self, decision) -> Dict[str, float]:
-        """
-        Extract key metrics for audit.
-        """
-        top_feats = sorted(decision.feature_importance.items(), key=lambda kv: -abs(kv[1]))[:3]
-        return {
-            "confidence": decision.confidence,
-            "top_feature_1": top_feats[0][1] if len(top_feats) > 0 else 0.0,
-            "top_feature_2": top_feats[1][1] if len(top_feats) > 1 else 0.0,
-            "top_feature_3": top_feats[2][1] if len(top_feats) > 2 else 0.0,
-        }
-
-    def _generate_audit_bundle(self, decision, explanation) -> Dict[str, any]:
-        """
-        Compose audit bundle with traceable metadata.
-        """
-        return {
-            "trace_id": decision.trace_id,
-            "data_hash": decision.data_hash,
-            "model_version": decision.model_version,
-            "timestamp": decision.timestamp,
-            "summary": explanation.summary,
-            "caveats": explanation.caveats,
-            "feature_importance": decision.feature_importance,
-            "confidence": decision.confidence
-        }
-
-    def run(self, decision, explanation) -> ResponsibilityVerdict:
-        """
-        Apply governance filters and produce verdict.
-
-        Args:
-            decision: DecisionOutput
-            explanation: ExplanationOutput
-
-        Returns:
-            ResponsibilityVerdict with policy verdict, reasons, metrics, and audit bundle.
-        """
-        reasons = self._generate_reasons(decision, explanation)
-        allowed = len(reasons) == 0
-        metrics = self._generate_metrics(decision)
-        audit_bundle = self._generate_audit_bundle(decision, explanation)
-
-        return ResponsibilityVerdict(
-            allowed=allowed,
-            reasons=reasons,
-            metrics=metrics,
-            audit_bundle=audit_bundle,
-            trace_id=decision.trace_id
-        )
\ No newline at end of file
+from dataclasses import dataclass, field
+from typing import Hashable, List, Dict, Optional, Sequence
+
+from modules.decision.ranking import DEFAULT_TOP_K, ranked_features
+from modules.responsibility.fairness import FairnessMonitor
+from modules.responsibility.rules import RuleEngine, min_confidence
+from modules.telemetry.tracing import NULL_TELEMETRY, Telemetry
+
+FAIRNESS_CODE = "fairness_disparity"
+
+
+@dataclass(frozen=True)
+class ResponsibilityVerdict:
+    """
+    Immutable verdict artifact from responsibility module.
+    """
+    allowed: bool
+    reasons: List[str]
+    metrics: Dict[str, float]
+    audit_bundle: Dict[str, any]
+    trace_id: str
+    # Machine-readable code per reason, same order as reasons
+    reason_codes: List[str] = field(default_factory=list)
+
+
+class ResponsibilityModule:
+    """
+    Responsibility module:
+    - Applies ethical and governance filters to decision artifacts
+    - Flags low-confidence or policy-violating outputs
+    - Produces audit bundles for traceability and review
+
+    The governance checks are compiled once into a RuleEngine
+    (modules/responsibility/rules.py); build a new module after changing
+    the governance config. run_batch evaluates the rules as masks over a
+    whole batch. telemetry records the "responsibility.checks" stage timing
+    and counts verdicts by outcome and blocked reasons by reason code.
+    """
+
+    def __init__(
+        self,
+        governance: Dict[str, any],
+        fairness_monitor: Optional[FairnessMonitor] = None,
+        telemetry: Optional[Telemetry] = None,
+    ):
+        self.governance = governance
+        self.telemetry = telemetry if telemetry is not None else NULL_TELEMETRY
+        # Streaming group statistics for the governance "fairness" block
+        self.fairness = fairness_monitor or FairnessMonitor.from_governance(governance)
+        # Number of top_feature_N metrics; governance "metrics: {top_k: N}"
+        self.top_k = int(governance.get("metrics", {}).get("top_k", DEFAULT_TOP_K))
+        self.rules = RuleEngine.from_governance(governance)
+        # Threshold counterfactuals are solved against
+        self.min_confidence = min_confidence(governance)
+
+    def _generate_metrics(self, decision) -> Dict[str, float]:
+        """
+        Extract key metrics for audit.
+        """
+        top_feats = ranked_features(decision, self.top_k)
+        metrics = {"confidence": decision.confidence}
+        for i in range(self.top_k):
+            metrics[f"top_feature_{i + 1}"] = top_feats[i][1] if len(top_feats) > i else 0.0
+        return metrics
+
+    def _generate_audit_bundle(self, decision, explanation) -> Dict[str, any]:
+        """
+        Compose audit bundle with traceable metadata.
+        """
+        return {
+            "trace_id": decision.trace_id,
+            "data_hash": decision.data_hash,
+            "model_version": decision.model_version,
+            "timestamp": decision.timestamp,
+            "summary": explanation.summary,
+            "caveats": explanation.caveats,
+            "feature_importance": decision.feature_importance,
+            "confidence": decision.confidence
+        }
+
+    def _verdict(self, decision, explanation, reasons: List[str], codes: List[str], group) -> ResponsibilityVerdict:
+        """
+        Apply the fairness monitor to a rule outcome and assemble the verdict.
+        """
+        metrics = self._generate_metrics(decision)
+        if self.fairness is not None and group is not None:
+            # Record the guardrail outcome, then flag the decision only when
+            # its own group trails the others by more than the limit
+            self.fairness.update(group, len(reasons) == 0, decision.confidence, decision.timestamp)
+            fairness_reason = self.fairness.check(group)
+            if fairness_reason:
+                reasons.append(fairness_reason)
+                codes.append(FAIRNESS_CODE)
+            metrics["fairness_disparity"] = self.fairness.current_disparity()
+        allowed = len(reasons) == 0
+        if self.telemetry.enabled:
+            self.telemetry.count("verdicts_total", allowed=str(allowed).lower())
+            for code in codes:
+                self.telemetry.count("blocked_reasons_total", reason=code)
+
+        return ResponsibilityVerdict(
+            allowed=allowed,
+            reasons=reasons,
+            metrics=metrics,
+            audit_bundle=self._generate_audit_bundle(decision, explanation),
+            trace_id=decision.trace_id,
+            reason_codes=codes,
+        )
+
+    def run(self, decision, explanation, group: Optional[Hashable] = None) -> ResponsibilityVerdict:
+        """
+        Apply governance filters and produce verdict.
+
+        Args:
+            decision: DecisionOutput
+            explanation: ExplanationOutput
+            group: optional group label fed to the fairness monitor
+
+        Returns:
+            ResponsibilityVerdict with policy verdict, reasons, metrics, and audit bundle.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        reasons, codes = self.rules.evaluate_one(decision)
+        verdict = self._verdict(decision, explanation, reasons, codes, group)
+        if telemetry.enabled:
+            telemetry.record("responsibility.checks", decision.trace_id, t0, telemetry.now())
+        return verdict
+
+    def run_batch(
+        self,
+        decisions: Sequence,
+        explanations: Sequence,
+        groups: Optional[Sequence[Optional[Hashable]]] = None,
+    ) -> List[ResponsibilityVerdict]:
+        """
+        Verdicts for many decisions with the rules evaluated once over the
+        batch; identical to calling `run` per row in order.
+
+        Args:
+            decisions: DecisionOutput sequence
+            explanations: ExplanationOutput sequence (same order)
+            groups: optional fairness group label per row
+
+        Returns:
+            List of ResponsibilityVerdict, one per decision.
+        """
+        telemetry = self.telemetry
+        t0 = telemetry.now() if telemetry.enabled else 0.0
+        outcome = self.rules.evaluate(decisions)
+        groups = groups if groups is not None else [None] * len(decisions)
+        verdicts = [
+            self._verdict(decision, explanation, outcome.reasons[i], outcome.codes[i], groups[i])
+            for i, (decision, explanation) in enumerate(zip(decisions, explanations))
+        ]
+        if telemetry.enabled:
+            telemetry.record("responsibility.batch", None, t0, telemetry.now(), rows=len(verdicts))
+        return verdicts
\ No newline at end of file
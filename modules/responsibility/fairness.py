@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set
+import math
+import time
+
+
+@dataclass
+class GroupStats:
+    """
+    Running statistics for one group: counts, allow rate and confidence
+    mean/variance (Welford), plus an exponentially decayed copy of each.
+    """
+    count: int = 0
+    allowed: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    # Decayed accumulators, valid at time `updated`
+    weight: float = 0.0
+    allowed_weight: float = 0.0
+    decayed_mean: float = 0.0
+    decayed_m2: float = 0.0
+    updated: Optional[float] = None
+
+    @property
+    def allow_rate(self) -> float:
+        return self.allowed / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def decayed_allow_rate(self) -> float:
+        return self.allowed_weight / self.weight if self.weight > 0 else 0.0
+
+    def decay_to(self, now: float, half_life: Optional[float]) -> None:
+        """
+        Age the decayed accumulators to time `now`.
+        """
+        if half_life is not None and self.updated is not None and now > self.updated:
+            factor = 0.5 ** ((now - self.updated) / half_life)
+            self.weight *= factor
+            self.allowed_weight *= factor
+            self.decayed_m2 *= factor
+        if self.updated is None or now > self.updated:
+            self.updated = now
+
+    def add(self, allowed: bool, confidence: float, now: float, half_life: Optional[float]) -> None:
+        self.count += 1
+        self.allowed += int(allowed)
+        delta = confidence - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (confidence - self.mean)
+
+        self.decay_to(now, half_life)
+        self.weight += 1.0
+        self.allowed_weight += float(allowed)
+        d_delta = confidence - self.decayed_mean
+        self.decayed_mean += d_delta / self.weight
+        self.decayed_m2 += d_delta * (confidence - self.decayed_mean)
+
+    def merge(self, other: "GroupStats", half_life: Optional[float]) -> None:
+        """
+        Combine another shard's statistics into this one (Chan et al.).
+        """
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.allowed += other.allowed
+
+        now = max(t for t in (self.updated, other.updated) if t is not None)
+        self.decay_to(now, half_life)
+        other = GroupStats(**other.__dict__)
+        other.decay_to(now, half_life)
+        weight = self.weight + other.weight
+        if weight > 0:
+            d_delta = other.decayed_mean - self.decayed_mean
+            self.decayed_m2 += other.decayed_m2 + d_delta * d_delta * self.weight * other.weight / weight
+            self.decayed_mean += d_delta * other.weight / weight
+        self.weight = weight
+        self.allowed_weight += other.allowed_weight
+
+
+class FairnessMonitor:
+    """
+    Streaming per-group fairness aggregator.
+
+    Each update is O(1); disparity (largest gap in allow rate between groups
+    with at least min_group_size decisions) is answered from the running
+    statistics without rescanning history. The eligible rates, their
+    extremes and the disadvantaged set are kept current as updates arrive,
+    so check() does not scan the groups; only an update to the best or worst
+    group rescans them. With half_life (seconds), a decayed view weights
+    recent decisions more. Monitors built on parallel shards can be merged.
+    """
+
+    def __init__(self, max_disparity: float = 0.1, min_group_size: int = 30, half_life: Optional[float] = None):
+        self.max_disparity = max_disparity
+        self.min_group_size = min_group_size
+        self.half_life = half_life
+        self.groups: Dict[Hashable, GroupStats] = {}
+        # Verdict state derived from current_rates(); decay scales a group's
+        # allowed and total weight alike, so only updated groups change rate
+        self._rates: Dict[Hashable, float] = {}
+        self._best = 0.0
+        self._worst = 0.0
+        self._disadvantaged: Set[Hashable] = set()
+
+    @classmethod
+    def from_governance(cls, governance: Dict[str, Any]) -> Optional["FairnessMonitor"]:
+        """
+        Build a monitor from the governance "fairness" section, or None when
+        check_distribution is off.
+        """
+        fairness = governance.get("fairness") or {}
+        if not fairness.get("check_distribution", False):
+            return None
+        return cls(
+            max_disparity=float(fairness.get("max_disparity", 0.1)),
+            min_group_size=int(fairness.get("min_group_size", 30)),
+            half_life=fairness.get("half_life"),
+        )
+
+    def update(self, group: Hashable, allowed: bool, confidence: float, timestamp: Optional[float] = None) -> None:
+        stats = self.groups.get(group)
+        if stats is None:
+            stats = self.groups[group] = GroupStats()
+        stats.add(allowed, confidence, time.time() if timestamp is None else timestamp, self.half_life)
+        if stats.count < self.min_group_size:
+            return
+        rate = stats.allow_rate if self.half_life is None else stats.decayed_allow_rate
+        old = self._rates.get(group)
+        self._rates[group] = rate
+        if old is None or old in (self._best, self._worst) or not self._worst <= rate <= self._best:
+            self._refresh()
+        elif self._best - rate > self.max_disparity:
+            self._disadvantaged.add(group)
+        else:
+            self._disadvantaged.discard(group)
+
+    def _refresh(self) -> None:
+        """
+        Rebuild the verdict state from every eligible group.
+        """
+        self._rates = self.current_rates()
+        rates = self._rates.values()
+        self._best = max(rates, default=0.0)
+        self._worst = min(rates, default=0.0)
+        if len(self._rates) < 2:
+            self._disadvantaged = set()
+        else:
+            self._disadvantaged = {g for g, r in self._rates.items() if self._best - r > self.max_disparity}
+
+    def allow_rates(self, decayed: bool = False, now: Optional[float] = None) -> Dict[Hashable, float]:
+        """
+        Allow rate per group that has reached min_group_size.
+        """
+        rates = {}
+        for group, stats in self.groups.items():
+            if stats.count < self.min_group_size:
+                continue
+            if decayed:
+                if now is not None:
+                    stats.decay_to(now, self.half_life)
+                rates[group] = stats.decayed_allow_rate
+            else:
+                rates[group] = stats.allow_rate
+        return rates
+
+    def disparity(self, decayed: bool = False, now: Optional[float] = None) -> float:
+        """
+        Max minus min allow rate across eligible groups (0.0 with fewer than two).
+        """
+        rates = self.allow_rates(decayed, now)
+        if len(rates) < 2:
+            return 0.0
+        return max(rates.values()) - min(rates.values())
+
+    def current_rates(self) -> Dict[Hashable, float]:
+        """
+        Allow rates used for verdicts: the decayed view aged to the latest
+        update when half_life is set, lifetime statistics otherwise.
+        """
+        if self.half_life is None:
+            return self.allow_rates()
+        latest = max((s.updated for s in self.groups.values() if s.updated is not None), default=None)
+        return self.allow_rates(decayed=True, now=latest)
+
+    def current_disparity(self) -> float:
+        """
+        Disparity computed from current_rates().
+        """
+        if len(self._rates) < 2:
+            return 0.0
+        return self._best - self._worst
+
+    def disadvantaged_groups(self) -> Set[Hashable]:
+        """
+        Eligible groups whose allow rate trails the best group's by more
+        than max_disparity.
+        """
+        return set(self._disadvantaged)
+
+    def check(self, group: Optional[Hashable] = None) -> Optional[str]:
+        """
+        Verdict reason when disparity exceeds the configured limit, else None.
+        With a group, the reason is only returned when that group is one of
+        the disadvantaged groups, so favored groups are never flagged.
+        """
+        gap = self.current_disparity()
+        if gap <= self.max_disparity:
+            return None
+        if group is not None and group not in self._disadvantaged:
+            return None
+        return f"Allow-rate disparity {gap:.2f} across groups exceeds {self.max_disparity:.2f}."
+
+    def merge(self, other: "FairnessMonitor") -> "FairnessMonitor":
+        """
+        Fold another monitor's groups into this one and return self.
+        """
+        for group, stats in other.groups.items():
+            mine = self.groups.get(group)
+            if mine is None:
+                self.groups[group] = GroupStats(**stats.__dict__)
+            else:
+                mine.merge(stats, self.half_life)
+        self._refresh()
+        return self
+
+    def summary(self) -> Dict[Hashable, Dict[str, float]]:
+        """
+        Per-group counts, allow rate and confidence mean/std.
+        """
+        return {
+            group: {
+                "count": s.count,
+                "allow_rate": s.allow_rate,
+                "confidence_mean": s.mean,
+                "confidence_std": math.sqrt(s.variance),
+            }
+            for group, s in self.groups.items()
+        }
\ No newline at end of file
@@ -0,0 +1,200 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import time
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RuleInputs:
+    """
+    Column view of a batch of decisions. Rules read the same attribute
+    names from a single DecisionOutput, so one predicate serves both.
+    """
+    confidence: Any
+    prediction: Any
+
+    @classmethod
+    def from_decisions(cls, decisions: Sequence[Any]) -> "RuleInputs":
+        n = len(decisions)
+        return cls(
+            confidence=np.fromiter((d.confidence for d in decisions), dtype=float, count=n),
+            prediction=np.fromiter((d.prediction for d in decisions), dtype=float, count=n),
+        )
+
+    def row(self, i: int) -> "RuleInputs":
+        return RuleInputs(confidence=self.confidence[i], prediction=self.prediction[i])
+
+    def take(self, idx: np.ndarray) -> "RuleInputs":
+        return RuleInputs(confidence=self.confidence[idx], prediction=self.prediction[idx])
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One compiled governance check.
+
+    passes maps a decision (or RuleInputs) to a boolean (mask) that is True
+    where the decision satisfies the rule; message renders the reason for
+    one failing row. Constant rules depend only on the governance config and
+    have no predicate: they are resolved at compile time.
+    """
+    code: str
+    message: Callable[[Any], str]
+    passes: Optional[Callable[[Any], Any]] = None
+    constant: bool = False
+
+
+@dataclass
+class RuleStats:
+    """
+    Evaluation counters for one rule (timings are batch evaluations only).
+    """
+    evaluated: int = 0
+    violations: int = 0
+    seconds: float = 0.0
+
+    @property
+    def violation_rate(self) -> float:
+        return self.violations / self.evaluated if self.evaluated else 0.0
+
+
+@dataclass
+class RuleOutcome:
+    """
+    Verdicts for a batch: allow mask plus per-row reason codes and messages
+    (empty lists when evaluated with reasons=False).
+    """
+    allowed: np.ndarray
+    codes: List[List[str]] = field(default_factory=list)
+    reasons: List[List[str]] = field(default_factory=list)
+
+
+def _sensitive_attrs_rule(governance: Dict[str, Any]) -> Optional[Rule]:
+    if not governance.get("use_sensitive_attrs", False):
+        return None
+    return Rule("sensitive_attrs", lambda x: "Sensitive attributes were used.", constant=True)
+
+
+def min_confidence(governance: Dict[str, Any]) -> float:
+    """
+    Confidence threshold of the low_confidence rule.
+    """
+    return float(governance.get("min_confidence", 0.7))
+
+
+def _min_confidence_rule(governance: Dict[str, Any]) -> Optional[Rule]:
+    threshold = min_confidence(governance)
+    return Rule(
+        "low_confidence",
+        lambda x: f"Confidence {x.confidence:.2f} is below threshold.",
+        passes=lambda x: x.confidence >= threshold,
+    )
+
+
+# Builders turn the governance config into rules; reasons are reported in
+# this order. Append a builder to add a rule. Only sections that decide
+# whether a decision passes become rules: escalation, privacy and audit
+# configure what happens around a verdict, and fairness needs per-group
+# state (see FairnessMonitor).
+RULE_BUILDERS: List[Callable[[Dict[str, Any]], Optional[Rule]]] = [
+    _sensitive_attrs_rule,
+    _min_confidence_rule,
+]
+
+
+class RuleEngine:
+    """
+    Governance config compiled once into an ordered rule set.
+
+    Rules are evaluated as vectorized predicates over a batch, with
+    per-rule evaluation counts and timings. With reasons=False only the
+    allow mask is needed, so each rule only sees rows still allowed.
+    Reasons are always reported in rule order.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self.constant = [r for r in self.rules if r.constant]
+        self.dynamic = [r for r in self.rules if not r.constant]
+        self.stats: Dict[str, RuleStats] = {r.code: RuleStats() for r in self.rules}
+        self._checks = [(r, self.stats[r.code]) for r in self.rules]
+
+    @classmethod
+    def from_governance(cls, governance: Dict[str, Any]) -> "RuleEngine":
+        rules = [rule for rule in (build(governance) for build in RULE_BUILDERS) if rule is not None]
+        return cls(rules)
+
+    def evaluate_one(self, decision) -> Tuple[List[str], List[str]]:
+        """
+        Check a single decision; returns (reasons, codes) in rule order.
+        """
+        reasons, codes = [], []
+        for rule, stats in self._checks:
+            stats.evaluated += 1
+            if rule.constant or not rule.passes(decision):
+                stats.violations += 1
+                reasons.append(rule.message(decision))
+                codes.append(rule.code)
+        return reasons, codes
+
+    def evaluate(self, decisions: Any, reasons: bool = True) -> RuleOutcome:
+        """
+        Check a batch of decisions (a sequence of DecisionOutput or RuleInputs).
+        """
+        if isinstance(decisions, RuleInputs):
+            inputs, row = decisions, decisions.row
+        else:
+            inputs, row = RuleInputs.from_decisions(decisions), decisions.__getitem__
+        n = len(inputs.confidence)
+        allowed = np.ones(n, dtype=bool)
+        for rule in self.constant:
+            self.stats[rule.code].evaluated += n
+            self.stats[rule.code].violations += n
+            allowed[:] = False
+
+        if not reasons:
+            for rule in self.dynamic:
+                idx = np.flatnonzero(allowed)
+                if idx.size == 0:
+                    break
+                start = time.perf_counter()
+                hit = ~np.asarray(rule.passes(inputs.take(idx)), dtype=bool)
+                stats = self.stats[rule.code]
+                stats.seconds += time.perf_counter() - start
+                stats.evaluated += idx.size
+                stats.violations += int(hit.sum())
+                allowed[idx[hit]] = False
+            return RuleOutcome(allowed=allowed)
+
+        masks = {}
+        for rule in self.dynamic:
+            start = time.perf_counter()
+            hit = ~np.broadcast_to(np.asarray(rule.passes(inputs), dtype=bool), (n,))
+            stats = self.stats[rule.code]
+            stats.seconds += time.perf_counter() - start
+            stats.evaluated += n
+            stats.violations += int(hit.sum())
+            masks[rule.code] = hit
+            allowed &= ~hit
+
+        codes: List[List[str]] = [[] for _ in range(n)]
+        messages: List[List[str]] = [[] for _ in range(n)]
+        for i in np.flatnonzero(~allowed).tolist():
+            for rule in self.rules:
+                if rule.constant or masks[rule.code][i]:
+                    codes[i].append(rule.code)
+                    messages[i].append(rule.message(row(i)))
+        return RuleOutcome(allowed=allowed, codes=codes, reasons=messages)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-rule counters, in rule order.
+        """
+        return {
+            r.code: {
+                "evaluated": self.stats[r.code].evaluated,
+                "violations": self.stats[r.code].violations,
+                "seconds": self.stats[r.code].seconds,
+            }
+            for r in self.rules
+        }
\ No newline at end of file
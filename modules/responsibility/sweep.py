@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence
+import numpy as np
+
+from modules.decision.policy import PolicyLike, compile_policy
+from modules.responsibility.rules import RuleEngine, RuleInputs
+
+CURRENT = "current"
+
+
+@dataclass
+class PolicyOutcome:
+    """
+    Population-level verdict statistics for one policy.
+
+    Quantiles are read from the confidence histogram (bin resolution) so
+    that memory does not grow with the population. newly_allowed and
+    newly_blocked count rows whose verdict differs from the current policy.
+    """
+    name: str
+    rows: int
+    allowed: int
+    allow_rate: float
+    mean_confidence: float
+    std_confidence: float
+    quantiles: Dict[str, float]
+    histogram: List[int]
+    newly_allowed: int = 0
+    newly_blocked: int = 0
+    group_allow_rates: Dict[Hashable, float] = field(default_factory=dict)
+    disparity: float = 0.0
+
+
+@dataclass
+class SweepReport:
+    """
+    Outcome of the current policy and every candidate over one population.
+    """
+    current: PolicyOutcome
+    candidates: Dict[str, PolicyOutcome]
+    bins: int
+
+    def ranked(self, key: str = "allow_rate", reverse: bool = True) -> List[PolicyOutcome]:
+        """
+        Candidates sorted by an outcome field (highest allow rate first by default).
+        """
+        return sorted(self.candidates.values(), key=lambda o: getattr(o, key), reverse=reverse)
+
+
+class PolicySweep:
+    """
+    What-if evaluation of K candidate policies against the current one.
+
+    All K+1 policies are aligned to the population's feature layout and
+    stacked into one F x (K+1) weight matrix, so each chunk of rows is
+    scored with a single matrix product, divided by each policy's norm and
+    mapped through the logistic exactly as DecisionModule.run_batch does.
+    Verdicts come from the governance rules (min_confidence and any
+    config-level rule). Rows are processed in chunks of at most max_cells
+    scores, and only running counts and histograms are kept.
+    """
+
+    def __init__(
+        self,
+        current: PolicyLike,
+        candidates: Mapping[str, PolicyLike],
+        governance: Dict[str, Any],
+        bins: int = 100,
+        max_cells: int = 4_000_000,
+        min_group_size: Optional[int] = None,
+    ):
+        if CURRENT in candidates:
+            raise ValueError(f"Candidate name {CURRENT!r} is reserved for the current policy")
+        self.names = [CURRENT] + list(candidates)
+        self.policies = [compile_policy(current)] + [compile_policy(p) for p in candidates.values()]
+        self.rules = RuleEngine.from_governance(governance)
+        self.bins = max(1, bins)
+        self.max_cells = max(1, max_cells)
+        if min_group_size is None:
+            min_group_size = int((governance.get("fairness") or {}).get("min_group_size", 30))
+        self.min_group_size = min_group_size
+
+    def _weights(self, feature_names: Sequence[str]):
+        layouts = [policy.layout(feature_names) for policy in self.policies]
+        weights = np.stack([w for w, _ in layouts], axis=1)
+        norms = np.array([n for _, n in layouts])
+        return weights, norms
+
+    def run(
+        self,
+        matrix: np.ndarray,
+        feature_names: Sequence[str],
+        groups: Optional[Sequence[Hashable]] = None,
+    ) -> SweepReport:
+        """
+        Score the N x F population under every policy.
+
+        Args:
+            matrix: N x F feature matrix
+            feature_names: column names of matrix
+            groups: optional group label per row for allow-rate disparity
+
+        Returns:
+            SweepReport with the current policy's outcome and one per candidate.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.ndim != 2 or matrix.shape[1] != len(feature_names):
+            raise ValueError(f"Expected an N x {len(feature_names)} feature matrix, got shape {matrix.shape}")
+        n, k = matrix.shape[0], len(self.policies)
+        weights, norms = self._weights(feature_names)
+
+        if groups is not None:
+            if len(groups) != n:
+                raise ValueError(f"Expected {n} group labels, got {len(groups)}")
+            index: Dict[Hashable, int] = {}
+            codes = np.fromiter((index.setdefault(g, len(index)) for g in groups), dtype=np.int64, count=n)
+            group_labels = list(index)
+            group_rows = np.bincount(codes, minlength=len(group_labels))
+            group_allowed = np.zeros((k, len(group_labels)), dtype=np.int64)
+        else:
+            codes, group_labels = None, []
+
+        allowed = np.zeros(k, dtype=np.int64)
+        newly_allowed = np.zeros(k, dtype=np.int64)
+        newly_blocked = np.zeros(k, dtype=np.int64)
+        conf_sum = np.zeros(k)
+        conf_sq = np.zeros(k)
+        hist = np.zeros((k, self.bins), dtype=np.int64)
+        offsets = np.arange(k) * self.bins
+
+        chunk = max(1, self.max_cells // k)
+        for start in range(0, n, chunk):
+            block = matrix[start:start + chunk]
+            scores = block @ weights / norms
+            confs = 1.0 / (1.0 + np.exp(-scores))
+            ok = self.rules.evaluate(RuleInputs(confidence=confs.ravel(), prediction=scores.ravel()),
+                                     reasons=False).allowed.reshape(confs.shape)
+
+            allowed += ok.sum(axis=0)
+            base = ok[:, :1]
+            newly_allowed += (ok & ~base).sum(axis=0)
+            newly_blocked += (~ok & base).sum(axis=0)
+            conf_sum += confs.sum(axis=0)
+            conf_sq += (confs * confs).sum(axis=0)
+            idx = np.clip((confs * self.bins).astype(np.int64), 0, self.bins - 1) + offsets
+            hist += np.bincount(idx.ravel(), minlength=k * self.bins).reshape(k, self.bins)
+            if codes is not None:
+                block_codes = codes[start:start + chunk]
+                for j in range(k):
+                    group_allowed[j] += np.bincount(block_codes[ok[:, j]], minlength=len(group_labels))
+
+        outcomes = []
+        for j, name in enumerate(self.names):
+            mean = conf_sum[j] / n if n else 0.0
+            var = max(conf_sq[j] / n - mean * mean, 0.0) if n else 0.0
+            rates: Dict[Hashable, float] = {}
+            if codes is not None:
+                for g, label in enumerate(group_labels):
+                    if group_rows[g] >= self.min_group_size:
+                        rates[label] = float(group_allowed[j, g] / group_rows[g])
+            outcomes.append(PolicyOutcome(
+                name=name,
+                rows=n,
+                allowed=int(allowed[j]),
+                allow_rate=float(allowed[j] / n) if n else 0.0,
+                mean_confidence=float(mean),
+                std_confidence=float(np.sqrt(var)),
+                quantiles=self._quantiles(hist[j]),
+                histogram=hist[j].tolist(),
+                newly_allowed=int(newly_allowed[j]),
+                newly_blocked=int(newly_blocked[j]),
+                group_allow_rates=rates,
+                disparity=max(rates.values()) - min(rates.values()) if len(rates) >= 2 else 0.0,
+            ))
+        return SweepReport(current=outcomes[0], candidates={o.name: o for o in outcomes[1:]}, bins=self.bins)
+
+    def _quantiles(self, hist: np.ndarray, qs: Sequence[float] = (0.1, 0.5, 0.9)) -> Dict[str, float]:
+        """
+        Approximate confidence quantiles: upper edge of the bin holding each one.
+        """
+        total = int(hist.sum())
+        if total == 0:
+            return {f"p{int(q * 100)}": 0.0 for q in qs}
+        cumulative = np.cumsum(hist)
+        return {
+            f"p{int(q * 100)}": float((np.searchsorted(cumulative, q * total) + 1) / self.bins)
+            for q in qs
+        }
\ No newline at end of file
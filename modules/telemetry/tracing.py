@@ -0,0 +1,179 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import bisect
+import os
+import random
+import threading
+import time
+
+# Prometheus-style latency buckets (seconds)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+@dataclass(frozen=True)
+class Span:
+    """
+    Timing of one stage of one decision.
+    """
+    stage: str
+    trace_id: Optional[str]
+    start: float
+    duration: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, out = 0, []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bucket bound containing the q-quantile (inf when in the last bucket).
+        """
+        if self.count == 0:
+            return 0.0
+        target, total = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            if total >= target:
+                return bound
+        return float("inf")
+
+
+class Telemetry:
+    """
+    Per-stage timing and verdict counters keyed by trace_id.
+
+    Modules call `enabled` before taking timestamps, so a disabled instance
+    (NULL_TELEMETRY, the default everywhere) costs one attribute check per
+    stage. When enabled, spans are sampled per trace id (all stages of a
+    sampled trace are kept) at sample_rate, aggregated into per-stage
+    histograms and passed to callback. Counters are always exact.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        callback: Optional[Callable[[Span], None]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prefix: str = "agent",
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.callback = callback
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def sampled(self, trace_id: Optional[str]) -> bool:
+        """
+        Deterministic per-trace sampling decision.
+        """
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        if trace_id:
+            try:
+                return int(trace_id[-8:], 16) / 0xFFFFFFFF < self.sample_rate
+            except ValueError:
+                pass
+        return random.random() < self.sample_rate
+
+    def record(self, stage: str, trace_id: Optional[str], start: float, end: float, **attributes) -> None:
+        """
+        Record one stage timing (perf_counter start/end).
+        """
+        if not self.enabled or not self.sampled(trace_id):
+            return
+        duration = end - start
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram(self.buckets)
+            hist.observe(duration)
+        if self.callback is not None:
+            self.callback(Span(stage, trace_id, start, duration, attributes))
+
+    def count(self, name: str, value: float = 1.0, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted((k, str(v)) for k, v in labels.items()))), 0.0)
+
+    def render_prometheus(self) -> str:
+        """
+        Histograms and counters in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            metric = f"{self.prefix}_stage_seconds"
+            if self.histograms:
+                lines.append(f"# HELP {metric} Per-stage latency of the agent pipeline.")
+                lines.append(f"# TYPE {metric} histogram")
+            for stage in sorted(self.histograms):
+                hist = self.histograms[stage]
+                for le, total in hist.cumulative():
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {total}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {hist.sum!r}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {hist.count}')
+            seen = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                full = f"{self.prefix}_{name}"
+                if full not in seen:
+                    lines.append(f"# TYPE {full} counter")
+                    seen.add(full)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{full}{{{label_text}}} {value:g}" if label_text else f"{full} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Atomically write the Prometheus text file (node_exporter textfile style).
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+# Shared disabled instance used when no telemetry is configured
+NULL_TELEMETRY = Telemetry(enabled=False)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import argparse
+from modules.pipeline.streaming import StreamingRunner
+
+# Explicit policy weights (same as the demo)
+policy = {
+    "attendance": 0.4,
+    "assignments": 0.3,
+    "labs": 0.3
+}
+
+# Governance rules
+governance = {
+    "use_sensitive_attrs": False,
+    "min_confidence": 0.7
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a CSV/JSONL file through the agent pipeline.")
+    parser.add_argument("input", help="CSV or JSONL input (format of data/fixtures/dummy_students.csv)")
+    parser.add_argument("output", help="JSONL file receiving one result per input row")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file enabling resume after a crash")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--id-column", default="student_id")
+    parser.add_argument("--exclude", nargs="*", default=["final_score"], help="non-feature columns")
+    args = parser.parse_args()
+
+    runner = StreamingRunner(
+        policy,
+        governance,
+        id_column=args.id_column,
+        exclude_columns=args.exclude,
+        chunk_size=args.chunk_size,
+    )
+    stats = runner.run(args.input, args.output, checkpoint_path=args.checkpoint)
+
+    print(f"Processed {stats.rows} rows in {stats.chunks} chunks (resumed from row {stats.resumed_from})")
+    print(f"Allowed: {stats.allowed}  Blocked: {stats.blocked}")
+    print(f"Results written to {args.output}")
\ No newline at end of file
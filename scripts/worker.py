@@ -0,0 +1,60 @@
+import argparse
+import signal
+import sys
+
+from modules.pipeline.worker import DEFAULT_POLICY, JsonlWorker, load_config
+
+
+def parse_policy(spec):
+    """
+    Parse a --policy argument of the form [NAME=]FILE.
+    """
+    name, sep, path = spec.partition("=")
+    if not sep:
+        name, path = "default", spec
+    return name, load_config(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve JSONL requests with warm agent modules.")
+    parser.add_argument("--socket", default=None, help="listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--governance", default=None, help="governance YAML (e.g. configs/governance/example_policy.yaml)")
+    parser.add_argument("--profiles", default=None, help="audience profiles YAML (e.g. configs/audiences/example_profiles.yaml)")
+    parser.add_argument("--policy", action="append", default=[], metavar="[NAME=]FILE",
+                        help="policy weights YAML/JSON; repeat with NAME= for several policies")
+    parser.add_argument("--audience", default="default")
+    parser.add_argument("--models", default=None, metavar="DIR",
+                        help="model registry directory (<version>.npz files) blended into the policy score")
+    parser.add_argument("--model-version", default=None, help="default model version for requests without one")
+    parser.add_argument("--model-weight", type=float, default=0.5)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--eager", action="store_true", help="load modules before reading the first request")
+    args = parser.parse_args()
+
+    policies = dict(parse_policy(spec) for spec in args.policy) or {"default": DEFAULT_POLICY}
+    registry = None
+    if args.models:
+        from modules.decision.models import ModelRegistry
+        registry = ModelRegistry(args.models)
+    worker = JsonlWorker(
+        policies=policies,
+        governance_path=args.governance,
+        profiles_path=args.profiles,
+        audience=args.audience,
+        default_policy="default" if "default" in policies else next(iter(policies)),
+        max_batch=args.max_batch,
+        model=registry,
+        model_version=args.model_version,
+        model_weight=args.model_weight,
+    )
+    # SIGTERM/SIGINT: stop reading, answer what is queued, then exit
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    if args.eager:
+        worker.load()
+
+    if args.socket:
+        stats = worker.serve_unix(args.socket)
+    else:
+        stats = worker.serve(sys.stdin.buffer, sys.stdout.buffer)
+    print(f"Answered {stats.requests} requests in {stats.batches} batches ({stats.errors} errors)", file=sys.stderr)
\ No newline at end of file
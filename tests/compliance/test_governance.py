@@ -1,52 +1,235 @@
-import unittest
-from modules.decision.core import DecisionModule
-from modules.explanation.core import ExplanationModule
-from modules.responsibility.core import ResponsibilityModule
-
-
-class TestGovernanceCompliance(unittest.TestCase):
-    """
-    Compliance tests to ensure governance rules are enforced:
-    - Confidence thresholds
-    - Sensitive attribute usage
-    """
-
-    def setUp(self):
-        self.features = {"attendance": 0.50, "assignments": 0.40, "labs": 0.45}
-        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
-        self.decision_module = DecisionModule(model=None, seed=42)
-        self.explanation_module = ExplanationModule()
-
-    def test_low_confidence_blocked(self):
-        governance = {"use_sensitive_attrs": False, "min_confidence": 0.9}
-        decision = self.decision_module.run(self.features, self.policy)
-        explanation = self.explanation_module.run(decision)
-        responsibility_module = ResponsibilityModule(governance)
-        verdict = responsibility_module.run(decision, explanation)
-
-        self.assertFalse(verdict.allowed)
-        self.assertIn("Confidence", " ".join(verdict.reasons))
-
-    def test_sensitive_attribute_blocked(self):
-        governance = {"use_sensitive_attrs": True, "min_confidence": 0.7}
-        decision = self.decision_module.run(self.features, self.policy)
-        explanation = self.explanation_module.run(decision)
-        responsibility_module = ResponsibilityModule(governance)
-        verdict = responsibility_module.run(decision, explanation)
-
-        self.assertFalse(verdict.allowed)
-        self.assertIn("Sensitive", " ".join(verdict.reasons))
-
-    def test_valid_decision_allowed(self):
-        governance = {"use_sensitive_attrs": False, "min_confidence": 0.5}
-        decision = self.decision_module.run(self.features, self.policy)
-        explanation = self.explanation_module.run(decision)
-        responsibility_module = ResponsibilityModule(governance)
-        verdict = responsibility_module.run(decision, explanation)
-
-        self.assertTrue(verdict.allowed)
-        self.assertEqual(verdict.reasons, [])
-
-
-if __name__ == "__main__":
+import unittest
+import numpy as np
+from modules.decision.core import DecisionModule
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+from modules.responsibility.fairness import FairnessMonitor
+from modules.responsibility.rules import RuleEngine
+from modules.responsibility.sweep import PolicySweep
+
+
+class TestGovernanceCompliance(unittest.TestCase):
+    """
+    Compliance tests to ensure governance rules are enforced:
+    - Confidence thresholds
+    - Sensitive attribute usage
+    """
+
+    def setUp(self):
+        self.features = {"attendance": 0.50, "assignments": 0.40, "labs": 0.45}
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.decision_module = DecisionModule(model=None, seed=42)
+        self.explanation_module = ExplanationModule()
+
+    def test_low_confidence_blocked(self):
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.9}
+        decision = self.decision_module.run(self.features, self.policy)
+        explanation = self.explanation_module.run(decision)
+        responsibility_module = ResponsibilityModule(governance)
+        verdict = responsibility_module.run(decision, explanation)
+
+        self.assertFalse(verdict.allowed)
+        self.assertIn("Confidence", " ".join(verdict.reasons))
+
+    def test_sensitive_attribute_blocked(self):
+        governance = {"use_sensitive_attrs": True, "min_confidence": 0.7}
+        decision = self.decision_module.run(self.features, self.policy)
+        explanation = self.explanation_module.run(decision)
+        responsibility_module = ResponsibilityModule(governance)
+        verdict = responsibility_module.run(decision, explanation)
+
+        self.assertFalse(verdict.allowed)
+        self.assertIn("Sensitive", " ".join(verdict.reasons))
+
+    def test_valid_decision_allowed(self):
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.5}
+        decision = self.decision_module.run(self.features, self.policy)
+        explanation = self.explanation_module.run(decision)
+        responsibility_module = ResponsibilityModule(governance)
+        verdict = responsibility_module.run(decision, explanation)
+
+        self.assertTrue(verdict.allowed)
+        self.assertEqual(verdict.reasons, [])
+
+    def test_fairness_disparity_blocked(self):
+        governance = {
+            "use_sensitive_attrs": False,
+            "min_confidence": 0.65,
+            "fairness": {"check_distribution": True, "max_disparity": 0.1, "min_group_size": 5},
+        }
+        responsibility_module = ResponsibilityModule(governance)
+        high = {"attendance": 0.9, "assignments": 0.9, "labs": 0.9}
+        low = {"attendance": 0.3, "assignments": 0.3, "labs": 0.3}
+        verdict = None
+        for _ in range(5):
+            for group, features in (("a", high), ("b", low)):
+                decision = self.decision_module.run(features, self.policy)
+                explanation = self.explanation_module.run(decision)
+                verdict = responsibility_module.run(decision, explanation, group=group)
+
+        self.assertFalse(verdict.allowed)
+        self.assertIn("disparity", " ".join(verdict.reasons))
+        self.assertAlmostEqual(verdict.metrics["fairness_disparity"], 1.0)
+
+    def test_fairness_disparity_does_not_block_favored_group(self):
+        governance = {
+            "use_sensitive_attrs": False,
+            "min_confidence": 0.65,
+            "fairness": {"check_distribution": True, "max_disparity": 0.1, "min_group_size": 5},
+        }
+        responsibility_module = ResponsibilityModule(governance)
+        high = {"attendance": 0.9, "assignments": 0.9, "labs": 0.9}
+        low = {"attendance": 0.3, "assignments": 0.3, "labs": 0.3}
+        verdicts = {}
+        for _ in range(6):
+            for group, features in (("a", high), ("b", low)):
+                decision = self.decision_module.run(features, self.policy)
+                explanation = self.explanation_module.run(decision)
+                verdicts[group] = responsibility_module.run(decision, explanation, group=group)
+
+        self.assertEqual(responsibility_module.fairness.disadvantaged_groups(), {"b"})
+        self.assertTrue(verdicts["a"].allowed)
+        self.assertNotIn("fairness_disparity", verdicts["a"].reason_codes)
+        self.assertAlmostEqual(verdicts["a"].metrics["fairness_disparity"], 1.0)
+        self.assertIn("fairness_disparity", verdicts["b"].reason_codes)
+
+    def test_fairness_disabled_without_check_distribution(self):
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.5,
+                      "fairness": {"check_distribution": False}}
+        self.assertIsNone(ResponsibilityModule(governance).fairness)
+
+
+class TestFairnessMonitor(unittest.TestCase):
+    """
+    Streaming statistics must match a full recomputation, including after
+    merging shards.
+    """
+
+    def test_merge_matches_single_stream(self):
+        events = [("a" if i % 3 else "b", i % 4 != 0, 0.5 + (i % 7) / 20, float(i)) for i in range(60)]
+        whole = FairnessMonitor(min_group_size=1)
+        left, right = FairnessMonitor(min_group_size=1), FairnessMonitor(min_group_size=1)
+        for i, event in enumerate(events):
+            whole.update(*event)
+            (left if i < 25 else right).update(*event)
+        merged = left.merge(right)
+
+        for group in ("a", "b"):
+            confs = [c for g, _, c, _ in events if g == group]
+            mean = sum(confs) / len(confs)
+            var = sum((c - mean) ** 2 for c in confs) / (len(confs) - 1)
+            for monitor in (whole, merged):
+                stats = monitor.groups[group]
+                self.assertEqual(stats.count, len(confs))
+                self.assertAlmostEqual(stats.mean, mean)
+                self.assertAlmostEqual(stats.variance, var)
+        self.assertAlmostEqual(merged.disparity(), whole.disparity())
+
+    def test_decayed_view_favours_recent_decisions(self):
+        monitor = FairnessMonitor(max_disparity=0.2, min_group_size=1, half_life=10.0)
+        for t in range(50):
+            monitor.update("a", True, 0.9, float(t))
+            monitor.update("b", t < 10, 0.6, float(t))
+        self.assertAlmostEqual(monitor.disparity(), 0.8)
+        self.assertGreater(monitor.current_disparity(), 0.95)
+        self.assertIsNotNone(monitor.check())
+
+    def test_incremental_verdict_state_matches_rescan(self):
+        for half_life in (None, 5.0):
+            monitor = FairnessMonitor(max_disparity=0.15, min_group_size=3, half_life=half_life)
+            for t in range(300):
+                group = f"g{(t * 7) % 5}"
+                monitor.update(group, (t * 13) % (3 + t % 5) != 0, 0.7, float(t))
+                rates = monitor.current_rates()
+                best = max(rates.values(), default=0.0)
+                expected = {g for g, r in rates.items() if best - r > 0.15} if len(rates) > 1 else set()
+                self.assertEqual(monitor.disadvantaged_groups(), expected)
+                gap = max(rates.values()) - min(rates.values()) if len(rates) > 1 else 0.0
+                self.assertAlmostEqual(monitor.current_disparity(), gap)
+
+
+class TestRuleEngine(unittest.TestCase):
+    """
+    Governance rules compiled once and evaluated as batch masks.
+    """
+
+    def setUp(self):
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        rows = [{"attendance": v, "assignments": v, "labs": v} for v in (0.1, 0.5, 0.9, 0.3, 1.0)]
+        self.decisions = DecisionModule().run_batch(rows, self.policy)
+        explanation_module = ExplanationModule()
+        self.explanations = [explanation_module.run(d) for d in self.decisions]
+
+    def test_batch_matches_per_decision(self):
+        governance = {"use_sensitive_attrs": True, "min_confidence": 0.7}
+        batch = ResponsibilityModule(governance).run_batch(self.decisions, self.explanations)
+        single = ResponsibilityModule(governance)
+        for decision, explanation, verdict in zip(self.decisions, self.explanations, batch):
+            self.assertEqual(verdict, single.run(decision, explanation))
+            self.assertEqual(verdict.reason_codes[0], "sensitive_attrs")
+            self.assertEqual(len(verdict.reason_codes), len(verdict.reasons))
+
+    def test_mask_only_evaluation_counts(self):
+        engine = RuleEngine.from_governance({"use_sensitive_attrs": False, "min_confidence": 0.75})
+        self.assertEqual([rule.code for rule in engine.rules], ["low_confidence"])
+        outcome = engine.evaluate(self.decisions, reasons=False)
+        expected = [d.confidence >= 0.75 for d in self.decisions]
+        self.assertEqual(outcome.allowed.tolist(), expected)
+        summary = engine.summary()["low_confidence"]
+        self.assertEqual(summary["evaluated"], 5)
+        self.assertEqual(summary["violations"], expected.count(False))
+
+        blocked = RuleEngine.from_governance({"use_sensitive_attrs": True, "min_confidence": 0.75})
+        self.assertFalse(blocked.evaluate(self.decisions, reasons=False).allowed.any())
+        # Rows already blocked by the constant rule are not re-checked
+        self.assertEqual(blocked.stats["low_confidence"].evaluated, 0)
+
+
+class TestPolicySweep(unittest.TestCase):
+    """
+    What-if evaluation of candidate policies over a population.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.names = ["attendance", "assignments", "labs"]
+        self.matrix = rng.uniform(0.0, 1.5, size=(500, 3))
+        self.groups = ["a" if i % 3 else "b" for i in range(500)]
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        self.current = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.candidates = {
+            "labs_heavy": {"attendance": 0.2, "assignments": 0.2, "labs": 0.6},
+            "attendance_only": {"attendance": 1.0, "assignments": 0.0, "labs": 0.0},
+        }
+
+    def allowed_per_row(self, policy):
+        decisions = DecisionModule().run_batch(self.matrix, policy, feature_names=self.names)
+        return [d.confidence >= self.governance["min_confidence"] for d in decisions]
+
+    def test_matches_per_decision_verdicts(self):
+        report = PolicySweep(self.current, self.candidates, self.governance, min_group_size=1).run(
+            self.matrix, self.names, groups=self.groups
+        )
+        base = self.allowed_per_row(self.current)
+        self.assertEqual(report.current.allowed, sum(base))
+        for name, policy in self.candidates.items():
+            outcome, allowed = report.candidates[name], self.allowed_per_row(policy)
+            self.assertEqual(outcome.allowed, sum(allowed))
+            self.assertEqual(outcome.newly_allowed, sum(a and not b for a, b in zip(allowed, base)))
+            self.assertEqual(outcome.newly_blocked, sum(b and not a for a, b in zip(allowed, base)))
+            rate_b = sum(a for a, g in zip(allowed, self.groups) if g == "b") / self.groups.count("b")
+            self.assertAlmostEqual(outcome.group_allow_rates["b"], rate_b)
+            self.assertEqual(sum(outcome.histogram), 500)
+        self.assertEqual(report.ranked()[0].allow_rate, max(o.allow_rate for o in report.candidates.values()))
+
+    def test_chunking_does_not_change_results(self):
+        whole = PolicySweep(self.current, self.candidates, self.governance).run(self.matrix, self.names)
+        chunked = PolicySweep(self.current, self.candidates, self.governance, max_cells=7).run(self.matrix, self.names)
+        self.assertEqual(whole.current.histogram, chunked.current.histogram)
+        for name in self.candidates:
+            self.assertEqual(whole.candidates[name].allowed, chunked.candidates[name].allowed)
+            self.assertAlmostEqual(whole.candidates[name].mean_confidence, chunked.candidates[name].mean_confidence)
+
+
+if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,51 +1,462 @@
-import unittest
-from modules.decision.core import DecisionModule
-from modules.explanation.core import ExplanationModule
-from modules.responsibility.core import ResponsibilityModule
-
-
-class TestEndToEndFlow(unittest.TestCase):
-    """
-    Integration test to validate the complete pipeline:
-    Decision → Explanation → Responsibility
-    """
-
-    def setUp(self):
-        # Sample input features and policy
-        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
-        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
-        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
-
-        # Initialize modules
-        self.decision_module = DecisionModule(model=None, seed=42)
-        self.explanation_module = ExplanationModule()
-        self.responsibility_module = ResponsibilityModule(self.governance)
-
-    def test_pipeline_flow(self):
-        # Run decision
-        decision = self.decision_module.run(self.features, self.policy)
-        self.assertIsNotNone(decision)
-
-        # Run explanation
-        explanation = self.explanation_module.run(decision)
-        self.assertEqual(explanation.trace_id, decision.trace_id)
-
-        # Run responsibility
-        verdict = self.responsibility_module.run(decision, explanation)
-        self.assertEqual(verdict.trace_id, decision.trace_id)
-
-        # Assertions across pipeline
-        self.assertIsInstance(verdict.allowed, bool)
-        self.assertIsInstance(verdict.reasons, list)
-        self.assertIsInstance(verdict.metrics, dict)
-        self.assertIsInstance(verdict.audit_bundle, dict)
-
-        # Ensure audit bundle contains key metadata
-        self.assertIn("trace_id", verdict.audit_bundle)
-        self.assertIn("data_hash", verdict.audit_bundle)
-        self.assertIn("model_version", verdict.audit_bundle)
-        self.assertIn("confidence", verdict.audit_bundle)
-
-
-if __name__ == "__main__":
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+from modules.decision.core import DecisionModule
+from modules.decision.models import LinearModel, ModelRegistry
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+from modules.pipeline.streaming import StreamingRunner, iter_chunks
+from modules.pipeline.cache import CachedPipeline, ResultCache
+from modules.pipeline.parallel import ParallelExecutor
+from modules.pipeline.service import AgentPipeline, LatencyTargets, PipelineOverloaded, PipelineResult, run_load
+from modules.pipeline.worker import JsonlWorker
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "fixtures", "dummy_students.csv")
+
+
+class TestEndToEndFlow(unittest.TestCase):
+    """
+    Integration test to validate the complete pipeline:
+    Decision → Explanation → Responsibility
+    """
+
+    def setUp(self):
+        # Sample input features and policy
+        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+
+        # Initialize modules
+        self.decision_module = DecisionModule(model=None, seed=42)
+        self.explanation_module = ExplanationModule()
+        self.responsibility_module = ResponsibilityModule(self.governance)
+
+    def test_pipeline_flow(self):
+        # Run decision
+        decision = self.decision_module.run(self.features, self.policy)
+        self.assertIsNotNone(decision)
+
+        # Run explanation
+        explanation = self.explanation_module.run(decision)
+        self.assertEqual(explanation.trace_id, decision.trace_id)
+
+        # Run responsibility
+        verdict = self.responsibility_module.run(decision, explanation)
+        self.assertEqual(verdict.trace_id, decision.trace_id)
+
+        # Assertions across pipeline
+        self.assertIsInstance(verdict.allowed, bool)
+        self.assertIsInstance(verdict.reasons, list)
+        self.assertIsInstance(verdict.metrics, dict)
+        self.assertIsInstance(verdict.audit_bundle, dict)
+
+        # Ensure audit bundle contains key metadata
+        self.assertIn("trace_id", verdict.audit_bundle)
+        self.assertIn("data_hash", verdict.audit_bundle)
+        self.assertIn("model_version", verdict.audit_bundle)
+        self.assertIn("confidence", verdict.audit_bundle)
+
+
+class TestStreamingRunner(unittest.TestCase):
+    """
+    Chunked file pipeline with checkpoint/resume.
+    """
+
+    def setUp(self):
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_iter_chunks_skips_comments(self):
+        chunks = list(iter_chunks(FIXTURE, chunk_size=4))
+        self.assertEqual([len(c.rows) for c in chunks], [4, 4, 2])
+        self.assertEqual(chunks[0].rows[0]["student_id"], "S001")
+        self.assertEqual(chunks[-1].end_offset, os.path.getsize(FIXTURE))
+
+    def test_resume_matches_full_run(self):
+        full_out = os.path.join(self.tmp.name, "full.jsonl")
+        StreamingRunner(self.policy, self.governance, chunk_size=3).run(FIXTURE, full_out)
+
+        out = os.path.join(self.tmp.name, "resumed.jsonl")
+        ckpt = os.path.join(self.tmp.name, "ckpt.json")
+        runner = StreamingRunner(self.policy, self.governance, chunk_size=3)
+        first = runner.run(FIXTURE, out, checkpoint_path=ckpt, max_chunks=2)
+        self.assertFalse(first.completed)
+        self.assertEqual(first.rows, 6)
+
+        # Simulate a crash mid-write after the last checkpoint
+        with open(out, "a", encoding="utf-8") as f:
+            f.write('{"row_id": "partial')
+
+        second = runner.run(FIXTURE, out, checkpoint_path=ckpt)
+        self.assertTrue(second.completed)
+        self.assertEqual(second.resumed_from, 6)
+        self.assertEqual(second.rows, 10)
+
+        full, resumed = self._read(full_out), self._read(out)
+        self.assertEqual([r["trace_id"] for r in resumed], [r["trace_id"] for r in full])
+        self.assertEqual(second.allowed + second.blocked, 10)
+
+
+class TestAgentPipeline(unittest.TestCase):
+    """
+    asyncio micro-batching front end.
+    """
+
+    def setUp(self):
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        self.rows = [
+            {"attendance": 0.3 + i / 100, "assignments": 0.67, "labs": 0.74} for i in range(20)
+        ]
+
+    def test_batched_results_match_sequential(self):
+        async def scenario():
+            async with AgentPipeline(self.policy, self.governance, max_batch_size=8, max_wait=0.01) as pipeline:
+                results = await asyncio.gather(*(pipeline.submit(r) for r in self.rows))
+            return pipeline, results
+
+        pipeline, results = asyncio.run(scenario())
+        self.assertLess(pipeline.stats.batches, len(self.rows))
+        decision_module = DecisionModule(model=None, seed=42)
+        responsibility_module = ResponsibilityModule(self.governance)
+        for row, result in zip(self.rows, results):
+            decision = decision_module.run(row, self.policy)
+            verdict = responsibility_module.run(decision, ExplanationModule().run(decision))
+            self.assertEqual(result.decision.trace_id, decision.trace_id)
+            self.assertEqual(result.verdict.allowed, verdict.allowed)
+
+    def test_bad_request_fails_alone(self):
+        async def scenario():
+            async with AgentPipeline(self.policy, self.governance, max_batch_size=8, max_wait=0.01) as pipeline:
+                bad = dict(self.rows[0], labs="n/a")
+                outcomes = await asyncio.gather(*(pipeline.submit(r) for r in self.rows[:3] + [bad]),
+                                                return_exceptions=True)
+            return pipeline, outcomes
+
+        pipeline, outcomes = asyncio.run(scenario())
+        self.assertEqual(pipeline.stats.batches, 1)
+        self.assertIsInstance(outcomes[3], ValueError)
+        self.assertTrue(all(isinstance(o, PipelineResult) for o in outcomes[:3]))
+        self.assertEqual((pipeline.stats.requests, pipeline.stats.failed), (3, 1))
+
+    def test_full_queue_sheds_load(self):
+        async def scenario():
+            pipeline = AgentPipeline(self.policy, self.governance, max_batch_size=1, max_queue=2)
+            slow = pipeline.process_batch
+
+            def process_batch(rows):
+                time.sleep(0.05)
+                return slow(rows)
+
+            pipeline.process_batch = process_batch
+            async with pipeline:
+                outcomes = await asyncio.gather(*(pipeline.submit(r) for r in self.rows[:10]),
+                                                return_exceptions=True)
+            return pipeline, outcomes
+
+        pipeline, outcomes = asyncio.run(scenario())
+        shed = [o for o in outcomes if isinstance(o, PipelineOverloaded)]
+        self.assertGreater(len(shed), 0)
+        self.assertEqual(pipeline.stats.shed, len(shed))
+        self.assertEqual(pipeline.stats.requests, len(outcomes) - len(shed))
+
+    def test_load_generator_meets_targets(self):
+        async def scenario():
+            async with AgentPipeline(self.policy, self.governance) as pipeline:
+                return await run_load(pipeline, self.rows, total=2000, concurrency=32)
+
+        report = asyncio.run(scenario())
+        self.assertEqual(report.completed + report.shed, 2000)
+        # Loose targets so the check stays stable on slow CI machines
+        targets = LatencyTargets(p50_ms=250.0, p99_ms=1000.0, min_throughput=200.0)
+        self.assertTrue(report.meets(targets), report.failures)
+
+
+class TestParallelExecutor(unittest.TestCase):
+    """
+    Sharded process-pool execution over a shared feature matrix.
+    """
+
+    def test_output_independent_of_worker_count(self):
+        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        names = ["attendance", "assignments", "labs"]
+        matrix = np.random.default_rng(7).random((50, 3))
+
+        serial = ParallelExecutor(policy, governance, workers=1, shard_rows=8).run(matrix, names)
+        pooled = ParallelExecutor(policy, governance, workers=2, shard_rows=8).run(matrix, names)
+
+        self.assertEqual(len(pooled), 50)
+        self.assertEqual(pooled.trace_ids, serial.trace_ids)
+        np.testing.assert_array_equal(pooled.confidences, serial.confidences)
+        np.testing.assert_array_equal(pooled.allowed, serial.allowed)
+
+        decision = DecisionModule(model=None, seed=42).run(dict(zip(names, matrix[13].tolist())), policy)
+        self.assertEqual(pooled.trace_ids[13], decision.trace_id)
+        self.assertAlmostEqual(pooled.confidences[13], decision.confidence, places=12)
+
+    def test_model_registry_in_workers(self):
+        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        names = ["attendance", "assignments", "labs"]
+        matrix = np.random.default_rng(7).random((20, 3))
+        model = LinearModel(["labs"], [-3.0], bias=1.0)
+        with tempfile.TemporaryDirectory() as directory:
+            model.save(os.path.join(directory, "v2.npz"))
+            registry = ModelRegistry(directory)
+            pooled = ParallelExecutor(
+                policy, governance, workers=2, shard_rows=8, model=registry, model_version="v2", model_weight=0.4
+            ).run(matrix, names)
+
+        expected = DecisionModule(model=model, model_weight=0.4).run_batch(matrix, policy, feature_names=names)
+        np.testing.assert_allclose(pooled.predictions, [d.prediction for d in expected])
+        self.assertEqual(registry.loads, 0)
+
+
+class TestCachedPipeline(unittest.TestCase):
+    """
+    Two-tier result cache keyed by configuration fingerprint and trace id.
+    """
+
+    def setUp(self):
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_memory_hits_and_invalidation(self):
+        pipeline = CachedPipeline(self.policy, self.governance, cache=ResultCache(maxsize=2))
+        first = pipeline.run(self.features)
+        self.assertIs(pipeline.run(self.features), first)
+        self.assertEqual((pipeline.cache.stats.hits, pipeline.cache.stats.misses), (1, 1))
+
+        pipeline.set_governance(dict(self.governance, min_confidence=0.9))
+        blocked = pipeline.run(self.features)
+        self.assertFalse(blocked.verdict.allowed)
+        self.assertEqual(pipeline.cache.stats.misses, 2)
+
+        for i in range(3):
+            pipeline.run(dict(self.features, labs=i / 10))
+        self.assertEqual(len(pipeline.cache), 2)
+        self.assertGreater(pipeline.cache.stats.evictions, 0)
+
+    def test_disk_tier_survives_restart_and_ttl(self):
+        path = os.path.join(self.tmp.name, "cache.sqlite")
+        now = [1000.0]
+        cache = ResultCache(path=path, ttl=60, clock=lambda: now[0])
+        expected = CachedPipeline(self.policy, self.governance, cache=cache).run(self.features)
+        cache.close()
+
+        reopened = ResultCache(path=path, ttl=60, clock=lambda: now[0])
+        self.addCleanup(reopened.close)
+        pipeline = CachedPipeline(self.policy, self.governance, cache=reopened)
+        self.assertEqual(pipeline.run(self.features), expected)
+        self.assertEqual(reopened.stats.disk_hits, 1)
+
+        now[0] += 120
+        pipeline.run(self.features)
+        self.assertEqual(reopened.stats.expirations, 1)
+        self.assertEqual(reopened.stats.misses, 1)
+
+    def test_shared_disk_cache_keeps_every_configuration(self):
+        path = os.path.join(self.tmp.name, "shared.sqlite")
+        cache = ResultCache(path=path)
+        self.addCleanup(cache.close)
+        strict = CachedPipeline(self.policy, dict(self.governance, min_confidence=0.9), cache=cache)
+        lenient = CachedPipeline(self.policy, self.governance, cache=cache)
+        self.assertFalse(strict.run(self.features).verdict.allowed)
+        self.assertTrue(lenient.run(self.features).verdict.allowed)
+
+        # A fresh process sharing the file still finds both configurations
+        reopened = ResultCache(path=path)
+        self.addCleanup(reopened.close)
+        strict.cache = lenient.cache = reopened
+        self.assertFalse(strict.run(self.features).verdict.allowed)
+        self.assertTrue(lenient.run(self.features).verdict.allowed)
+        self.assertEqual((reopened.stats.disk_hits, reopened.stats.misses), (2, 0))
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        now = [0.0]
+        cache = ResultCache(maxsize=0, path=os.path.join(self.tmp.name, "lru.sqlite"),
+                            clock=lambda: now[0], disk_maxsize=2)
+        self.addCleanup(cache.close)
+        pipeline = CachedPipeline(self.policy, self.governance, cache=cache)
+        rows = [dict(self.features, labs=i / 10) for i in range(3)]
+        for row in rows[:2]:
+            now[0] += 1
+            pipeline.run(row)
+        now[0] += 1
+        pipeline.run(rows[0])
+        now[0] += 1
+        pipeline.run(rows[2])
+        self.assertEqual(cache.stats.disk_evictions, 1)
+        pipeline.run(rows[0])
+        self.assertEqual(cache.stats.disk_hits, 2)
+        pipeline.run(rows[1])
+        self.assertEqual(cache.stats.misses, 4)
+
+    def test_model_is_part_of_fingerprint(self):
+        cache = ResultCache()
+        plain = CachedPipeline(self.policy, self.governance, cache=cache).run(self.features)
+        model = LinearModel(["labs"], [-50.0], version="labs-v1")
+        decision_module = DecisionModule(model=model)
+        blended = CachedPipeline(self.policy, self.governance, cache=cache, decision_module=decision_module)
+        result = blended.run(self.features)
+
+        self.assertEqual(result.decision.prediction, decision_module.run(self.features, self.policy).prediction)
+        self.assertNotEqual(result.decision.prediction, plain.decision.prediction)
+        self.assertEqual(result.decision.model_version, "labs-v1")
+        fingerprint = blended.fingerprint()
+        decision_module.model_weight = 0.9
+        self.assertEqual(blended.fingerprint(), fingerprint)
+        blended.invalidate()
+        self.assertNotEqual(blended.fingerprint(), fingerprint)
+        decision_module.rank_k = 1
+        blended.invalidate()
+        self.assertNotEqual(blended.run(self.features).decision.ranking, result.decision.ranking)
+
+
+class TestJsonlWorker(unittest.TestCase):
+    """
+    Long-lived JSONL worker over a stream and a Unix socket.
+    """
+
+    def setUp(self):
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        self.lines = [
+            json.dumps({"id": 1, "features": self.features}),
+            "not json",
+            json.dumps({"id": 3, "features": {"attendance": 0.2, "labs": 0.1}}),
+            json.dumps({"id": 4, "features": self.features, "policy": "missing"}),
+        ]
+
+    def test_stream_answers_in_order(self):
+        worker = JsonlWorker(policies={"default": self.policy})
+        out = io.BytesIO()
+        stats = worker.serve(io.BytesIO(("\n".join(self.lines) + "\n").encode()), out)
+        responses = [json.loads(line) for line in out.getvalue().decode().splitlines()]
+
+        self.assertEqual([r["id"] for r in responses], [1, None, 3, 4])
+        self.assertIn("error", responses[1])
+        self.assertIn("error", responses[3])
+        expected = DecisionModule().run(self.features, self.policy)
+        self.assertEqual(responses[0]["trace_id"], expected.trace_id)
+        self.assertEqual(responses[0]["confidence"], expected.confidence)
+        self.assertIn("summary", responses[0]["explanation"])
+        self.assertEqual((stats.requests, stats.errors), (4, 2))
+
+    def test_bad_fields_and_failures_stay_per_request(self):
+        worker = JsonlWorker(policies={"default": self.policy})
+        out = io.BytesIO()
+        lines = [
+            json.dumps({"id": 1, "features": self.features, "group": ["a"]}),
+            json.dumps({"id": 2, "features": self.features, "audience": {"x": 1}}),
+            json.dumps({"id": 3, "features": self.features, "policy": ["default"]}),
+            json.dumps({"id": 4, "features": self.features, "group": "a"}),
+        ]
+        worker.serve(io.BytesIO(("\n".join(lines) + "\n").encode()), out)
+        responses = [json.loads(line) for line in out.getvalue().decode().splitlines()]
+        self.assertEqual([r["id"] for r in responses], [1, 2, 3, 4])
+        self.assertEqual(["error" in r for r in responses], [True, True, True, False])
+
+        # A failure anywhere in the decision -> explanation -> verdict chain
+        # answers that group with errors and leaves the others untouched
+        run_batch = worker._responsibility.run_batch
+
+        def failing(decisions, explanations, groups):
+            if "broken" in groups:
+                raise RuntimeError("verdict failed")
+            return run_batch(decisions, explanations, groups)
+
+        worker._responsibility.run_batch = failing
+        responses = worker.handle_lines([
+            json.dumps({"id": 5, "features": {"labs": 0.5}, "group": "broken"}),
+            json.dumps({"id": 6, "features": self.features}),
+        ])
+        self.assertEqual(responses[0], {"id": 5, "error": "verdict failed"})
+        self.assertIn("allowed", responses[1])
+
+    def test_lazy_load_and_bounded_explainers(self):
+        worker = JsonlWorker(policies={"default": self.policy})
+        worker.serve(io.BytesIO(b""), io.BytesIO())
+        self.assertFalse(worker._loaded)
+
+        audiences = ["student", "faculty"] + [f"made-up-{i}" for i in range(20)]
+        responses = worker.handle_lines([
+            json.dumps({"id": i, "features": self.features, "audience": audience})
+            for i, audience in enumerate(audiences)
+        ])
+        self.assertTrue(worker._loaded)
+        self.assertEqual({a for a, _ in worker._explainers}, {"default", "student", "faculty"})
+        self.assertEqual(responses[-1]["explanation"], responses[-2]["explanation"])
+
+    def test_model_versions_side_by_side(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for version, weight in (("v1", 1.0), ("v2", -1.0)):
+            LinearModel(["labs"], [weight]).save(os.path.join(tmp.name, f"{version}.npz"))
+        worker = JsonlWorker(policies={"default": self.policy}, model=ModelRegistry(tmp.name), model_version="v1")
+        responses = worker.handle_lines([
+            json.dumps({"id": 1, "features": self.features}),
+            json.dumps({"id": 2, "features": self.features, "model_version": "v2"}),
+            json.dumps({"id": 3, "features": self.features, "model_version": "v9"}),
+        ])
+
+        self.assertEqual([r.get("model_version") for r in responses], ["v1", "v2", None])
+        self.assertIn("v9", responses[2]["error"])
+        for response, version in zip(responses, ("v1", "v2")):
+            expected = DecisionModule(model=worker.model, model_version=version).run(self.features, self.policy)
+            self.assertEqual(response["prediction"], expected.prediction)
+        self.assertNotEqual(responses[0]["prediction"], responses[1]["prediction"])
+
+        plain = JsonlWorker(policies={"default": self.policy}).handle_lines(
+            [json.dumps({"id": 1, "features": self.features, "model_version": "v2"})]
+        )
+        self.assertIn("error", plain[0])
+
+    def test_unix_socket_and_drain(self):
+        path = os.path.join(tempfile.mkdtemp(), "worker.sock")
+        worker = JsonlWorker(policies={"default": self.policy})
+        server = threading.Thread(target=worker.serve_unix, args=(path,))
+        server.start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(("\n".join(self.lines[:1] * 3) + "\n").encode())
+            reader = client.makefile("rb")
+            responses = [json.loads(reader.readline()) for _ in range(3)]
+            worker.stop()
+            server.join(timeout=5)
+        self.assertFalse(server.is_alive())
+        self.assertEqual([r["allowed"] for r in responses], [True] * 3)
+        self.assertFalse(os.path.exists(path))
+
+    def test_import_defers_numpy(self):
+        code = "import sys, modules.pipeline.worker; print('numpy' in sys.modules)"
+        root = os.path.join(os.path.dirname(__file__), "..", "..")
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
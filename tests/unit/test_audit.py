@@ -0,0 +1,237 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from modules.decision.core import DecisionModule
+from modules.explanation.core import ExplanationModule
+from modules.responsibility.core import ResponsibilityModule
+from modules.audit.sinks import (
+    AuditSink,
+    JsonFileSink,
+    SegmentedLogSink,
+    build_audit_record,
+    list_segments,
+    read_segments,
+)
+from modules.audit.cas import ContentAddressedStore
+from modules.audit.store import AuditStore, migrate_json_files
+
+
+def make_records(n, start=0):
+    policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+    governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+    decision_module = DecisionModule(model=None, seed=42)
+    explanation_module = ExplanationModule()
+    responsibility_module = ResponsibilityModule(governance)
+    records = []
+    for i in range(start, start + n):
+        features = {"attendance": 0.3 + (i % 70) / 100, "assignments": 0.5 + (i % 7) / 20, "labs": i / 1000}
+        decision = decision_module.run(features, policy)
+        explanation = explanation_module.run(decision)
+        verdict = responsibility_module.run(decision, explanation)
+        records.append(build_audit_record(decision, explanation, verdict))
+    return records
+
+
+class TestAuditSinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_json_file_sink_writes_one_file_per_trace(self):
+        record = make_records(1)[0]
+        path = JsonFileSink(self.tmp.name).write(record)
+        self.assertEqual(os.path.basename(path), f"audit_{record['trace_id']}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["trace_id"], record["trace_id"])
+
+    def test_segmented_log_rotates_and_compresses(self):
+        records = make_records(40)
+        log_dir = os.path.join(self.tmp.name, "log")
+        with SegmentedLogSink(log_dir, segment_bytes=4096, buffer_records=8,
+                              fsync_policy="every_n", fsync_every=16, compress_sealed=True) as sink:
+            sink.write_many(records)
+
+        segments = list_segments(log_dir)
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(name.endswith(".gz") for name in segments[:-1]))
+        self.assertFalse(segments[-1].endswith(".gz"))
+        self.assertEqual([r["trace_id"] for r in read_segments(log_dir)], [r["trace_id"] for r in records])
+
+        # Reopening continues the active segment
+        with SegmentedLogSink(log_dir, fsync_policy="always") as sink:
+            sink.write(make_records(1, start=40)[0])
+        self.assertEqual(len(list(read_segments(log_dir))), 41)
+
+    def test_interrupted_compression_is_not_read_twice(self):
+        records = make_records(3)
+        log_dir = os.path.join(self.tmp.name, "log")
+        with SegmentedLogSink(log_dir, fsync_policy="always") as sink:
+            sink.write_many(records)
+        # Crash between publishing the .gz copy and removing the plain segment
+        plain = os.path.join(log_dir, list_segments(log_dir)[0])
+        with open(plain, "rb") as src, gzip.open(plain + ".gz", "wb") as dst:
+            dst.write(src.read())
+
+        self.assertEqual(list_segments(log_dir), [os.path.basename(plain) + ".gz"])
+        self.assertEqual([r["trace_id"] for r in read_segments(log_dir)], [r["trace_id"] for r in records])
+        with SegmentedLogSink(log_dir, fsync_policy="always") as sink:
+            sink.write(make_records(1, start=3)[0])
+        self.assertFalse(os.path.exists(plain))
+        self.assertEqual(len(list(read_segments(log_dir))), 4)
+
+    def test_reopen_drops_torn_line_and_stale_tmp(self):
+        log_dir = os.path.join(self.tmp.name, "log")
+        with SegmentedLogSink(log_dir, fsync_policy="always") as sink:
+            sink.write_many(make_records(2))
+        active = os.path.join(log_dir, list_segments(log_dir)[-1])
+        with open(active, "ab") as f:
+            f.write(b'{"trace_id": "torn')
+        stale = active + ".gz.tmp"
+        with open(stale, "wb") as f:
+            f.write(b"partial")
+
+        with SegmentedLogSink(log_dir, fsync_policy="always") as sink:
+            sink.write(make_records(1, start=2)[0])
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(len(list(read_segments(log_dir))), 3)
+
+    def test_audit_sink_requires_write(self):
+        with self.assertRaises(TypeError):
+            AuditSink()
+
+    def test_unknown_fsync_policy_rejected(self):
+        with self.assertRaises(ValueError):
+            SegmentedLogSink(os.path.join(self.tmp.name, "log"), fsync_policy="sometimes")
+
+
+class TestAuditStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.log_dir = os.path.join(self.tmp.name, "log")
+        self.records = make_records(30)
+        for i, record in enumerate(self.records):
+            # Spread timestamps so range scans are meaningful
+            record["decision"]["timestamp"] = 1000.0 + i
+        with SegmentedLogSink(self.log_dir, segment_bytes=8192) as sink:
+            sink.write_many(self.records)
+
+    def test_point_lookups(self):
+        store = AuditStore(self.log_dir)
+        self.assertEqual(len(store), 30)
+        target = self.records[17]
+        self.assertEqual(store.get(target["trace_id"])["trace_id"], target["trace_id"])
+        by_hash = list(store.find("data_hash", target["decision"]["data_hash"]))
+        self.assertEqual([r["trace_id"] for r in by_hash], [target["trace_id"]])
+        self.assertEqual(len(list(store.find("model_version", "v1.0"))), 30)
+        self.assertIsNone(store.get("trace-missing"))
+
+    def test_torn_last_line_is_skipped(self):
+        active = os.path.join(self.log_dir, list_segments(self.log_dir)[-1])
+        with open(active, "ab") as f:
+            f.write(b'{"trace_id": "torn')
+        with self.assertLogs("modules.audit.store", level="WARNING"):
+            store = AuditStore(self.log_dir)
+        self.assertEqual(len(store), 30)
+        self.assertEqual(store.get(self.records[-1]["trace_id"])["trace_id"], self.records[-1]["trace_id"])
+
+    def test_range_scan_and_rebuild(self):
+        store = AuditStore(self.log_dir)
+        window = [r["decision"]["timestamp"] for r in store.range(1005.0, 1010.0)]
+        self.assertEqual(window, [1005.0, 1006.0, 1007.0, 1008.0, 1009.0])
+
+        with SegmentedLogSink(self.log_dir) as sink:
+            sink.write(make_records(1, start=99)[0])
+        self.assertTrue(store.is_stale())
+        reopened = AuditStore(self.log_dir)
+        self.assertEqual(len(reopened), 31)
+
+    def test_migrate_json_files(self):
+        json_dir = os.path.join(self.tmp.name, "json")
+        sink = JsonFileSink(json_dir)
+        for record in self.records[:5]:
+            sink.write(record)
+        new_log = os.path.join(self.tmp.name, "migrated")
+        with SegmentedLogSink(new_log) as log:
+            self.assertEqual(migrate_json_files(json_dir, log), 5)
+        store = AuditStore(new_log)
+        self.assertEqual([r["trace_id"] for r in store.range()], [r["trace_id"] for r in self.records[:5]])
+
+
+class TestContentAddressedStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = os.path.join(self.tmp.name, "cas")
+        self.records = make_records(20)
+
+    def test_dedup_and_reassembly(self):
+        with ContentAddressedStore(self.directory, min_blob_bytes=48) as store:
+            store.write_many(self.records)
+            self.assertEqual(store.get(self.records[3]["trace_id"]), self.records[3])
+
+        reopened = ContentAddressedStore(self.directory)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened), 20)
+        self.assertEqual(list(reopened.records()), self.records)
+
+        skeleton = next(reopened.skeletons())
+        # feature_importance is stored once although three sections carry it
+        ref = skeleton["decision"]["feature_importance"]
+        self.assertEqual(skeleton["audit_bundle"]["feature_importance"], ref)
+        self.assertEqual(reopened.blob(skeleton["explanation"]["technical"]["$blob"])["feature_importance"], ref)
+        # All records share one caveats blob
+        caveats = {s["audit_bundle"]["caveats"]["$blob"] for s in reopened.skeletons()}
+        self.assertEqual(len(caveats), 1)
+        with open(os.path.join(self.directory, "blobs.pack"), "rb") as f:
+            self.assertEqual(f.read().count(b"No sensitive attributes were used."), 1)
+
+    def test_remove_gc_and_verify(self):
+        store = ContentAddressedStore(self.directory)
+        self.addCleanup(store.close)
+        store.write_many(self.records)
+        self.assertTrue(store.verify(workers=1).ok)
+        blobs = store.blob_count
+
+        self.assertEqual(store.remove(r["trace_id"] for r in self.records[:10]), 10)
+        self.assertGreater(store.gc(), 0)
+        self.assertLess(store.blob_count, blobs)
+        self.assertEqual(list(store.records()), self.records[10:])
+        report = store.verify(workers=2, shard_records=3)
+        self.assertTrue(report.ok, report.errors)
+        self.assertEqual(report.records, 10)
+
+        # Flip a byte inside a stored blob: both the blob and its records fail
+        store.flush()
+        path = os.path.join(self.directory, "blobs.pack")
+        with open(path, "r+b") as f:
+            data = f.read()
+            pos = data.index(b"attendance", data.index(b'{"assignments"'))
+            f.seek(pos)
+            f.write(b"Attendance")
+        with ContentAddressedStore(self.directory) as reopened:
+            damaged = reopened.verify(workers=1)
+        self.assertFalse(damaged.ok)
+        self.assertTrue(any(e.startswith("blob") for e in damaged.errors))
+        self.assertTrue(any("digest mismatch" in e for e in damaged.errors))
+
+    def test_torn_last_lines_are_dropped_on_open(self):
+        with ContentAddressedStore(self.directory) as store:
+            store.write_many(self.records[:5])
+        for name in ("records.log", "blobs.pack"):
+            with open(os.path.join(self.directory, name), "ab") as f:
+                f.write(b'{"trace_id":"trace-torn","decis')
+
+        with ContentAddressedStore(self.directory) as store:
+            self.assertEqual(len(store), 5)
+            self.assertNotIn("trace-torn", store)
+            store.write_many(self.records[5:8])
+            self.assertTrue(store.verify(workers=1).ok)
+        with ContentAddressedStore(self.directory) as reopened:
+            self.assertEqual(list(reopened.records()), self.records[:8])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
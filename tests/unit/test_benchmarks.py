@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+from benchmarks.suite import compare, main, run_suite
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_report_shape(self):
+        report = run_suite("quick", only=["stable_hash"], iterations=3)
+        self.assertEqual({r["name"] for r in report["results"]}, {"stable_hash"})
+        for result in report["results"]:
+            self.assertGreater(result["throughput"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreaterEqual(result["peak_kib"], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": [{"key": "case[width=3]", "throughput": 1000.0, "p99_ms": 1.0}]}
+        faster = {"results": [{"key": "case[width=3]", "throughput": 1100.0, "p99_ms": 0.9}]}
+        slower = {"results": [{"key": "case[width=3]", "throughput": 700.0, "p99_ms": 1.5}]}
+        self.assertEqual(compare(faster, baseline, threshold=0.15), [])
+        self.assertEqual(len(compare(slower, baseline, threshold=0.15)), 2)
+        self.assertEqual(compare(slower, {"results": []}), [])
+
+    def test_missing_baseline_fails_unless_allowed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            missing = os.path.join(tmp, "baseline.json")
+            args = ["--only", "stable_hash", "--iterations", "1", "--output", os.path.join(tmp, "report.json")]
+            self.assertNotEqual(main(args + ["--baseline", missing]), 0)
+            self.assertEqual(main(args + ["--baseline", missing, "--allow-missing-baseline"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
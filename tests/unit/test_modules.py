@@ -1,61 +1,503 @@
-import unittest
-from modules.decision.core import DecisionModule
-from modules.explanation.core import ExplanationModule
-from modules.responsibility.core import ResponsibilityModule
-
-
-class TestDecisionModule(unittest.TestCase):
-    def setUp(self):
-        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
-        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
-        self.module = DecisionModule(model=None, seed=42)
-
-    def test_run_outputs_decision(self):
-        decision = self.module.run(self.features, self.policy)
-        self.assertIsNotNone(decision.prediction)
-        self.assertGreaterEqual(decision.confidence, 0.0)
-        self.assertLessEqual(decision.confidence, 1.0)
-        self.assertEqual(set(decision.feature_importance.keys()), set(self.features.keys()))
-        self.assertTrue(decision.trace_id.startswith("trace-"))
-        self.assertEqual(decision.model_version, "v1.0")
-
-
-class TestExplanationModule(unittest.TestCase):
-    def setUp(self):
-        features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
-        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
-        decision = DecisionModule(model=None, seed=42).run(features, policy)
-        self.decision = decision
-        self.module = ExplanationModule()
-
-    def test_run_outputs_explanation(self):
-        explanation = self.module.run(self.decision)
-        self.assertIn("Prediction", explanation.summary or "")
-        self.assertIn("confidence", explanation.technical)
-        self.assertIsInstance(explanation.counterfactuals, list)
-        self.assertIsInstance(explanation.caveats, list)
-        self.assertEqual(explanation.trace_id, self.decision.trace_id)
-
-
-class TestResponsibilityModule(unittest.TestCase):
-    def setUp(self):
-        features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
-        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
-        decision = DecisionModule(model=None, seed=42).run(features, policy)
-        explanation = ExplanationModule().run(decision)
-        self.decision = decision
-        self.explanation = explanation
-        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
-        self.module = ResponsibilityModule(self.governance)
-
-    def test_run_outputs_verdict(self):
-        verdict = self.module.run(self.decision, self.explanation)
-        self.assertIsInstance(verdict.allowed, bool)
-        self.assertIsInstance(verdict.reasons, list)
-        self.assertIsInstance(verdict.metrics, dict)
-        self.assertIsInstance(verdict.audit_bundle, dict)
-        self.assertEqual(verdict.trace_id, self.decision.trace_id)
-
-
-if __name__ == "__main__":
+import os
+import tempfile
+import unittest
+import numpy as np
+from modules.decision.core import DecisionModule, stable_hash
+from modules.decision.hashing import verify_data_hash
+from modules.decision.models import LinearModel, ModelBackend, ModelRegistry
+from modules.decision.policy import CompiledPolicy, compile_policy
+from modules.decision.sparse import FeatureVocabulary, SparseBatch
+from modules.explanation.core import ExplanationModule
+from modules.explanation.audience import load_render_plans
+from modules.explanation.counterfactual import CounterfactualEngine
+from modules.responsibility.core import ResponsibilityModule
+from modules.pipeline.columnar import ArtifactBatch
+from modules.pipeline.worker import load_config
+from modules.telemetry.tracing import NULL_TELEMETRY, Telemetry
+
+PROFILES = os.path.join(os.path.dirname(__file__), "..", "..", "configs", "audiences", "example_profiles.yaml")
+GOVERNANCE = os.path.join(os.path.dirname(__file__), "..", "..", "configs", "governance", "example_policy.yaml")
+
+
+class _OpaqueModel(ModelBackend):
+    def predict(self, features, feature_names):
+        return np.zeros(len(features))
+
+
+class TestDecisionModule(unittest.TestCase):
+    def setUp(self):
+        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.module = DecisionModule(model=None, seed=42)
+
+    def test_run_outputs_decision(self):
+        decision = self.module.run(self.features, self.policy)
+        self.assertIsNotNone(decision.prediction)
+        self.assertGreaterEqual(decision.confidence, 0.0)
+        self.assertLessEqual(decision.confidence, 1.0)
+        self.assertEqual(set(decision.feature_importance.keys()), set(self.features.keys()))
+        self.assertTrue(decision.trace_id.startswith("trace-"))
+        self.assertEqual(decision.model_version, "v1.0")
+
+    def test_run_batch_matches_run(self):
+        rows = [
+            self.features,
+            {"attendance": 0.40, "assignments": 0.45, "labs": 0.35},
+            {"attendance": 0.95, "assignments": 0.88, "labs": 0.92},
+        ]
+        batch = self.module.run_batch(rows, self.policy)
+        names = list(self.features.keys())
+        matrix = np.array([[r[k] for k in names] for r in rows])
+        from_matrix = self.module.run_batch(matrix, self.policy, feature_names=names)
+
+        self.assertEqual(len(batch), len(rows))
+        for row, b, m in zip(rows, batch, from_matrix):
+            single = self.module.run(row, self.policy)
+            for out in (b, m):
+                self.assertAlmostEqual(out.prediction, single.prediction, places=12)
+                self.assertAlmostEqual(out.confidence, single.confidence, places=12)
+                self.assertEqual(out.trace_id, single.trace_id)
+                self.assertEqual(out.data_hash, single.data_hash)
+                for k, v in single.feature_importance.items():
+                    self.assertAlmostEqual(out.feature_importance[k], v, places=12)
+
+    def test_hashes_match_legacy_payloads(self):
+        decision = self.module.run(self.features, self.policy)
+        legacy_trace = stable_hash({"features": self.features, "policy": self.policy})
+        self.assertEqual(decision.trace_id, f"trace-{legacy_trace[:16]}")
+        self.assertEqual(decision.data_hash, stable_hash({"features": self.features}))
+
+    def test_compiled_policy_matches_dict_policy(self):
+        compiled = compile_policy(self.policy)
+        self.assertIsInstance(compiled, CompiledPolicy)
+        self.assertIs(compile_policy(dict(self.policy)), compiled)
+        self.assertIs(compile_policy(compiled), compiled)
+
+        reordered = {"labs": 0.74, "attendance": 0.82, "assignments": 0.67, "extra": 0.5}
+        for features in (self.features, reordered):
+            expected = self.module.run(features, self.policy)
+            actual = self.module.run(features, compiled)
+            self.assertAlmostEqual(actual.prediction, expected.prediction, places=12)
+            self.assertEqual(actual.feature_importance, expected.feature_importance)
+            self.assertEqual(actual.trace_id, expected.trace_id)
+        self.assertEqual(self.module.run(reordered, compiled).feature_importance["extra"], 0.5)
+
+    def test_binary_hash_scheme(self):
+        module = DecisionModule(model=None, seed=42, hash_scheme="binary")
+        legacy = self.module.run(self.features, self.policy)
+        decision = module.run(self.features, self.policy)
+        self.assertNotEqual(decision.data_hash, legacy.data_hash)
+        self.assertTrue(verify_data_hash(self.features, decision.data_hash, scheme="binary"))
+        self.assertTrue(verify_data_hash(self.features, legacy.data_hash, scheme="json"))
+
+        reordered = {"labs": 0.74, "assignments": 0.67, "attendance": 0.82}
+        self.assertEqual(module.run(reordered, self.policy).trace_id, decision.trace_id)
+        other_policy = dict(self.policy, labs=0.5)
+        self.assertNotEqual(module.run(self.features, other_policy).trace_id, decision.trace_id)
+
+        names = ["labs", "attendance", "assignments"]
+        matrix = np.array([[reordered[k] for k in names]])
+        batch = module.run_batch(matrix, self.policy, feature_names=names)
+        self.assertEqual(batch[0].data_hash, decision.data_hash)
+        self.assertEqual(batch[0].trace_id, decision.trace_id)
+
+        with self.assertRaises(ValueError):
+            DecisionModule(hash_scheme="md5")
+
+    def test_ranking_carried_on_decision(self):
+        wide = {f"f{i}": float((i * 37) % 11) - 5.0 for i in range(200)}
+        decision = DecisionModule(model=None, seed=42, rank_k=5).run(wide, {})
+        expected = [k for k, _ in sorted(wide.items(), key=lambda kv: -abs(kv[1]))[:5]]
+        self.assertEqual(list(decision.ranking), expected)
+        batch = DecisionModule(model=None, seed=42, rank_k=5).run_batch([wide], {})
+        self.assertEqual(batch[0].ranking, decision.ranking)
+
+    def test_run_batch_rejects_mismatched_rows(self):
+        with self.assertRaises(ValueError):
+            self.module.run_batch([self.features, {"attendance": 0.5}], self.policy)
+
+
+class TestSparseInput(unittest.TestCase):
+    def setUp(self):
+        self.vocab = FeatureVocabulary(f"f{i}" for i in range(5000))
+        self.policy = {"f0": 0.5, "f10": -2.0, "f4999": 3.0}
+        # Keys in vocabulary order, which is the order sparse rows are stored in
+        self.rows = [
+            {"f3": 2.0, "f10": 0.5, "f4999": 2.0},
+            {},
+            {"f0": 1.0},
+            {"f3": 0.1, "f10": 0.2, "f4999": 0.3},
+        ]
+        self.batch = SparseBatch.from_dicts(self.rows, self.vocab)
+
+    def test_scores_use_full_policy_norm(self):
+        module = DecisionModule(rank_k=2)
+        decisions = module.run_sparse(self.batch, self.policy)
+        norm = np.linalg.norm(list(self.policy.values()))
+        for row, decision in zip(self.rows, decisions):
+            expected = sum(v * self.policy.get(k, 0.0) for k, v in row.items()) / norm
+            self.assertAlmostEqual(decision.prediction, expected)
+            self.assertTrue(verify_data_hash(row, decision.data_hash, sparse=True))
+        self.assertEqual(decisions[1].prediction, 0.0)
+        self.assertEqual(decisions[0].feature_importance, {"f3": 0.0, "f10": -1.0, "f4999": 6.0})
+        self.assertEqual(decisions[0].ranking, ("f4999", "f10"))
+
+        explanation = ExplanationModule().run(decisions[0])
+        self.assertIn("f4999", explanation.summary)
+        responsibility = ResponsibilityModule(load_config(GOVERNANCE))
+        verdicts = [responsibility.run(d, ExplanationModule().run(d)) for d in decisions]
+        self.assertEqual([v.allowed for v in verdicts], [True, False, False, False])
+        self.assertEqual(verdicts[0].metrics["top_feature_1"], 6.0)
+
+    def test_sparse_and_dense_on_identical_rows(self):
+        module = DecisionModule()
+        rows = [{"f0": 1.0, "f10": 0.2, "f4999": 0.4}, {"f3": 1.0, "f10": 0.2}]
+        sparse = module.run_sparse(SparseBatch.from_dicts(rows, self.vocab), self.policy)
+        dense = [module.run(row, self.policy) for row in rows]
+        # A row holding exactly the policy's features scores the same way
+        self.assertAlmostEqual(sparse[0].prediction, dense[0].prediction)
+        self.assertEqual(sparse[0].feature_importance, dense[0].feature_importance)
+        # Otherwise the unnamed feature weighs 0.0 sparse, 1.0 dense
+        self.assertNotAlmostEqual(sparse[1].prediction, dense[1].prediction)
+        # Sparse decisions never reuse dense hashes
+        for s, d in zip(sparse, dense):
+            self.assertNotEqual(s.data_hash, d.data_hash)
+            self.assertNotEqual(s.trace_id, d.trace_id)
+        binary = DecisionModule(hash_scheme="binary").run_sparse(SparseBatch.from_dicts(rows, self.vocab), self.policy)
+        self.assertTrue(verify_data_hash(rows[1], binary[1].data_hash, scheme="binary", sparse=True))
+        self.assertFalse(verify_data_hash(rows[1], binary[1].data_hash, scheme="binary"))
+
+    def test_csr_validation(self):
+        with self.assertRaises(ValueError):
+            SparseBatch([0, 2], [7, 7], [1.0, 2.0], self.vocab)
+        with self.assertRaises(ValueError):
+            SparseBatch([0, 1], [5000], [1.0], self.vocab)
+        with self.assertRaises(ValueError):
+            SparseBatch.from_dicts([{"unknown": 1.0}], self.vocab)
+        unsorted = SparseBatch([0, 2], [9, 2], [1.0, 2.0], self.vocab)
+        self.assertEqual(unsorted.row_dicts(), [{"f2": 2.0, "f9": 1.0}])
+
+
+class TestModelBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.rows = [
+            {"attendance": 0.82, "assignments": 0.67, "labs": 0.74},
+            {"attendance": 0.35, "assignments": 0.9, "labs": 0.1},
+        ]
+        self.model = LinearModel(["labs", "attendance"], [2.0, -1.0], bias=0.5, kind="logistic", version="v2")
+
+    def test_blends_model_output_in_every_path(self):
+        plain = DecisionModule().run_batch(self.rows, self.policy)
+        blended = DecisionModule(model=self.model, model_version="v2", model_weight=0.25)
+        expected = [
+            0.75 * d.prediction + 0.25 * (2.0 * r["labs"] - r["attendance"] + 0.5)
+            for d, r in zip(plain, self.rows)
+        ]
+        batch = blended.run_batch(self.rows, self.policy)
+        np.testing.assert_allclose([d.prediction for d in batch], expected)
+        self.assertAlmostEqual(blended.run(self.rows[0], self.policy).prediction, expected[0])
+        # Policy-only importance and hashes are unchanged by the model
+        self.assertEqual(batch[0].feature_importance, plain[0].feature_importance)
+        self.assertEqual(batch[0].trace_id, plain[0].trace_id)
+
+        vocab = FeatureVocabulary(["assignments", "attendance", "extra", "labs"])
+        sparse_plain = DecisionModule().run_sparse(SparseBatch.from_dicts(self.rows, vocab), self.policy)
+        sparse = blended.run_sparse(SparseBatch.from_dicts(self.rows, vocab), self.policy)
+        for p, d, r in zip(sparse_plain, sparse, self.rows):
+            self.assertAlmostEqual(d.prediction, 0.75 * p.prediction + 0.25 * (2.0 * r["labs"] - r["attendance"] + 0.5))
+
+        np.testing.assert_allclose(
+            self.model.predict_proba(np.array([[0.0, 0.0]]), ["labs", "attendance"]), [1.0 / (1.0 + np.exp(-0.5))]
+        )
+        with self.assertRaises(ValueError):
+            DecisionModule(model=self.model, model_weight=1.5)
+
+    def test_registry_loads_lazily_and_evicts_lru(self):
+        for i in range(3):
+            LinearModel(["labs"], [float(i)], version=f"v{i}").save(os.path.join(self.tmp.name, f"v{i}.npz"))
+        one = LinearModel.load(os.path.join(self.tmp.name, "v0.npz")).nbytes
+        registry = ModelRegistry(self.tmp.name, memory_budget=2 * one)
+        self.assertEqual(registry.versions(), ["v0", "v1", "v2"])
+        self.assertEqual(registry.loaded(), [])
+
+        self.assertEqual(registry.get("v0").weights.tolist(), [0.0])
+        registry.get("v1")
+        registry.get("v0")
+        registry.get("v2")
+        self.assertEqual(registry.loaded(), ["v0", "v2"])
+        self.assertEqual((registry.loads, registry.hits, registry.evictions), (3, 1, 1))
+        with self.assertRaises(KeyError):
+            registry.get("v9")
+
+        # Two versions side by side from one registry
+        rows = [{"labs": 1.0}]
+        v1 = DecisionModule(model=registry, model_version="v1", model_weight=1.0).run_batch(rows, {})
+        v2 = DecisionModule(model=registry, model_version="v2", model_weight=1.0).run_batch(rows, {})
+        self.assertEqual((v1[0].prediction, v1[0].model_version), (1.0, "v1"))
+        self.assertEqual((v2[0].prediction, v2[0].model_version), (2.0, "v2"))
+
+    def test_backend_requires_predict(self):
+        with self.assertRaises(TypeError):
+            ModelBackend()
+
+
+class TestExplanationModule(unittest.TestCase):
+    def setUp(self):
+        features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        decision = DecisionModule(model=None, seed=42).run(features, policy)
+        self.decision = decision
+        self.module = ExplanationModule()
+
+    def test_run_outputs_explanation(self):
+        explanation = self.module.run(self.decision)
+        self.assertIn("Prediction", explanation.summary or "")
+        self.assertIn("confidence", explanation.technical)
+        self.assertIsInstance(explanation.counterfactuals, list)
+        self.assertIsInstance(explanation.caveats, list)
+        self.assertEqual(explanation.trace_id, self.decision.trace_id)
+
+    def test_top_k_configurable(self):
+        features = {f"f{i}": float(i) for i in range(10)}
+        decision = DecisionModule(model=None, seed=42).run(features, {})
+        explanation = ExplanationModule(top_k=5).run(decision)
+        self.assertEqual([c["feature"] for c in explanation.counterfactuals], ["f9", "f8", "f7", "f6", "f5"])
+        self.assertIn("f5", explanation.summary)
+
+    def test_audience_profiles_render_in_one_pass(self):
+        plans = load_render_plans(PROFILES)
+        self.assertEqual(set(plans), {"student", "faculty", "administrator", "regulator"})
+        module = ExplanationModule(profiles=plans)
+        rendered = module.run_many(self.decision, ["student", "administrator", "regulator"])
+
+        self.assertTrue(rendered["student"].counterfactuals)
+        self.assertEqual(rendered["administrator"].counterfactuals, [])
+        self.assertEqual(set(rendered["student"].technical), {"confidence"})
+        self.assertIn("feature_importance", rendered["regulator"].technical)
+        self.assertIn("attendance (+0.328)", rendered["regulator"].summary)
+        self.assertNotEqual(rendered["student"].summary, rendered["regulator"].summary)
+
+        single = ExplanationModule(audience="student", profiles=plans).run(self.decision)
+        self.assertEqual(single.summary, rendered["student"].summary)
+        # The shipped profiles are the default, wherever the process runs from
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(os.path.dirname(__file__))
+        shipped = ExplanationModule(audience="student").run(self.decision)
+        self.assertEqual(shipped, single)
+        self.assertNotEqual(ExplanationModule(audience="student", profiles={}).run(self.decision).summary, single.summary)
+
+        misses = module.cache.misses
+        module.run_many(self.decision, ["student", "administrator", "regulator"])
+        self.assertEqual(module.cache.misses, misses)
+        self.assertGreaterEqual(module.cache.hits, 3)
+
+
+class TestCounterfactualEngine(unittest.TestCase):
+    def setUp(self):
+        self.names = ["attendance", "assignments", "labs"]
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.matrix = np.random.default_rng(3).random((40, 3)) * 0.6
+        self.module = DecisionModule(model=None, seed=42)
+
+    def _confidence(self, row):
+        return self.module.run(dict(zip(self.names, row.tolist())), self.policy).confidence
+
+    def test_changes_cross_threshold(self):
+        engine = CounterfactualEngine(self.policy, self.names, bounds={k: (0.0, 1.0) for k in self.names},
+                                      immutable=["labs"])
+        result = engine.solve(self.matrix, 0.7)
+        for i, row in enumerate(self.matrix):
+            blocked = result.confidence[i] < 0.7
+            j = result.best_feature[i]
+            if j >= 0:
+                moved = row.copy()
+                moved[j] += result.best_delta[i]
+                self.assertEqual(self._confidence(moved) >= 0.7, bool(blocked))
+                self.assertNotEqual(self.names[j], "labs")
+            if result.multi_feasible[i]:
+                moved = row + result.multi_delta[i]
+                self.assertEqual(self._confidence(moved) >= 0.7, bool(blocked))
+                self.assertEqual(result.multi_delta[i][2], 0.0)
+                self.assertTrue(np.all(moved >= -1e-12) and np.all(moved <= 1.0 + 1e-12))
+                if j >= 0:
+                    self.assertLessEqual(np.linalg.norm(result.multi_delta[i]), abs(result.best_delta[i]) + 1e-12)
+
+    def test_for_blocked_only(self):
+        engine = CounterfactualEngine(self.policy, self.names)
+        records = engine.for_blocked(self.matrix, 0.7)
+        self.assertTrue(records)
+        for i, items in records.items():
+            self.assertLess(self._confidence(self.matrix[i]), 0.7)
+            self.assertGreater(items[0]["change"], 0.0)
+
+    def test_one_sided_bounds(self):
+        policy = {"a": 1.0, "b": 1.0}
+        lower_only = CounterfactualEngine(policy, ["a", "b"], bounds={"a": (0.9, np.inf)}).solve([[1.0, 1.0]], 0.5)
+        finite = CounterfactualEngine(policy, ["a", "b"], bounds={"a": (0.9, 1e9)}).solve([[1.0, 1.0]], 0.5)
+        self.assertTrue(lower_only.multi_feasible[0])
+        np.testing.assert_allclose(lower_only.multi_delta[0], [-0.1, -1.9])
+        np.testing.assert_allclose(lower_only.multi_delta[0], finite.multi_delta[0])
+        # Only the bound in the direction of travel can saturate a feature
+        capped = CounterfactualEngine(policy, ["a", "b"], bounds={"a": (0.9, np.inf), "b": (0.5, np.inf)})
+        self.assertFalse(capped.solve([[1.0, 1.0]], 0.5).multi_feasible[0])
+
+    def test_blended_model_score(self):
+        model = LinearModel(["labs", "attendance"], [2.0, -1.0], bias=0.5, version="v2")
+        blended = DecisionModule(model=model, model_version="v2", model_weight=0.25)
+        engine = CounterfactualEngine(self.policy, self.names, model=model, model_weight=0.25)
+        result = engine.solve(self.matrix, 0.7)
+        for i, row in enumerate(self.matrix):
+            features = dict(zip(self.names, row.tolist()))
+            self.assertAlmostEqual(result.confidence[i], blended.run(features, self.policy).confidence)
+            moved = dict(zip(self.names, (row + result.multi_delta[i]).tolist()))
+            self.assertAlmostEqual(blended.run(moved, self.policy).confidence, 0.7, places=6)
+        with self.assertRaises(ValueError):
+            CounterfactualEngine(self.policy, self.names, model=_OpaqueModel())
+
+    def test_explanations_solve_blocked_decisions(self):
+        rows = [dict(zip(self.names, row.tolist())) for row in self.matrix]
+        decisions = self.module.run_batch(rows, self.policy)
+        explainer = ExplanationModule(threshold=0.7, decision_module=self.module, immutable=["labs"])
+        batch = explainer.run_batch(decisions, rows, self.policy)
+        self.assertTrue(any(d.confidence < 0.7 for d in decisions))
+        for decision, row, explanation in zip(decisions, rows, batch):
+            single = explainer.run(decision, row, self.policy)
+            self.assertEqual(explanation.summary, single.summary)
+            self.assertEqual([c["feature"] for c in explanation.counterfactuals],
+                             [c["feature"] for c in single.counterfactuals])
+            if decision.confidence >= 0.7:
+                self.assertEqual(explanation.counterfactuals, ExplanationModule().run(decision).counterfactuals)
+                continue
+            single = explanation.counterfactuals[0]
+            self.assertNotEqual(single["feature"], "labs")
+            moved = dict(row, **{single["feature"]: single["new_value"]})
+            self.assertGreaterEqual(self.module.run(moved, self.policy).confidence, 0.7)
+
+
+class TestResponsibilityModule(unittest.TestCase):
+    def setUp(self):
+        features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        decision = DecisionModule(model=None, seed=42).run(features, policy)
+        explanation = ExplanationModule().run(decision)
+        self.decision = decision
+        self.explanation = explanation
+        self.governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        self.module = ResponsibilityModule(self.governance)
+
+    def test_run_outputs_verdict(self):
+        verdict = self.module.run(self.decision, self.explanation)
+        self.assertIsInstance(verdict.allowed, bool)
+        self.assertIsInstance(verdict.reasons, list)
+        self.assertIsInstance(verdict.metrics, dict)
+        self.assertIsInstance(verdict.audit_bundle, dict)
+        self.assertEqual(verdict.trace_id, self.decision.trace_id)
+
+    def test_metrics_top_k_from_governance(self):
+        governance = dict(self.governance, metrics={"top_k": 2})
+        metrics = ResponsibilityModule(governance).run(self.decision, self.explanation).metrics
+        self.assertEqual(sorted(metrics), ["confidence", "top_feature_1", "top_feature_2"])
+        self.assertAlmostEqual(metrics["top_feature_1"], 0.82 * 0.4)
+
+
+class TestArtifactBatch(unittest.TestCase):
+    def setUp(self):
+        names = ["attendance", "assignments", "labs"]
+        policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        matrix = np.random.default_rng(5).random((30, 3))
+        self.decisions = DecisionModule(model=None, seed=42).run_batch(matrix, policy, feature_names=names)
+        self.explanations = [ExplanationModule().run(d) for d in self.decisions]
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        responsibility_module = ResponsibilityModule(governance)
+        self.verdicts = [responsibility_module.run(d, e) for d, e in zip(self.decisions, self.explanations)]
+        self.batch = ArtifactBatch.from_artifacts(self.decisions, self.explanations, self.verdicts)
+
+    def test_rows_round_trip(self):
+        self.assertEqual(len(self.batch), 30)
+        for view, decision, explanation, verdict in zip(self.batch, self.decisions, self.explanations, self.verdicts):
+            self.assertEqual(view.to_decision(), decision)
+            self.assertEqual(view.summary, explanation.summary)
+            self.assertEqual(view.caveats, explanation.caveats)
+            self.assertEqual(view.allowed, verdict.allowed)
+            self.assertEqual(view.reasons, verdict.reasons)
+        # Repeated strings are interned once
+        self.assertLess(len(self.batch.pool), 30)
+
+    def test_slicing_and_filtering(self):
+        window = self.batch[10:20]
+        self.assertEqual(len(window), 10)
+        self.assertTrue(np.shares_memory(window.confidences, self.batch.confidences))
+        self.assertEqual(window[0].trace_id, self.decisions[10].trace_id)
+
+        blocked = self.batch.blocked()
+        expected = [d.trace_id for d, v in zip(self.decisions, self.verdicts) if not v.allowed]
+        self.assertEqual([v.trace_id for v in blocked], expected)
+        joined = ArtifactBatch.concat([self.batch[:5], self.batch[5:]])
+        self.assertEqual([v.data_hash for v in joined], [d.data_hash for d in self.decisions])
+
+    def test_heterogeneous_rows(self):
+        rows = [{"attendance": 0.8, "labs": 0.4}, {"labs": 0.2, "projects": 0.9}, {"attendance": 0.1}]
+        decisions = [DecisionModule(model=None).run(row, {"attendance": 0.5, "labs": 0.5}) for row in rows]
+        batch = ArtifactBatch.from_artifacts(decisions)
+        self.assertEqual(batch.feature_names, ("attendance", "labs", "projects"))
+        np.testing.assert_allclose(batch.importances[:, 2], [0.0, decisions[1].feature_importance["projects"], 0.0])
+        for view, decision in zip(batch, decisions):
+            importance = view.feature_importance
+            self.assertEqual({k: importance[k] for k in decision.feature_importance}, decision.feature_importance)
+            self.assertEqual(view.ranking, decision.ranking)
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.features = {"attendance": 0.82, "assignments": 0.67, "labs": 0.74}
+        self.policy = {"attendance": 0.4, "assignments": 0.3, "labs": 0.3}
+        self.spans = []
+        self.telemetry = Telemetry(callback=self.spans.append)
+
+    def run_pipeline(self, features):
+        decision = DecisionModule(telemetry=self.telemetry).run(features, self.policy)
+        explanation = ExplanationModule(telemetry=self.telemetry).run(decision)
+        governance = {"use_sensitive_attrs": False, "min_confidence": 0.7}
+        verdict = ResponsibilityModule(governance, telemetry=self.telemetry).run(decision, explanation)
+        return decision, verdict
+
+    def test_stages_keyed_by_trace_id(self):
+        decision, _ = self.run_pipeline(self.features)
+        stages = [span.stage for span in self.spans]
+        self.assertEqual(stages, ["decision.score", "decision.hash", "explanation.render", "responsibility.checks"])
+        self.assertTrue(all(span.trace_id == decision.trace_id for span in self.spans))
+        self.assertTrue(all(span.duration >= 0.0 for span in self.spans))
+
+        ExplanationModule(telemetry=self.telemetry).run_many(decision, ["student", "regulator"])
+        self.assertEqual((self.spans[-1].stage, self.spans[-1].trace_id), ("explanation.render", decision.trace_id))
+        self.assertEqual(self.spans[-1].attributes["audience"], "student,regulator")
+
+    def test_verdict_counters_and_prometheus_export(self):
+        self.run_pipeline(self.features)
+        self.run_pipeline({"attendance": 0.1, "assignments": 0.1, "labs": 0.1})
+        self.assertEqual(self.telemetry.counter("verdicts_total", allowed="true"), 1)
+        self.assertEqual(self.telemetry.counter("verdicts_total", allowed="false"), 1)
+        self.assertEqual(self.telemetry.counter("blocked_reasons_total", reason="low_confidence"), 1)
+        text = self.telemetry.render_prometheus()
+        self.assertIn('agent_stage_seconds_count{stage="decision.score"} 2', text)
+        self.assertIn('agent_stage_seconds_bucket{stage="decision.score",le="+Inf"} 2', text)
+        self.assertIn('agent_blocked_reasons_total{reason="low_confidence"} 1', text)
+
+    def test_sampling_and_disabled(self):
+        self.telemetry.sample_rate = 0.0
+        self.run_pipeline(self.features)
+        self.assertEqual(self.spans, [])
+        # Counters stay exact regardless of sampling
+        self.assertEqual(self.telemetry.counter("verdicts_total", allowed="true"), 1)
+        module = DecisionModule()
+        self.assertIs(module.telemetry, NULL_TELEMETRY)
+        module.run(self.features, self.policy)
+        self.assertEqual(NULL_TELEMETRY.histograms, {})
+
+
+if __name__ == "__main__":
     unittest.main()
\ No newline at end of file